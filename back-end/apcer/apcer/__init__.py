@@ -2,24 +2,16 @@ from pyramid.config import Configurator
 from pyramid.session import SignedCookieSessionFactory
 from pyramid.authentication import AuthTktAuthenticationPolicy
 from pyramid.authorization import ACLAuthorizationPolicy
-from sqlalchemy import engine_from_config
-from .models.meta import Base
-from .models.meta import Session  # ⬅️ WAJIB untuk aktifkan request.dbsession
 from .security import get_user_id, RootFactory
-from pyramid.renderers import JSON
+from .renderers import json_renderer
 from .cors import cors_tween_factory
 
 def main(global_config, **settings):
     config = Configurator(settings=settings)
 
     config.add_tween('.cors_tween_factory')
-    config.add_renderer('json', JSON(indent=4))
-
-    engine = engine_from_config(settings, 'sqlalchemy.')
-    Base.metadata.bind = engine
-    config.include('pyramid_tm')
-    config.include('pyramid_retry')
-    config.include('pyramid_sqlalchemy')
+    config.add_tween('.compression.compression_tween_factory')
+    config.add_renderer('json', json_renderer())
 
     my_session_factory = SignedCookieSessionFactory('itsaseekreet')
     config.set_session_factory(my_session_factory)
@@ -40,7 +32,12 @@ def main(global_config, **settings):
     config.include('pyramid_jinja2')
     config.add_jinja2_renderer('.html')
 
+    # Engine, pyramid_tm, pyramid_retry dan request.dbsession diatur di models
     config.include('.models')
+    config.include('.hashing')
+    config.include('.writer')
+    config.include('.cache')
+    config.include('.metrics')
     config.include('.routes')
     config.scan()
 
@@ -4,12 +4,15 @@ from pyramid.paster import get_appsettings, setup_logging
 from sqlalchemy import engine_from_config
 
 from apcer.models.meta import Base
+from apcer.models.routing import engine_prefix, engine_options
 
 config = context.config
 
 setup_logging(config.config_file_name)
 
 settings = get_appsettings(config.config_file_name)
+# Migrasi selalu ke database tulis (sqlalchemy.write.* jika ada)
+engine_settings = engine_options(settings, engine_prefix(settings, 'write'))
 target_metadata = Base.metadata
 
 
@@ -25,7 +28,7 @@ def run_migrations_offline():
     script output.
 
     """
-    context.configure(url=settings['sqlalchemy.url'])
+    context.configure(url=engine_settings['sqlalchemy.url'])
     with context.begin_transaction():
         context.run_migrations()
 
@@ -37,7 +40,7 @@ def run_migrations_online():
     and associate a connection with the context.
 
     """
-    engine = engine_from_config(settings, prefix='sqlalchemy.')
+    engine = engine_from_config(engine_settings, prefix='sqlalchemy.')
 
     connection = engine.connect()
     context.configure(
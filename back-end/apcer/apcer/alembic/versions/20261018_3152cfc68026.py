@@ -0,0 +1,41 @@
+"""add likes_count and comments_count to posts
+
+Revision ID: 3152cfc68026
+Revises: f84f40d8d4fb
+Create Date: 2026-10-18 09:12:40.318220
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3152cfc68026'
+down_revision = 'f84f40d8d4fb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.add_column(sa.Column('likes_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('comments_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Isi counter dari data yang sudah ada
+    op.execute("""
+        UPDATE posts SET
+            likes_count = (
+                SELECT COUNT(*) FROM reactions
+                WHERE reactions.post_id = posts.id AND reactions.type = 'like'
+            ),
+            comments_count = (
+                SELECT COUNT(*) FROM comments
+                WHERE comments.post_id = posts.id AND comments.is_deleted = false
+            )
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.drop_column('comments_count')
+        batch_op.drop_column('likes_count')
@@ -0,0 +1,40 @@
+"""add sequences table for anonymous usernames
+
+Revision ID: 5b0e7d21a9c4
+Revises: 834ed6c883e4
+Create Date: 2026-10-18 11:02:37.412906
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b0e7d21a9c4'
+down_revision = '834ed6c883e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('sequences',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name', name=op.f('pk_sequences'))
+    )
+    # Lanjutkan penomoran "Anonim #N" dari nomor terbesar yang sudah terpakai
+    # (bukan COUNT(*): user yang dihapus meninggalkan celah pada penomoran)
+    usernames = op.get_bind().execute(
+        sa.text("SELECT username FROM users WHERE username LIKE 'Anonim #%'")).scalars()
+    numbers = (re.match(r'Anonim #(\d+)$', username) for username in usernames)
+    value = max((int(m.group(1)) for m in numbers if m), default=0)
+    op.execute(
+        sa.text("INSERT INTO sequences (name, value) VALUES ('anon_username', :value)")
+        .bindparams(value=value)
+    )
+
+
+def downgrade():
+    op.drop_table('sequences')
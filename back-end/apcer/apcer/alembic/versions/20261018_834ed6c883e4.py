@@ -0,0 +1,38 @@
+"""add hot-path composite indexes
+
+Revision ID: 834ed6c883e4
+Revises: 3152cfc68026
+Create Date: 2026-10-18 09:41:05.127734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '834ed6c883e4'
+down_revision = '3152cfc68026'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Index parsial: hanya baris dengan is_deleted = false yang diindeks
+    not_deleted = sa.column('is_deleted') == sa.false()
+
+    op.create_index('ix_posts_feed', 'posts', ['created_at', 'id'],
+                    sqlite_where=not_deleted, postgresql_where=not_deleted)
+    op.create_index('ix_posts_user_feed', 'posts', ['user_id', 'created_at', 'id'],
+                    sqlite_where=not_deleted, postgresql_where=not_deleted)
+    op.create_index('ix_comments_post_feed', 'comments', ['post_id', 'created_at', 'id'],
+                    sqlite_where=not_deleted, postgresql_where=not_deleted)
+    op.create_index('ix_reactions_post_type', 'reactions', ['post_id', 'type'])
+    op.create_index('ix_saved_posts_user_saved_at', 'saved_posts', ['user_id', 'saved_at', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_saved_posts_user_saved_at', table_name='saved_posts')
+    op.drop_index('ix_reactions_post_type', table_name='reactions')
+    op.drop_index('ix_comments_post_feed', table_name='comments')
+    op.drop_index('ix_posts_user_feed', table_name='posts')
+    op.drop_index('ix_posts_feed', table_name='posts')
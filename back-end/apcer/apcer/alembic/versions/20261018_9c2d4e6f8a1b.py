@@ -0,0 +1,65 @@
+"""add full-text search index on posts.content
+
+Revision ID: 9c2d4e6f8a1b
+Revises: 5b0e7d21a9c4
+Create Date: 2026-10-18 15:20:41.118204
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '9c2d4e6f8a1b'
+down_revision = '5b0e7d21a9c4'
+branch_labels = None
+depends_on = None
+
+# DDL disalin dari apcer/models/search.py saat revisi ini dibuat: migrasi
+# tidak boleh ikut berubah jika model diubah kemudian.
+SQLITE_CREATE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5("
+    "content, content='posts', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN "
+    "INSERT INTO posts_fts(rowid, content) VALUES (new.id, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, content) VALUES ('delete', old.id, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS posts_fts_au AFTER UPDATE OF content ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+    "INSERT INTO posts_fts(rowid, content) VALUES (new.id, new.content); END",
+    # Isi index dari post yang sudah ada
+    "INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')",
+    "INSERT INTO posts_fts(posts_fts) VALUES ('optimize')",
+)
+SQLITE_DROP = (
+    "DROP TRIGGER IF EXISTS posts_fts_au",
+    "DROP TRIGGER IF EXISTS posts_fts_ad",
+    "DROP TRIGGER IF EXISTS posts_fts_ai",
+    "DROP TABLE IF EXISTS posts_fts",
+)
+POSTGRES_CREATE = (
+    "CREATE INDEX IF NOT EXISTS ix_posts_content_fts ON posts "
+    "USING gin (to_tsvector('simple', content)) WHERE is_deleted = false",
+)
+POSTGRES_DROP = ("DROP INDEX IF EXISTS ix_posts_content_fts",)
+
+STATEMENTS = {
+    'sqlite': (SQLITE_CREATE, SQLITE_DROP),
+    'postgresql': (POSTGRES_CREATE, POSTGRES_DROP),
+}
+
+
+def _statements(index):
+    # Dialect lain tidak punya index full-text: search memakai LIKE
+    dialect = op.get_bind().dialect.name
+    return STATEMENTS[dialect][index] if dialect in STATEMENTS else ()
+
+
+def upgrade():
+    for statement in _statements(0):
+        op.execute(statement)
+
+
+def downgrade():
+    for statement in _statements(1):
+        op.execute(statement)
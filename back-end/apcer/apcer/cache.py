@@ -0,0 +1,314 @@
+# cache.py
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from pyramid.httpexceptions import HTTPNotModified
+from pyramid.response import Response
+
+log = logging.getLogger(__name__)
+
+CACHE_HEADER = 'X-Cache'
+
+# Header respons yang ikut disimpan bersama body
+STORED_HEADERS = ('X-Next-Cursor', 'ETag', 'Last-Modified', 'Cache-Control')
+
+
+class MemoryCache:
+    """
+    Cache LRU in-process dengan TTL. Aman dipakai banyak thread waitress,
+    tapi tidak dibagi antar proses.
+    """
+
+    def __init__(self, max_entries=1024, ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def generation(self):
+        with self._lock:
+            return self._generation
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, generation=None):
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._generation += 1
+
+
+class SQLiteCache:
+    """
+    Cache bersama berbasis file SQLite untuk beberapa worker di satu host.
+    Satu koneksi per thread; file memakai WAL agar pembaca tidak saling blok.
+    """
+
+    def __init__(self, path, ttl=30):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        connection = self._connection()
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS response_cache '
+            '(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL)'
+        )
+        connection.execute('CREATE TABLE IF NOT EXISTS response_cache_generation (value INTEGER NOT NULL)')
+        connection.execute(
+            'INSERT INTO response_cache_generation (value) '
+            'SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM response_cache_generation)'
+        )
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            self._local.connection = connection
+        return connection
+
+    def get(self, key):
+        row = self._connection().execute(
+            'SELECT value FROM response_cache WHERE key = ? AND expires > ?',
+            (key, time.time()),
+        ).fetchone()
+        return row[0] if row else None
+
+    def generation(self):
+        return self._connection().execute('SELECT value FROM response_cache_generation').fetchone()[0]
+
+    def set(self, key, value, generation=None):
+        if generation is None:
+            self._connection().execute(
+                'INSERT OR REPLACE INTO response_cache (key, value, expires) VALUES (?, ?, ?)',
+                (key, value, time.time() + self.ttl),
+            )
+            return
+        # Satu statement: tidak ditulis jika clear() terjadi sejak generation dibaca
+        self._connection().execute(
+            'INSERT OR REPLACE INTO response_cache (key, value, expires) '
+            'SELECT ?, ?, ? FROM response_cache_generation WHERE value = ?',
+            (key, value, time.time() + self.ttl, generation),
+        )
+
+    def clear(self):
+        connection = self._connection()
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute('DELETE FROM response_cache')
+            connection.execute('UPDATE response_cache_generation SET value = value + 1')
+
+
+class RedisCache:
+    """
+    Cache bersama lewat protokol Redis. Invalidasi memakai nomor generasi:
+    ``clear()`` cukup INCR satu key, entri lama kedaluwarsa sendiri lewat TTL.
+
+    ``client`` bisa diisi objek lain yang punya get/setex/incr (misal fake
+    untuk test); jika kosong dibuat dari ``url`` memakai paket ``redis``.
+    """
+
+    def __init__(self, url=None, ttl=30, prefix='apcer:cache:', client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("cache.backend = redis membutuhkan paket 'redis' (pip install redis)")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def generation(self):
+        generation = self.client.get(self.prefix + 'generation') or b'0'
+        if isinstance(generation, bytes):
+            generation = generation.decode('ascii')
+        return generation
+
+    def _key(self, key, generation=None):
+        if generation is None:
+            generation = self.generation()
+        return f"{self.prefix}{generation}:{key}"
+
+    def get(self, key):
+        return self.client.get(self._key(key))
+
+    def set(self, key, value, generation=None):
+        # Ditulis di bawah generation saat view mulai; jika sudah di-clear,
+        # entri itu tidak pernah dibaca lagi dan habis sendiri lewat TTL
+        self.client.setex(self._key(key, generation), self.ttl, value)
+
+    def clear(self):
+        self.client.incr(self.prefix + 'generation')
+
+
+class ResponseCache:
+    """
+    Membungkus backend cache dan mencatat hit/miss/invalidasi.
+    Yang disimpan adalah respons yang sudah di-serialize (bytes).
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def get(self, key):
+        try:
+            value = self.backend.get(key)
+        except Exception:
+            log.exception('Gagal membaca cache, lanjut tanpa cache')
+            value = None
+        self._count('hits' if value is not None else 'misses')
+        return decode_response(value) if value is not None else None
+
+    def generation(self):
+        """Token versi cache; berubah setiap ``clear()``."""
+        try:
+            return self.backend.generation()
+        except Exception:
+            log.exception('Gagal membaca generation cache')
+            return None
+
+    def set(self, key, response, generation=None):
+        try:
+            self.backend.set(key, encode_response(response), generation)
+        except Exception:
+            log.exception('Gagal menulis cache')
+
+    def clear(self):
+        self._count('invalidations')
+        try:
+            self.backend.clear()
+        except Exception:
+            log.exception('Gagal mengosongkan cache')
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'invalidations': self.invalidations}
+
+
+def encode_response(response):
+    meta = {
+        'status': response.status_code,
+        'content_type': response.content_type,
+        'charset': response.charset,
+        'headers': {name: response.headers[name] for name in STORED_HEADERS if name in response.headers},
+    }
+    return json.dumps(meta).encode('utf-8') + b'\n' + response.body
+
+
+def decode_response(value):
+    meta, body = bytes(value).split(b'\n', 1)
+    meta = json.loads(meta)
+    response = Response(body=body, status=meta['status'], content_type=meta['content_type'],
+                        charset=meta['charset'])
+    response.headers.update(meta['headers'])
+    return response
+
+
+def cache_anonymous(view):
+    """
+    View decorator: respons GET untuk pengunjung anonim diambil dari cache.
+    User yang login selalu dilayani langsung karena ada flag isLiked/isSaved.
+    """
+    @wraps(view)
+    def wrapper(context, request):
+        cache = request.registry.get('response_cache')
+        if cache is None or request.method != 'GET' or request.authenticated_userid is not None:
+            return view(context, request)
+
+        key = request.path_qs
+        response = cache.get(key)
+        if response is not None:
+            if response.etag and response.etag in request.if_none_match:
+                # Klien sudah punya versi yang sama: 304 tanpa body
+                not_modified = HTTPNotModified()
+                for name in STORED_HEADERS:
+                    if name in response.headers:
+                        not_modified.headers[name] = response.headers[name]
+                response = not_modified
+            response.headers[CACHE_HEADER] = 'HIT'
+            return response
+
+        # Generation dibaca SEBELUM view: jika invalidasi (after-commit
+        # penulis) terjadi selama view berjalan, body ini mungkin sudah
+        # basi dan tidak disimpan.
+        generation = cache.generation()
+        response = view(context, request)
+        if response.status_code == 200 and generation is not None:
+            cache.set(key, response, generation)
+        response.headers[CACHE_HEADER] = 'MISS'
+        return response
+    return wrapper
+
+
+def invalidate_post_cache(request):
+    """
+    Kosongkan cache post setelah transaksi request berhasil di-commit,
+    supaya pembaca lain tidak sempat mengisi ulang cache dengan data lama.
+    """
+    cache = request.registry.get('response_cache')
+    if cache is None:
+        return
+
+    def after_commit(success):
+        if success:
+            cache.clear()
+
+    request.tm.get().addAfterCommitHook(after_commit)
+
+
+def cache_from_settings(settings):
+    backend = settings.get('cache.backend', 'none')
+    ttl = float(settings.get('cache.ttl', 30))
+
+    if backend == 'none':
+        return None
+    if backend == 'memory':
+        return ResponseCache(MemoryCache(int(settings.get('cache.max_entries', 1024)), ttl))
+    if backend == 'sqlite':
+        path = settings.get('cache.path') or os.path.join(os.getcwd(), 'apcer-cache.sqlite')
+        return ResponseCache(SQLiteCache(path, ttl))
+    if backend == 'redis':
+        return ResponseCache(RedisCache(settings.get('cache.url', 'redis://localhost:6379/0'), ttl))
+    raise ValueError(f"cache.backend tidak dikenal: {backend}")
+
+
+def includeme(config):
+    """
+    Aktifkan cache respons post lewat ``config.include('apcer.cache')``.
+    """
+    config.registry['response_cache'] = cache_from_settings(config.get_settings())
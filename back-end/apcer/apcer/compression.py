@@ -0,0 +1,132 @@
+# compression.py
+import gzip
+import hashlib
+import logging
+import threading
+
+from pyramid.settings import asbool
+
+from .cache import MemoryCache
+
+try:  # brotli opsional; tanpa paket ini hanya gzip yang ditawarkan
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+log = logging.getLogger(__name__)
+
+# Tipe konten yang layak dikompres (teks). Gambar/arsip sudah terkompres.
+COMPRESSIBLE_TYPES = ('application/json', 'application/javascript', 'image/svg+xml')
+
+
+class Compressor:
+    """
+    Negosiasi Accept-Encoding dan kompresi body respons.
+
+    Hasil kompresi disimpan per (ETag, encoding, digest body) sehingga
+    respons yang sama tidak dikompres ulang di setiap request. Digest body
+    ikut di key karena ETag saja tidak menjamin body identik (misalnya dua
+    edit dalam detik yang sama).
+    """
+
+    def __init__(self, min_size=1024, gzip_level=6, brotli_quality=5,
+                 use_brotli=True, cache_entries=256):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = ('br', 'gzip') if use_brotli and brotli is not None else ('gzip',)
+        self.cache = MemoryCache(max_entries=cache_entries, ttl=3600) if cache_entries else None
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cache_hits = 0
+        self._lock = threading.Lock()
+
+    def compressible(self, response):
+        if response.status_code != 200 or response.content_encoding:
+            return False
+        if 'Content-Range' in response.headers:
+            return False
+        content_type = response.content_type or ''
+        if not (content_type.startswith('text/') or content_type in COMPRESSIBLE_TYPES):
+            return False
+        return (response.content_length or len(response.body)) >= self.min_size
+
+    def negotiate(self, request):
+        # Tanpa header Accept-Encoding klien dianggap tidak mendukung kompresi
+        if 'Accept-Encoding' not in request.headers:
+            return None
+        offers = request.accept_encoding.acceptable_offers(self.encodings)
+        return offers[0][0] if offers else None
+
+    def compress(self, body, encoding):
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        # mtime=0 agar output deterministik untuk body yang sama
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def encode(self, response, encoding):
+        body = response.body
+        etag = response.headers.get('ETag')
+        key = None
+        if etag and self.cache is not None:
+            digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+            key = f"{etag}|{encoding}|{digest}"
+
+        compressed = self.cache.get(key) if key else None
+        hit = compressed is not None
+        if not hit:
+            compressed = self.compress(body, encoding)
+            if key:
+                self.cache.set(key, compressed)
+
+        # Tidak dipakai jika justru lebih besar (body acak/kecil)
+        if len(compressed) >= len(body):
+            return response
+
+        with self._lock:
+            self.bytes_in += len(body)
+            self.bytes_out += len(compressed)
+            self.cache_hits += hit
+        response.body = compressed
+        response.content_encoding = encoding
+        return response
+
+    def __call__(self, request, response):
+        if request.method == 'HEAD' or not self.compressible(response):
+            return response
+        vary = tuple(response.vary or ())
+        if 'Accept-Encoding' not in vary:
+            response.vary = vary + ('Accept-Encoding',)
+        encoding = self.negotiate(request)
+        if encoding is None:
+            return response
+        return self.encode(response, encoding)
+
+    def stats(self):
+        with self._lock:
+            return {'bytes_in': self.bytes_in, 'bytes_out': self.bytes_out, 'cache_hits': self.cache_hits}
+
+
+def compressor_from_settings(settings):
+    if not asbool(settings.get('compression.enabled', True)):
+        return None
+    return Compressor(
+        min_size=int(settings.get('compression.min_size', 1024)),
+        gzip_level=int(settings.get('compression.gzip_level', 6)),
+        brotli_quality=int(settings.get('compression.brotli_quality', 5)),
+        use_brotli=asbool(settings.get('compression.brotli', True)),
+        cache_entries=int(settings.get('compression.cache_entries', 256)),
+    )
+
+
+def compression_tween_factory(handler, registry):
+    compressor = compressor_from_settings(registry.settings)
+    registry['compressor'] = compressor
+    if compressor is None:
+        return handler
+    log.info('Kompresi respons aktif: %s, min_size=%d', ', '.join(compressor.encodings), compressor.min_size)
+
+    def compression_tween(request):
+        return compressor(request, handler(request))
+
+    return compression_tween
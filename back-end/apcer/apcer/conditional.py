@@ -0,0 +1,41 @@
+# conditional.py
+import hashlib
+
+from pyramid.httpexceptions import HTTPNotModified
+
+
+def make_etag(*parts):
+    """
+    Validator murah dari state hasil query (id, updated_at, isi, counter,
+    flag). Tidak perlu men-serialize body untuk menghitungnya. Isi ikut
+    di-hash karena updated_at di SQLite hanya beresolusi detik.
+    """
+    return hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=12).hexdigest()
+
+
+def last_modified(*rows):
+    stamps = [row.updated_at or row.created_at for row in rows if row is not None]
+    stamps = [stamp for stamp in stamps if stamp is not None]
+    return max(stamps) if stamps else None
+
+
+def with_validators(response, etag, modified=None):
+    # Weak ETag karena body bisa dikirim ter-kompresi dengan byte berbeda.
+    # no-cache: klien boleh menyimpan, tapi wajib revalidasi (If-None-Match)
+    # agar tidak memakai heuristik kesegaran dari Last-Modified.
+    response.headers['ETag'] = f'W/"{etag}"'
+    response.cache_control = 'private, no-cache'
+    if modified is not None:
+        response.last_modified = modified
+    return response
+
+
+def not_modified(request, etag, modified=None):
+    """
+    Mengembalikan respons 304 jika ``If-None-Match`` cocok, selain itu None.
+    If-Modified-Since sengaja diabaikan: perubahan counter tidak mengubah
+    updated_at, jadi hanya ETag yang bisa diandalkan.
+    """
+    if etag in request.if_none_match:
+        return with_validators(HTTPNotModified(), etag, modified)
+    return None
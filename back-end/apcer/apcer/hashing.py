@@ -0,0 +1,120 @@
+# hashing.py
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+log = logging.getLogger(__name__)
+
+DEFAULT_ROUNDS = 12
+
+
+class HasherBusy(Exception):
+    """Antrian hashing penuh atau hashing melewati batas waktu."""
+
+
+def _hashpw(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+
+def _checkpw(password, hashed):
+    return bcrypt.checkpw(password, hashed)
+
+
+def bcrypt_cost(hashed):
+    """Cost factor dari hash bcrypt ``$2b$12$...``, None jika formatnya lain."""
+    try:
+        return int(hashed.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """
+    Hash/verifikasi bcrypt di process pool terbatas agar thread waitress
+    tidak tertahan saat banyak login bersamaan.
+
+    ``max_pending`` membatasi jumlah job yang antre/berjalan; jika penuh
+    lebih dari ``timeout`` detik, ``HasherBusy`` dilempar (view membalas 503).
+    ``workers = 0`` menjalankan bcrypt langsung di thread pemanggil.
+    """
+
+    def __init__(self, rounds=DEFAULT_ROUNDS, workers=2, max_pending=None, timeout=10.0):
+        if not 4 <= rounds <= 31:
+            raise ValueError(f"auth.bcrypt_rounds harus 4..31, bukan {rounds}")
+        self.rounds = rounds
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending or max(workers, 1) * 8)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _pool(self):
+        with self._executor_lock:
+            if self._executor is None:
+                # spawn: fork dari proses ber-thread (waitress) tidak aman
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise HasherBusy('Antrian hashing penuh')
+        if not self.workers:
+            try:
+                return func(*args)
+            finally:
+                self._slots.release()
+
+        # Slot baru dilepas saat job selesai, termasuk job yang sudah timeout,
+        # supaya antrian tidak tumbuh melebihi max_pending.
+        try:
+            future = self._pool().submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise HasherBusy('Hashing melewati batas waktu')
+        except BrokenProcessPool:
+            log.exception('Process pool hashing mati, dibuat ulang di request berikutnya')
+            self.shutdown()
+            raise HasherBusy('Process pool hashing tidak tersedia')
+
+    def hash(self, password):
+        return self._run(_hashpw, password.encode('utf-8'), self.rounds).decode('utf-8')
+
+    def verify(self, password, hashed):
+        return self._run(_checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+
+    def needs_rehash(self, hashed):
+        return bcrypt_cost(hashed) != self.rounds
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+def hasher_from_settings(settings):
+    return PasswordHasher(
+        rounds=int(settings.get('auth.bcrypt_rounds', DEFAULT_ROUNDS)),
+        workers=int(settings.get('auth.hash_workers', 2)),
+        max_pending=int(settings.get('auth.hash_max_pending', 0)) or None,
+        timeout=float(settings.get('auth.hash_timeout', 10)),
+    )
+
+
+def includeme(config):
+    """
+    Daftarkan ``PasswordHasher`` lewat ``config.include('apcer.hashing')``.
+    """
+    hasher = hasher_from_settings(config.get_settings())
+    config.registry['password_hasher'] = hasher
+    log.info('bcrypt rounds=%d, hash_workers=%d', hasher.rounds, hasher.workers)
@@ -0,0 +1,59 @@
+# hydration.py
+from sqlalchemy import and_
+from sqlalchemy.orm import aliased
+
+from .models.post import Post
+from .models.reaction import Reaction
+from .models.saved_post import SavedPost
+
+
+def empty_stats():
+    return {
+        'likes_count': 0,
+        'comments_count': 0,
+        'is_liked': False,
+        'is_saved': False,
+    }
+
+
+def hydrate_posts(dbsession, post_ids, user_id=None):
+    """
+    Mengambil jumlah like, jumlah komentar, dan flag is_liked/is_saved
+    untuk sekumpulan post sekaligus dalam SATU query.
+    Jumlah diambil dari kolom counter, flag dari outer join milik user.
+
+    Mengembalikan dict ``{post_id: {...}}``. Jumlah query tetap satu
+    berapapun banyaknya post, jadi view tidak lagi N+1.
+    """
+    post_ids = set(post_ids)
+    if not post_ids:
+        return {}
+
+    # Jumlah like/komentar dibaca dari kolom counter di Post, bukan COUNT(*).
+    query = dbsession.query(Post.id, Post.likes_count, Post.comments_count)
+
+    # Flag per-user hanya di-join jika ada user yang login.
+    # Unique constraint (user_id, post_id) menjamin maksimal satu baris per post.
+    if user_id:
+        my_reaction = aliased(Reaction)
+        my_saved = aliased(SavedPost)
+        query = query.add_columns(my_reaction.id.isnot(None), my_saved.id.isnot(None)) \
+            .outerjoin(my_reaction, and_(
+                my_reaction.post_id == Post.id,
+                my_reaction.user_id == user_id,
+                my_reaction.type == 'like',
+            )) \
+            .outerjoin(my_saved, and_(
+                my_saved.post_id == Post.id,
+                my_saved.user_id == user_id,
+            ))
+
+    stats = {}
+    for row in query.filter(Post.id.in_(post_ids)):
+        stats[row[0]] = {
+            'likes_count': row[1],
+            'comments_count': row[2],
+            'is_liked': bool(row[3]) if user_id else False,
+            'is_saved': bool(row[4]) if user_id else False,
+        }
+    return stats
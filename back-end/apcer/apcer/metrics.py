@@ -0,0 +1,293 @@
+# metrics.py
+import hmac
+import ipaddress
+import threading
+import time
+
+from pyramid.settings import asbool, aslist
+from pyramid.tweens import INGRESS
+from sqlalchemy import event
+
+from .models.pool import pool_stats
+
+# Batas atas bucket histogram (detik / jumlah statement)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SQL_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4'
+
+
+class _RouteStats:
+    __slots__ = ('requests', 'seconds', 'latency', 'sql_statements', 'sql_seconds', 'sql_count',
+                 'response_bytes', 'statuses')
+
+    def __init__(self, latency_buckets):
+        self.requests = 0
+        self.seconds = 0.0
+        self.latency = [0] * (len(latency_buckets) + 1)  # slot terakhir = +Inf
+        self.sql_statements = 0
+        self.sql_seconds = 0.0
+        self.sql_count = [0] * (len(SQL_COUNT_BUCKETS) + 1)
+        self.response_bytes = 0
+        self.statuses = {}
+
+
+def _bucket(buckets, value):
+    for i, bound in enumerate(buckets):
+        if value <= bound:
+            return i
+    return len(buckets)
+
+
+class RequestMetrics:
+    """
+    Agregat per route: latensi, jumlah dan waktu SQL, ukuran respons dan
+    status. Tiap thread menulis ke shard miliknya sendiri tanpa lock;
+    lock hanya dipakai saat thread baru mendaftarkan shard. ``collect()``
+    menjumlahkan semua shard saat /metrics dibaca.
+    """
+
+    def __init__(self, latency_buckets=LATENCY_BUCKETS):
+        self.latency_buckets = tuple(latency_buckets)
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    # Konteks SQL request yang sedang berjalan di thread ini: [jumlah, detik]
+    def begin(self):
+        self._local.sql = [0, 0.0]
+
+    def end(self):
+        sql, self._local.sql = getattr(self._local, 'sql', None), None
+        return sql or [0, 0.0]
+
+    # Waktu mulai disimpan di ExecutionContext (satu per statement), bukan
+    # di conn.info: statement yang gagal tidak memanggil after_cursor_execute
+    # dan tidak boleh meninggalkan sisa di koneksi pool.
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context.metrics_start = time.perf_counter()
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, 'metrics_start', None)
+        sql = getattr(self._local, 'sql', None)
+        if sql is not None and started is not None:
+            sql[0] += 1
+            sql[1] += time.perf_counter() - started
+
+    def instrument(self, engine):
+        event.listen(engine, 'before_cursor_execute', self.before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self.after_cursor_execute)
+
+    def record(self, route, status, seconds, sql, response_bytes):
+        shard = self._shard()
+        stats = shard.get(route)
+        if stats is None:
+            stats = shard[route] = _RouteStats(self.latency_buckets)
+        stats.requests += 1
+        stats.seconds += seconds
+        stats.latency[_bucket(self.latency_buckets, seconds)] += 1
+        stats.sql_statements += sql[0]
+        stats.sql_seconds += sql[1]
+        stats.sql_count[_bucket(SQL_COUNT_BUCKETS, sql[0])] += 1
+        stats.response_bytes += response_bytes
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def collect(self):
+        """Jumlahkan semua shard: ``{route: _RouteStats}``."""
+        with self._lock:
+            shards = list(self._shards)
+        total = {}
+        for shard in shards:
+            for route, stats in list(shard.items()):
+                merged = total.get(route)
+                if merged is None:
+                    merged = total[route] = _RouteStats(self.latency_buckets)
+                merged.requests += stats.requests
+                merged.seconds += stats.seconds
+                merged.latency = [a + b for a, b in zip(merged.latency, stats.latency)]
+                merged.sql_statements += stats.sql_statements
+                merged.sql_seconds += stats.sql_seconds
+                merged.sql_count = [a + b for a, b in zip(merged.sql_count, stats.sql_count)]
+                merged.response_bytes += stats.response_bytes
+                for status, count in list(stats.statuses.items()):
+                    merged.statuses[status] = merged.statuses.get(status, 0) + count
+        return total
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Exposition:
+    def __init__(self):
+        self.lines = []
+
+    def metric(self, name, kind, help_text):
+        self.lines.append(f'# HELP {name} {help_text}')
+        self.lines.append(f'# TYPE {name} {kind}')
+
+    def sample(self, name, value, **labels):
+        if labels:
+            text = ','.join(f'{k}="{_label(v)}"' for k, v in labels.items())
+            self.lines.append(f'{name}{{{text}}} {_number(value)}')
+        else:
+            self.lines.append(f'{name} {_number(value)}')
+
+    def histogram(self, name, buckets, counts, total, **labels):
+        cumulative = 0
+        for bound, count in zip(buckets, counts):
+            cumulative += count
+            self.sample(name + '_bucket', cumulative, **labels, le=_number(bound))
+        cumulative += counts[-1]
+        self.sample(name + '_bucket', cumulative, **labels, le='+Inf')
+        self.sample(name + '_sum', total, **labels)
+        self.sample(name + '_count', cumulative, **labels)
+
+    def text(self):
+        return '\n'.join(self.lines) + '\n'
+
+
+def render_prometheus(registry):
+    """Metrik request, pool koneksi, cache dan kompresi dalam format teks Prometheus."""
+    out = _Exposition()
+    metrics = registry.get('request_metrics')
+    routes = sorted(metrics.collect().items()) if metrics is not None else []
+
+    out.metric('apcer_http_request_duration_seconds', 'histogram', 'Latensi request per route.')
+    for route, stats in routes:
+        out.histogram('apcer_http_request_duration_seconds', metrics.latency_buckets,
+                      stats.latency, stats.seconds, route=route)
+    out.metric('apcer_http_request_sql_statements', 'histogram', 'Jumlah statement SQL per request.')
+    for route, stats in routes:
+        out.histogram('apcer_http_request_sql_statements', SQL_COUNT_BUCKETS,
+                      stats.sql_count, stats.sql_statements, route=route)
+    out.metric('apcer_sql_seconds_total', 'counter', 'Total waktu eksekusi SQL per route.')
+    for route, stats in routes:
+        out.sample('apcer_sql_seconds_total', stats.sql_seconds, route=route)
+    out.metric('apcer_http_response_bytes_total', 'counter', 'Total ukuran body respons per route.')
+    for route, stats in routes:
+        out.sample('apcer_http_response_bytes_total', stats.response_bytes, route=route)
+    out.metric('apcer_http_responses_total', 'counter', 'Jumlah respons per route dan status.')
+    for route, stats in routes:
+        for status, count in sorted(stats.statuses.items()):
+            out.sample('apcer_http_responses_total', count, route=route, status=status)
+
+    engines = [('write', registry.get('dbengine')), ('read', registry.get('dbengine.read'))]
+    pools = [(role, pool_stats(engine)) for role, engine in engines if engine is not None]
+    for key, kind, help_text in (
+        ('size', 'gauge', 'Ukuran pool koneksi.'),
+        ('checked_out', 'gauge', 'Koneksi yang sedang dipakai.'),
+        ('overflow', 'gauge', 'Koneksi overflow yang terbuka.'),
+        ('checkouts', 'counter', 'Jumlah checkout koneksi.'),
+        ('timeouts', 'counter', 'Checkout yang gagal karena pool_timeout.'),
+    ):
+        name = f'apcer_db_pool_{key}' + ('_total' if kind == 'counter' else '')
+        out.metric(name, kind, help_text)
+        for role, stats in pools:
+            if key in stats:
+                out.sample(name, stats[key], engine=role)
+    out.metric('apcer_db_pool_wait_seconds_total', 'counter', 'Total waktu menunggu checkout.')
+    for role, stats in pools:
+        if 'wait_total_ms' in stats:
+            out.sample('apcer_db_pool_wait_seconds_total', stats['wait_total_ms'] / 1000, engine=role)
+
+    cache = registry.get('response_cache')
+    if cache is not None:
+        out.metric('apcer_cache_events_total', 'counter', 'Hit, miss dan invalidasi cache respons.')
+        for event_name, count in sorted(cache.stats().items()):
+            out.sample('apcer_cache_events_total', count, event=event_name)
+
+    compressor = registry.get('compressor')
+    if compressor is not None:
+        stats = compressor.stats()
+        out.metric('apcer_compression_bytes_total', 'counter', 'Byte sebelum (in) dan sesudah (out) kompresi.')
+        out.sample('apcer_compression_bytes_total', stats['bytes_in'], direction='in')
+        out.sample('apcer_compression_bytes_total', stats['bytes_out'], direction='out')
+        out.metric('apcer_compression_cache_hits_total', 'counter', 'Body terkompresi yang diambil dari cache.')
+        out.sample('apcer_compression_cache_hits_total', stats['cache_hits'])
+
+    writer = registry.get('db_writer')
+    if writer is not None:
+        stats = writer.stats()
+        out.metric('apcer_writer_batches_total', 'counter', 'Batch commit writer.')
+        out.sample('apcer_writer_batches_total', stats['batches'])
+        out.metric('apcer_writer_jobs_total', 'counter', 'Job tulis yang diproses writer.')
+        out.sample('apcer_writer_jobs_total', stats['jobs'])
+        out.metric('apcer_writer_queued', 'gauge', 'Job yang sedang antre di writer.')
+        out.sample('apcer_writer_queued', stats['queued'])
+    return out.text()
+
+
+def metrics_allowed(request):
+    """
+    Endpoint metrik hanya untuk IP di ``metrics.allowed_ips`` (alamat atau
+    jaringan, mis. ``127.0.0.1 10.0.0.0/8``) atau request dengan header
+    ``Authorization: Bearer <metrics.token>``. Keduanya kosong = tertutup.
+    """
+    settings = request.registry.settings
+    token = settings.get('metrics.token')
+    if token and hmac.compare_digest(
+            request.headers.get('Authorization', '').encode('utf-8'), f'Bearer {token}'.encode('utf-8')):
+        return True
+    networks = aslist(settings.get('metrics.allowed_ips', ''))
+    if not networks or not request.remote_addr:
+        return False
+    try:
+        address = ipaddress.ip_address(request.remote_addr)
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network, strict=False) for network in networks)
+
+
+def metrics_from_settings(settings):
+    if not asbool(settings.get('metrics.enabled', True)):
+        return None
+    buckets = aslist(settings.get('metrics.latency_buckets', ''))
+    return RequestMetrics([float(b) for b in buckets] if buckets else LATENCY_BUCKETS)
+
+
+def metrics_tween_factory(handler, registry):
+    metrics = metrics_from_settings(registry.settings)
+    registry['request_metrics'] = metrics
+    if metrics is None:
+        return handler
+    # Statement SQL dari thread writer (writer.enabled) tidak masuk hitungan route
+    for name in ('dbengine', 'dbengine.read'):
+        engine = registry.get(name)
+        if engine is not None:
+            metrics.instrument(engine)
+
+    def metrics_tween(request):
+        started = time.perf_counter()
+        metrics.begin()
+        status, size = 500, 0
+        try:
+            response = handler(request)
+            status, size = response.status_code, response.content_length or 0
+            return response
+        finally:
+            route = request.matched_route.name if request.matched_route is not None else 'notfound'
+            metrics.record(route, status, time.perf_counter() - started, metrics.end(), size)
+
+    return metrics_tween
+
+
+def includeme(config):
+    """
+    Metrik per route lewat ``config.include('apcer.metrics')``; tween paling
+    luar sehingga latensi dan ukuran respons mencakup kompresi.
+    """
+    config.add_tween('apcer.metrics.metrics_tween_factory', under=INGRESS)
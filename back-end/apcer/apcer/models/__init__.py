@@ -11,6 +11,20 @@ from .post import Post  # Import Post model
 from .reaction import Reaction  # Import Reaction model
 from .saved_post import SavedPost  # Import SavedPost model
 from .comment import Comment  # Import Comment model
+from .sequence import NamedSequence  # Import NamedSequence model
+from . import counters  # Event penjaga likes_count/comments_count
+from . import search  # DDL index full-text posts (FTS5 / tsvector)
+from .pragmas import sqlite_pragmas, apply_sqlite_pragmas, log_active_pragmas
+from .pool import InstrumentedQueuePool, uses_queue_pool
+from .slowlog import slow_query_log_from_settings
+from .routing import engine_prefix, engine_options, sticky_seconds, is_sticky, note_write, track_writes
+from .readonly import (
+    get_read_only_session_factory,
+    get_read_only_session,
+    is_read_only_request,
+    read_only_enabled,
+    tm_activate_hook,
+)
 
 # run configure_mappers after defining all of the models to ensure
 # all relationships can be setup
@@ -18,7 +32,25 @@ configure_mappers()
 
 
 def get_engine(settings, prefix='sqlalchemy.'):
-    return engine_from_config(settings, prefix)
+    # prefix 'sqlalchemy.read.' / 'sqlalchemy.write.' mewarisi opsi 'sqlalchemy.*'
+    options = engine_options(settings, prefix)
+    kw = {}
+    # Pool yang mengukur waktu tunggu checkout (lihat models/pool.py);
+    # pool_size/max_overflow/pool_recycle/pool_pre_ping dibaca dari settings
+    if 'sqlalchemy.poolclass' not in options and uses_queue_pool(options['sqlalchemy.url']):
+        kw['poolclass'] = InstrumentedQueuePool
+    engine = engine_from_config(options, 'sqlalchemy.', **kw)
+    # Profil pragma SQLite (WAL, synchronous, mmap, ...) dari setting sqlite.*
+    pragmas = sqlite_pragmas(settings)
+    if engine.url.query.get('mode') == 'ro':
+        # journal_mode tidak bisa diubah lewat koneksi read-only
+        pragmas.pop('journal_mode', None)
+    apply_sqlite_pragmas(engine, pragmas)
+    # Log query lambat + EXPLAIN jika db.slow_query_ms diisi (lihat models/slowlog.py)
+    slow_log = slow_query_log_from_settings(settings)
+    if slow_log is not None:
+        slow_log.install(engine)
+    return engine
 
 
 def get_session_factory(engine):
@@ -63,6 +95,9 @@ def includeme(config):
     """
     settings = config.get_settings()
     settings['tm.manager_hook'] = 'pyramid_tm.explicit_manager'
+    if read_only_enabled(settings):
+        # GET/HEAD/OPTIONS dilayani tanpa transaksi pyramid_tm (lihat models/readonly.py)
+        settings['tm.activate_hook'] = tm_activate_hook
 
     # use pyramid_tm to hook the transaction lifecycle to the request
     config.include('pyramid_tm')
@@ -70,13 +105,37 @@ def includeme(config):
     # use pyramid_retry to retry a request when transient exceptions occur
     config.include('pyramid_retry')
 
-    session_factory = get_session_factory(get_engine(settings))
+    # Satu engine (dan satu pool) per peran. Tanpa sqlalchemy.read.url
+    # baca dan tulis memakai engine yang sama.
+    engine = get_engine(settings, engine_prefix(settings, 'write'))
+    config.registry['dbengine'] = engine
+    log_active_pragmas(engine)
+    session_factory = get_session_factory(engine)
     config.registry['dbsession_factory'] = session_factory
 
-    # make request.dbsession available for use in Pyramid
-    config.add_request_method(
+    read_only_factory = primary_read_factory = get_read_only_session_factory(engine)
+    routed = engine_prefix(settings, 'read') != engine_prefix(settings, 'write')
+    if routed:
+        read_engine = get_engine(settings, engine_prefix(settings, 'read'))
+        config.registry['dbengine.read'] = read_engine
+        read_only_factory = get_read_only_session_factory(read_engine)
+    config.registry['db_sticky_seconds'] = sticky_seconds(settings) if routed else None
+    if routed:
+        track_writes(session_factory)
+
+    def dbsession(request):
+        if is_read_only_request(request):
+            # Read-your-writes: setelah user menulis, bacaannya ke engine tulis
+            # selama db.read_your_writes_seconds (replika mungkin tertinggal)
+            factory = primary_read_factory if routed and is_sticky(request) else read_only_factory
+            return get_read_only_session(factory, request)
+
         # r.tm is the transaction manager used by pyramid_tm
-        lambda r: get_tm_session(session_factory, r.tm),
-        'dbsession',
-        reify=True
-    )
+        session = get_tm_session(session_factory, request.tm)
+        if routed:
+            request.tm.get().addAfterCommitHook(
+                lambda success: success and session.info.get('wrote') and note_write(request))
+        return session
+
+    # make request.dbsession available for use in Pyramid
+    config.add_request_method(dbsession, 'dbsession', reify=True)
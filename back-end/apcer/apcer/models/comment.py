@@ -1,8 +1,8 @@
 # models/comment.py
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from .meta import Base # Sesuaikan import Base jika path berbeda
+from .meta import Base, Timestamp # Sesuaikan import Base jika path berbeda
 
 class Comment(Base):
     __tablename__ = 'comments'
@@ -11,10 +11,16 @@ class Comment(Base):
     post_id = Column(Integer, ForeignKey('posts.id'), nullable=False)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     content = Column(Text, nullable=False)
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
     updated_at = Column(DateTime, onupdate=func.now())
     is_deleted = Column(Boolean, default=False, nullable=False)
 
+    # Index parsial untuk daftar komentar per post (urut created_at, id)
+    __table_args__ = (
+        Index('ix_comments_post_feed', 'post_id', 'created_at', 'id',
+              sqlite_where=is_deleted == False, postgresql_where=is_deleted == False),
+    )
+
     # Relasi: Komentar dibuat pada satu postingan, oleh satu user
     post = relationship('Post', back_populates='comments')
     user = relationship('User', back_populates='comments')
@@ -0,0 +1,106 @@
+# models/counters.py
+from sqlalchemy import event, func, select, update
+from sqlalchemy.orm.attributes import get_history
+
+from .post import Post
+from .reaction import Reaction
+from .comment import Comment
+
+posts = Post.__table__
+
+
+def _bump(connection, post_id, column, delta):
+    connection.execute(
+        update(posts)
+        .where(posts.c.id == post_id)
+        .values({column: posts.c[column] + delta})
+    )
+
+
+# Event dijalankan di dalam flush, jadi counter ikut transaksi yang sama
+# dengan toggle like, tambah komentar, dan soft-delete komentar.
+@event.listens_for(Reaction, 'after_insert')
+def _reaction_inserted(mapper, connection, target):
+    if target.type == 'like':
+        _bump(connection, target.post_id, 'likes_count', 1)
+
+
+@event.listens_for(Reaction, 'after_delete')
+def _reaction_deleted(mapper, connection, target):
+    if target.type == 'like':
+        _bump(connection, target.post_id, 'likes_count', -1)
+
+
+@event.listens_for(Comment, 'after_insert')
+def _comment_inserted(mapper, connection, target):
+    if not target.is_deleted:
+        _bump(connection, target.post_id, 'comments_count', 1)
+
+
+@event.listens_for(Comment, 'after_update')
+def _comment_updated(mapper, connection, target):
+    history = get_history(target, 'is_deleted')
+    if not history.has_changes():
+        return
+    was_deleted = bool(history.deleted and history.deleted[0])
+    if was_deleted != bool(target.is_deleted):
+        _bump(connection, target.post_id, 'comments_count', -1 if target.is_deleted else 1)
+
+
+@event.listens_for(Comment, 'after_delete')
+def _comment_deleted(mapper, connection, target):
+    if not target.is_deleted:
+        _bump(connection, target.post_id, 'comments_count', -1)
+
+
+def _expected_counts():
+    likes = (select(func.count(Reaction.id))
+             .where(Reaction.post_id == posts.c.id, Reaction.type == 'like')
+             .scalar_subquery())
+    comments = (select(func.count(Comment.id))
+                .where(Comment.post_id == posts.c.id, Comment.is_deleted == False)
+                .scalar_subquery())
+    return likes, comments
+
+
+def recount_post_counters(dbsession, batch_size=1000, dry_run=False, commit=None):
+    """
+    Menghitung ulang likes_count/comments_count per batch id post dan
+    memperbaiki baris yang nilainya menyimpang (drift).
+
+    Hitungan dan penulisan dilakukan dalam SATU ``UPDATE`` per batch, jadi
+    like/komentar yang masuk di antara keduanya tidak tertimpa nilai basi.
+    ``commit`` (jika ada) dipanggil setelah tiap batch agar lock dan
+    transaksi tidak ditahan selama seluruh tabel diperiksa.
+
+    Mengembalikan tuple ``(jumlah_post_diperiksa, jumlah_post_diperbaiki)``.
+    """
+    likes, comments = _expected_counts()
+    drifted = (posts.c.likes_count != likes) | (posts.c.comments_count != comments)
+    checked = repaired = 0
+    last_id = 0
+    while True:
+        ids = dbsession.execute(
+            select(posts.c.id)
+            .where(posts.c.id > last_id)
+            .order_by(posts.c.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            break
+        in_batch = posts.c.id.between(ids[0], ids[-1])
+        if dry_run:
+            repaired += dbsession.execute(
+                select(func.count()).select_from(posts).where(in_batch, drifted)
+            ).scalar()
+        else:
+            repaired += dbsession.execute(
+                update(posts)
+                .where(in_batch, drifted)
+                .values(likes_count=likes, comments_count=comments)
+            ).rowcount
+            if commit is not None:
+                commit()
+        checked += len(ids)
+        last_id = ids[-1]
+    return checked, repaired
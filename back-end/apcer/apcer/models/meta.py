@@ -1,5 +1,7 @@
 # meta.py
 from pyramid_sqlalchemy import BaseObject, Session
+from sqlalchemy import DateTime
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.schema import MetaData
 
 NAMING_CONVENTION = {
@@ -12,5 +14,11 @@ NAMING_CONVENTION = {
 
 metadata = MetaData(naming_convention=NAMING_CONVENTION)
 
+# SQLite menyimpan DATETIME sebagai teks. CURRENT_TIMESTAMP (server_default)
+# tidak punya mikrodetik, sedangkan parameter dari SQLAlchemy selalu ".000000",
+# sehingga perbandingan keyset (created_at, id) jadi tidak konsisten.
+# Samakan formatnya dengan membuang mikrodetik khusus di SQLite.
+Timestamp = DateTime().with_variant(sqlite.DATETIME(truncate_microseconds=True), 'sqlite')
+
 # Ganti deklarasi Base seperti ini
 Base = type("Base", (BaseObject,), {"__abstract__": True, "metadata": metadata})
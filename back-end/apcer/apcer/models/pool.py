@@ -0,0 +1,89 @@
+# models/pool.py
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+
+class PoolMetrics:
+    """Akumulasi waktu tunggu checkout koneksi dari pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, seconds, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_total_ms': self.wait_total * 1000,
+                'wait_avg_ms': self.wait_total * 1000 / self.checkouts if self.checkouts else 0.0,
+                'wait_max_ms': self.wait_max * 1000,
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool yang mengukur lama ``_do_get`` (menunggu koneksi bebas atau
+    membuka koneksi baru). Metrik tetap terbawa saat pool dibuat ulang
+    (``engine.dispose()``).
+    """
+
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def uses_queue_pool(url):
+    """SQLite :memory: memakai pool khusus per thread; selain itu QueuePool."""
+    url = make_url(url)
+    if url.get_backend_name() == 'sqlite':
+        return url.database not in (None, '', ':memory:') and url.query.get('mode') != 'memory'
+    return True
+
+
+def pool_stats(engine):
+    pool = engine.pool
+    stats = {'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        capacity = pool.size() + max(pool._max_overflow, 0)
+        stats.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'overflow': max(pool.overflow(), 0),
+            'utilisation': pool.checkedout() / capacity if capacity else 0.0,
+        })
+    metrics = getattr(pool, 'metrics', None)
+    if metrics is not None:
+        stats.update(metrics.snapshot())
+    return stats
@@ -1,8 +1,8 @@
 # models/post.py
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from .meta import Base # Sesuaikan import Base jika path berbeda
+from .meta import Base, Timestamp # Sesuaikan import Base jika path berbeda
 
 class Post(Base):
     __tablename__ = 'posts'
@@ -10,10 +10,24 @@ class Post(Base):
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     content = Column(Text, nullable=False)
-    created_at = Column(DateTime, server_default=func.now())
+    created_at = Column(Timestamp, server_default=func.now())
     updated_at = Column(DateTime, onupdate=func.now()) # Otomatis update saat record diubah
     is_deleted = Column(Boolean, default=False, nullable=False)
 
+    # Counter ter-denormalisasi, dijaga oleh event di models/counters.py.
+    # Perbaiki drift dengan console script `reconcile_apcer_counters`.
+    likes_count = Column(Integer, default=0, server_default='0', nullable=False)
+    comments_count = Column(Integer, default=0, server_default='0', nullable=False)
+
+    # Index parsial (hanya post yang belum dihapus) untuk feed /posts dan /posts/mine.
+    # Kolom id ikut di index agar seek keyset (created_at, id) tidak perlu sort.
+    __table_args__ = (
+        Index('ix_posts_feed', 'created_at', 'id',
+              sqlite_where=is_deleted == False, postgresql_where=is_deleted == False),
+        Index('ix_posts_user_feed', 'user_id', 'created_at', 'id',
+              sqlite_where=is_deleted == False, postgresql_where=is_deleted == False),
+    )
+
     # Relasi: Postingan dimiliki oleh satu user
     user = relationship('User', back_populates='posts')
 
@@ -0,0 +1,74 @@
+# models/pragmas.py
+import logging
+import re
+
+from sqlalchemy import event
+
+log = logging.getLogger(__name__)
+
+# Profil default untuk SQLite berbasis file. Bisa diubah per pragma lewat
+# setting ``sqlite.<nama>``; nilai kosong berarti pragma itu tidak disentuh.
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',        # pembaca tidak terblokir penulis
+    'synchronous': 'NORMAL',      # aman di WAL, fsync hanya saat checkpoint
+    'mmap_size': '268435456',     # 256 MB dibaca lewat mmap
+    'cache_size': '-65536',       # negatif = KiB, jadi 64 MB per koneksi
+    'temp_store': 'MEMORY',
+    'busy_timeout': '5000',       # ms menunggu lock sebelum "database is locked"
+    'foreign_keys': 'ON',
+}
+
+_VALUE = re.compile(r'^-?\w+$')
+
+
+def sqlite_pragmas(settings, prefix='sqlite.'):
+    """Pragma yang akan dipasang, dari DEFAULT_PRAGMAS ditimpa settings."""
+    pragmas = {}
+    for name, default in DEFAULT_PRAGMAS.items():
+        value = str(settings.get(prefix + name, default)).strip()
+        if not value:
+            continue
+        if not _VALUE.match(value):
+            raise ValueError(f"Nilai {prefix}{name} tidak valid: {value!r}")
+        pragmas[name] = value
+    return pragmas
+
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """
+    Pasang pragma di setiap koneksi baru pool. Engine non-SQLite diabaikan.
+    """
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+
+def active_pragmas(engine):
+    """Nilai pragma yang benar-benar aktif di satu koneksi (untuk log startup)."""
+    if engine.dialect.name != 'sqlite':
+        return {}
+    with engine.connect() as connection:
+        cursor = connection.connection.cursor()
+        try:
+            pragmas = {}
+            for name in DEFAULT_PRAGMAS:
+                row = cursor.execute(f'PRAGMA {name}').fetchone()
+                pragmas[name] = row[0] if row else None  # mis. mmap_size di :memory:
+            return pragmas
+        finally:
+            cursor.close()
+
+
+def log_active_pragmas(engine):
+    pragmas = active_pragmas(engine)
+    if pragmas:
+        log.info('SQLite pragma aktif: %s', ', '.join(f'{k}={v}' for k, v in pragmas.items()))
+    return pragmas
@@ -1,5 +1,5 @@
 # models/reaction.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .meta import Base # Sesuaikan import Base jika path berbeda
@@ -14,7 +14,11 @@ class Reaction(Base):
     created_at = Column(DateTime, server_default=func.now())
 
     # Pastikan satu user hanya bisa mereaksi satu postingan sekali
-    __table_args__ = (UniqueConstraint('user_id', 'post_id', name='_user_post_uc'),)
+    # Index (post_id, type) untuk hitung ulang likes_count per post
+    __table_args__ = (
+        UniqueConstraint('user_id', 'post_id', name='_user_post_uc'),
+        Index('ix_reactions_post_type', 'post_id', 'type'),
+    )
 
     # Relasi: Reaksi dibuat oleh satu user, untuk satu postingan
     user = relationship('User', back_populates='reactions')
@@ -0,0 +1,57 @@
+# models/readonly.py
+from pyramid.settings import asbool
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+# Method HTTP yang tidak boleh mengubah data
+SAFE_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS'))
+
+
+class ReadOnlySessionError(RuntimeError):
+    """Ada perubahan yang akan di-flush lewat session read-only."""
+
+
+def _reject_flush(session, flush_context, instances):
+    raise ReadOnlySessionError(
+        'request.dbsession read-only untuk GET/HEAD/OPTIONS; '
+        'ubah data lewat POST/PUT/DELETE')
+
+
+def get_read_only_session_factory(engine):
+    """
+    Session tanpa pyramid_tm/zope: tanpa autoflush dan flush ditolak.
+
+    Di selain SQLite koneksi dipakai dalam AUTOCOMMIT agar tidak ada
+    BEGIN/ROLLBACK per request. pysqlite memang tidak membuka transaksi
+    untuk SELECT, dan mengganti isolation level per checkout justru
+    lebih mahal, jadi SQLite dibiarkan.
+    """
+    if engine.dialect.name != 'sqlite':
+        engine = engine.execution_options(isolation_level='AUTOCOMMIT')
+    factory = sessionmaker(
+        bind=engine,
+        autoflush=False,
+        info={'read_only': True},
+    )
+    event.listen(factory, 'before_flush', _reject_flush)
+    return factory
+
+
+def read_only_enabled(settings):
+    return asbool(settings.get('db.read_only_get', True))
+
+
+def is_read_only_request(request):
+    return request.method in SAFE_METHODS and read_only_enabled(request.registry.settings)
+
+
+def tm_activate_hook(request):
+    """``tm.activate_hook``: pyramid_tm hanya aktif untuk method yang menulis."""
+    return not is_read_only_request(request)
+
+
+def get_read_only_session(session_factory, request):
+    dbsession = session_factory()
+    # Kembalikan koneksi ke pool begitu request selesai
+    request.add_finished_callback(lambda r: dbsession.close())
+    return dbsession
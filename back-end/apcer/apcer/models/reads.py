@@ -0,0 +1,134 @@
+# models/reads.py
+from sqlalchemy import Integer, bindparam, select
+
+from .user import User
+from .post import Post
+from .comment import Comment
+from ..pagination import keyset
+
+# Jalur baca feed/detail tanpa ORM: select Core hanya kolom yang dipakai
+# view, baris langsung dijadikan record __slots__ (tanpa identity map,
+# instance state, maupun event load). Semua statement dibuat SEKALI saat
+# import dengan bindparam, sehingga cache key dan hasil compile-nya
+# (compiled_cache engine) dipakai ulang antar request.
+
+posts = Post.__table__
+users = User.__table__
+comments = Comment.__table__
+
+LIMIT = bindparam('limit', type_=Integer)
+CURSOR = (bindparam('cursor_created_at', type_=posts.c.created_at.type),
+          bindparam('cursor_id', type_=Integer))
+
+
+class UserRow:
+    __slots__ = ('id', 'username', 'email')
+
+    def __init__(self, id, username, email):
+        self.id = id
+        self.username = username
+        self.email = email
+
+
+class PostRow:
+    __slots__ = ('id', 'user_id', 'content', 'created_at', 'updated_at', 'user')
+
+    def __init__(self, id, user_id, content, created_at, updated_at, user=None):
+        self.id = id
+        self.user_id = user_id
+        self.content = content
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.user = user
+
+
+class CommentRow:
+    __slots__ = ('id', 'user_id', 'content', 'created_at', 'updated_at', 'user')
+
+    def __init__(self, id, user_id, content, created_at, updated_at, user=None):
+        self.id = id
+        self.user_id = user_id
+        self.content = content
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.user = user
+
+
+POST_COLUMNS = (posts.c.id, posts.c.user_id, posts.c.content, posts.c.created_at, posts.c.updated_at)
+COMMENT_COLUMNS = (comments.c.id, comments.c.user_id, comments.c.content,
+                   comments.c.created_at, comments.c.updated_at)
+USER_COLUMNS = (users.c.id, users.c.username, users.c.email)
+
+
+def _with_users(columns, table, with_users):
+    if not with_users:
+        return select(*columns)
+    return select(*columns, *USER_COLUMNS).select_from(table.join(users, users.c.id == table.c.user_id))
+
+
+def _feed_statement(with_users, by_author, after_cursor):
+    stmt = _with_users(POST_COLUMNS, posts, with_users).where(posts.c.is_deleted == False)
+    if by_author:
+        stmt = stmt.where(posts.c.user_id == bindparam('author_id'))
+    return keyset(stmt, posts.c.created_at, posts.c.id, CURSOR if after_cursor else None, LIMIT)
+
+
+def _comments_statement(with_users, after_cursor):
+    stmt = _with_users(COMMENT_COLUMNS, comments, with_users) \
+        .where(comments.c.post_id == bindparam('post_id'), comments.c.is_deleted == False)
+    return keyset(stmt, comments.c.created_at, comments.c.id, CURSOR if after_cursor else None, LIMIT,
+                  descending=False)
+
+
+_FLAGS = (False, True)
+FEED_STATEMENTS = {
+    (with_users, by_author, after_cursor): _feed_statement(with_users, by_author, after_cursor)
+    for with_users in _FLAGS for by_author in _FLAGS for after_cursor in _FLAGS
+}
+COMMENT_STATEMENTS = {
+    (with_users, after_cursor): _comments_statement(with_users, after_cursor)
+    for with_users in _FLAGS for after_cursor in _FLAGS
+}
+POST_STATEMENTS = {
+    with_users: _with_users(POST_COLUMNS, posts, with_users)
+    .where(posts.c.id == bindparam('post_id'), posts.c.is_deleted == False)
+    for with_users in _FLAGS
+}
+
+
+def _params(cursor, limit, **params):
+    # keyset() mengambil limit + 1 baris untuk mendeteksi halaman berikutnya
+    params['limit'] = limit
+    if cursor:
+        params['cursor_created_at'], params['cursor_id'] = cursor
+    return params
+
+
+def _records(result, record, with_users):
+    if not with_users:
+        return [record(*row) for row in result]
+    return [record(id, user_id, content, created_at, updated_at, UserRow(uid, username, email))
+            for id, user_id, content, created_at, updated_at, uid, username, email in result]
+
+
+def select_posts(dbsession, cursor, limit, author_id=None, with_users=True):
+    """
+    Satu halaman feed (``limit + 1`` PostRow, urut terbaru) untuk
+    ``split_page``; ``author_id`` membatasi ke post milik satu user.
+    """
+    stmt = FEED_STATEMENTS[with_users, author_id is not None, cursor is not None]
+    result = dbsession.execute(stmt, _params(cursor, limit, author_id=author_id))
+    return _records(result, PostRow, with_users)
+
+
+def select_post(dbsession, post_id, with_users=True):
+    result = dbsession.execute(POST_STATEMENTS[with_users], {'post_id': int(post_id)})
+    rows = _records(result, PostRow, with_users)
+    return rows[0] if rows else None
+
+
+def select_comments(dbsession, post_id, cursor, limit, with_users=True):
+    """Satu halaman komentar (``limit + 1`` CommentRow, urut terlama)."""
+    stmt = COMMENT_STATEMENTS[with_users, cursor is not None]
+    result = dbsession.execute(stmt, _params(cursor, limit, post_id=int(post_id)))
+    return _records(result, CommentRow, with_users)
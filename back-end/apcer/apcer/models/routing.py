@@ -0,0 +1,64 @@
+# models/routing.py
+import time
+
+from sqlalchemy import event
+
+BASE_PREFIX = 'sqlalchemy.'
+
+# Key di request.session: sampai kapan pembacaan user diarahkan ke engine tulis
+STICKY_KEY = '_db_primary_until'
+
+
+def engine_prefix(settings, role):
+    """
+    Prefix setting engine untuk ``role`` ('read' / 'write'):
+    ``sqlalchemy.<role>.`` jika ``sqlalchemy.<role>.url`` ada, selain itu
+    ``sqlalchemy.`` (satu engine untuk baca dan tulis).
+    """
+    prefix = f'{BASE_PREFIX}{role}.'
+    return prefix if prefix + 'url' in settings else BASE_PREFIX
+
+
+def engine_options(settings, prefix=BASE_PREFIX):
+    """
+    Setting ``sqlalchemy.*`` untuk satu engine. Opsi umum (pool_size, ...)
+    berlaku untuk semua engine dan bisa ditimpa per prefix
+    ``sqlalchemy.read.`` / ``sqlalchemy.write.``.
+    """
+    options = {
+        key: value for key, value in settings.items()
+        if key.startswith(BASE_PREFIX) and '.' not in key[len(BASE_PREFIX):]
+    }
+    if prefix != BASE_PREFIX:
+        options.update({
+            BASE_PREFIX + key[len(prefix):]: value for key, value in settings.items()
+            if key.startswith(prefix)
+        })
+    return options
+
+
+def sticky_seconds(settings):
+    return float(settings.get('db.read_your_writes_seconds', 5))
+
+
+def mark_sticky(request, seconds):
+    request.session[STICKY_KEY] = time.time() + seconds
+
+
+def note_write(request):
+    """Tandai user baru saja menulis (hanya jika baca/tulis dipisah)."""
+    seconds = request.registry.get('db_sticky_seconds')
+    if seconds:
+        mark_sticky(request, seconds)
+
+
+def track_writes(session_factory):
+    """``session.info['wrote']`` diisi saat session benar-benar mem-flush perubahan."""
+    @event.listens_for(session_factory, 'after_flush')
+    def flushed(session, flush_context):
+        session.info['wrote'] = True
+
+
+def is_sticky(request):
+    until = request.session.get(STICKY_KEY)
+    return until is not None and until > time.time()
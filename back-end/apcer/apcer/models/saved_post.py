@@ -1,8 +1,8 @@
 # models/saved_post.py
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from .meta import Base # Sesuaikan import Base jika path berbeda
+from .meta import Base, Timestamp # Sesuaikan import Base jika path berbeda
 
 class SavedPost(Base):
     __tablename__ = 'saved_posts'
@@ -10,10 +10,14 @@ class SavedPost(Base):
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     post_id = Column(Integer, ForeignKey('posts.id'), nullable=False)
-    saved_at = Column(DateTime, server_default=func.now())
+    saved_at = Column(Timestamp, server_default=func.now())
 
     # Pastikan satu user hanya bisa menyimpan satu postingan sekali
-    __table_args__ = (UniqueConstraint('user_id', 'post_id', name='_user_saved_post_uc'),)
+    # Index (user_id, saved_at, id) untuk halaman /posts/saved
+    __table_args__ = (
+        UniqueConstraint('user_id', 'post_id', name='_user_saved_post_uc'),
+        Index('ix_saved_posts_user_saved_at', 'user_id', 'saved_at', 'id'),
+    )
 
     # Relasi: SavedPost dibuat oleh satu user, untuk satu postingan
     user = relationship('User', back_populates='saved_posts')
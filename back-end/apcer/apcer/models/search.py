@@ -0,0 +1,129 @@
+# models/search.py
+import logging
+import re
+
+from sqlalchemy import DDL, event, text
+
+from .post import Post
+
+log = logging.getLogger(__name__)
+
+# Batas kedalaman halaman hasil search: skor dihitung ulang tiap halaman
+MAX_OFFSET = 1000
+MAX_TERMS = 8
+
+# SQLite: index FTS5 "external content" atas posts.content (teks tidak
+# disimpan dua kali), dijaga trigger. prefix='2 3' mempercepat pencarian
+# awalan kata ("kamp*"). Post yang di-soft-delete disaring saat query.
+SQLITE_CREATE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5("
+    "content, content='posts', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN "
+    "INSERT INTO posts_fts(rowid, content) VALUES (new.id, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, content) VALUES ('delete', old.id, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS posts_fts_au AFTER UPDATE OF content ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, content) VALUES ('delete', old.id, old.content); "
+    "INSERT INTO posts_fts(rowid, content) VALUES (new.id, new.content); END",
+)
+SQLITE_DROP = (
+    "DROP TRIGGER IF EXISTS posts_fts_au",
+    "DROP TRIGGER IF EXISTS posts_fts_ad",
+    "DROP TRIGGER IF EXISTS posts_fts_ai",
+    "DROP TABLE IF EXISTS posts_fts",
+)
+
+# Postgres: index GIN atas ekspresi tsvector; dijaga otomatis oleh Postgres.
+# Konfigurasi 'simple' karena konten berbahasa Indonesia (tanpa stemming).
+POSTGRES_CREATE = (
+    "CREATE INDEX IF NOT EXISTS ix_posts_content_fts ON posts "
+    "USING gin (to_tsvector('simple', content)) WHERE is_deleted = false",
+)
+POSTGRES_DROP = ("DROP INDEX IF EXISTS ix_posts_content_fts",)
+
+for _statement in SQLITE_CREATE:
+    event.listen(Post.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+for _statement in POSTGRES_CREATE:
+    event.listen(Post.__table__, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
+for _statement in SQLITE_DROP:
+    event.listen(Post.__table__, 'before_drop', DDL(_statement).execute_if(dialect='sqlite'))
+
+_TERM = re.compile(r'\w+', re.UNICODE)
+
+
+def search_terms(query):
+    return _TERM.findall((query or '').lower())[:MAX_TERMS]
+
+
+def fts5_query(terms):
+    """
+    Ubah kata-kata user menjadi query FTS5 yang aman: tiap kata di-quote
+    (operator/tanda kutip dari input tidak ditafsirkan), semua kata wajib
+    ada, kata terakhir dicocokkan sebagai awalan (search sambil mengetik).
+    """
+    quoted = [f'"{term}"' for term in terms]
+    if quoted and len(terms[-1]) >= 2:
+        quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+SQLITE_SEARCH = text(
+    "SELECT posts_fts.rowid AS id FROM posts_fts "
+    "JOIN posts ON posts.id = posts_fts.rowid "
+    "WHERE posts_fts MATCH :match AND posts.is_deleted = 0 "
+    "ORDER BY posts_fts.rank, posts_fts.rowid DESC LIMIT :limit OFFSET :offset"
+)
+POSTGRES_SEARCH = text(
+    "SELECT posts.id AS id FROM posts, plainto_tsquery('simple', :query) AS q "
+    "WHERE posts.is_deleted = false AND to_tsvector('simple', posts.content) @@ q "
+    "ORDER BY ts_rank(to_tsvector('simple', posts.content), q) DESC, posts.id DESC "
+    "LIMIT :limit OFFSET :offset"
+)
+
+
+def search_post_ids(dbsession, query, limit, offset=0):
+    """
+    Id post yang cocok dengan ``query``, urut relevansi (bm25 di SQLite,
+    ts_rank di Postgres), yang terbaru lebih dulu jika skornya sama.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+    dialect = dbsession.get_bind().dialect.name
+    if dialect == 'sqlite':
+        stmt, params = SQLITE_SEARCH, {'match': fts5_query(terms)}
+    elif dialect == 'postgresql':
+        stmt, params = POSTGRES_SEARCH, {'query': ' '.join(terms)}
+    else:
+        # Tanpa index full-text: cocokkan semua kata dengan LIKE
+        filters = [Post.content.ilike(f'%{term}%') for term in terms]
+        return [post_id for post_id, in dbsession.query(Post.id)
+                .filter(Post.is_deleted == False, *filters)
+                .order_by(Post.id.desc()).limit(limit).offset(offset)]
+    rows = dbsession.execute(stmt, {**params, 'limit': limit, 'offset': offset})
+    return [row.id for row in rows]
+
+
+def rebuild_search_index(connection):
+    """
+    Bangun ulang index dari isi tabel posts (misalnya untuk data lama
+    sebelum migrasi, atau setelah bulk load). Membuat index jika belum ada.
+
+    Dialect lain tidak punya index full-text (search memakai LIKE), jadi
+    tidak ada yang dibangun: mengembalikan False, selain itu True.
+    """
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_CREATE:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql("INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')")
+        connection.exec_driver_sql("INSERT INTO posts_fts(posts_fts) VALUES ('optimize')")
+    elif dialect == 'postgresql':
+        for statement in POSTGRES_CREATE:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql("REINDEX INDEX ix_posts_content_fts")
+    else:
+        log.info('Tidak ada index full-text untuk %s; search memakai LIKE', dialect)
+        return False
+    return True
@@ -0,0 +1,67 @@
+# models/sequence.py
+import re
+
+from sqlalchemy import Column, Integer, String, select, update, insert
+from sqlalchemy.exc import IntegrityError
+from .meta import Base
+
+ANON_USERNAME = 'anon_username'
+ANON_PREFIX = 'Anonim #'
+_ANON_NUMBER = re.compile(r'Anonim #(\d+)$')
+
+
+class NamedSequence(Base):
+    """
+    Penghitung bernama yang dinaikkan secara atomik, dipakai untuk
+    nomor "Anonim #N" tanpa COUNT(*) pada tabel users.
+    """
+    __tablename__ = 'sequences'
+
+    name = Column(String(50), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<NamedSequence(name='{self.name}', value={self.value})>"
+
+
+def _seed(name, dbsession):
+    # Hanya sekali per sequence (baris belum ada, mis. DB dari create_all)
+    if name == ANON_USERNAME:
+        # Nomor terbesar yang sudah terpakai, bukan COUNT(*): user yang
+        # dihapus atau berganti nama meninggalkan celah pada penomoran.
+        from .user import User
+        usernames = dbsession.execute(
+            select(User.username).where(User.username.like(ANON_PREFIX + '%'))).scalars()
+        return max((int(m.group(1)) for m in map(_ANON_NUMBER.match, usernames) if m), default=0)
+    return 0
+
+
+def next_value(dbsession, name, count=1):
+    """
+    Ambil nomor berikutnya dari sequence ``name``. Dengan ``count`` > 1,
+    satu blok nomor dipesan sekaligus dan yang dikembalikan nomor terakhirnya
+    (blok = ``value - count + 1`` s.d. ``value``).
+
+    Satu ``UPDATE ... RETURNING`` pada satu baris: baris terkunci sampai
+    transaksi selesai sehingga dua request tidak pernah mendapat nomor sama.
+    """
+    table = NamedSequence.__table__
+    stmt = update(table).where(table.c.name == name).values(value=table.c.value + count)
+    returning = dbsession.get_bind().dialect.update_returning
+
+    for _ in range(2):
+        if returning:
+            value = dbsession.execute(stmt.returning(table.c.value)).scalar()
+        elif dbsession.execute(stmt).rowcount:
+            value = dbsession.execute(select(table.c.value).where(table.c.name == name)).scalar()
+        else:
+            value = None
+        if value is not None:
+            return value
+
+        try:
+            with dbsession.begin_nested():
+                dbsession.execute(insert(table).values(name=name, value=_seed(name, dbsession)))
+        except IntegrityError:
+            pass  # Dibuat request lain bersamaan; ulangi UPDATE
+    raise RuntimeError(f"Sequence {name} tidak bisa dialokasikan")
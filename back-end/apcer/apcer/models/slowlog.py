@@ -0,0 +1,171 @@
+# models/slowlog.py
+import hashlib
+import logging
+import random
+import re
+import threading
+import time
+
+from pyramid.settings import asbool
+from pyramid.threadlocal import get_current_request
+from sqlalchemy import event
+
+log = logging.getLogger(__name__)
+
+# Hanya statement ini yang di-EXPLAIN (EXPLAIN tanpa ANALYZE tidak mengeksekusi)
+_EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PARAM = re.compile(r'%\(\w+\)s|:\w+|\$\d+|%s|\?')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_SPACE = re.compile(r'\s+')
+
+
+def fingerprint(statement):
+    """
+    Bentuk statement tanpa literal/parameter, sehingga query yang sama
+    dengan nilai berbeda (dan IN dengan jumlah elemen berbeda) dianggap satu.
+    """
+    normalized = _STRING.sub('?', statement)
+    normalized = _PARAM.sub('?', normalized)
+    normalized = _NUMBER.sub('?', normalized)
+    normalized = _IN_LIST.sub('(...)', normalized)
+    normalized = _SPACE.sub(' ', normalized).strip()
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:12]
+
+
+def parameter_shape(parameters, executemany=False):
+    """Tipe parameter saja, tanpa nilainya (email/password tidak ikut ke log)."""
+    if executemany:
+        rows = list(parameters)
+        return f'{len(rows)} x {parameter_shape(rows[0]) if rows else "()"}'
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(f'{k}: {type(v).__name__}' for k, v in parameters.items()) + '}'
+    if isinstance(parameters, (list, tuple)):
+        return '(' + ', '.join(type(v).__name__ for v in parameters) + ')'
+    return type(parameters).__name__
+
+
+def current_route():
+    request = get_current_request()
+    if request is None:
+        return '-'
+    route = getattr(request, 'matched_route', None)
+    return route.name if route is not None else request.path_info
+
+
+class SlowQueryLog:
+    """
+    Catat statement yang lebih lama dari ``threshold`` detik beserta route,
+    bentuk parameter dan query plan. ``sample_rate`` membatasi porsi query
+    lambat yang diproses; fingerprint yang sama hanya dicatat sekali per
+    ``dedup_seconds`` (jumlah yang dilewati ikut dicatat berikutnya).
+    """
+
+    def __init__(self, threshold, sample_rate=1.0, dedup_seconds=60.0, explain=True):
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.dedup_seconds = dedup_seconds
+        self.explain = explain
+        self._seen = {}  # fingerprint -> [waktu log terakhir, jumlah dilewati]
+        self._lock = threading.Lock()
+        self.logged = 0
+
+    def install(self, engine):
+        event.listen(engine, 'before_cursor_execute', self.before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self.after_cursor_execute)
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # Per statement (ExecutionContext): statement yang gagal tidak
+        # meninggalkan waktu mulai di koneksi pool
+        if context is not None:
+            context.slowlog_start = time.perf_counter()
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, 'slowlog_start', None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        if elapsed < self.threshold:
+            return
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        key = fingerprint(statement)
+        skipped = self._should_log(key)
+        if skipped is None:
+            return
+        plan = self.query_plan(conn, statement, parameters) if self.explain and not executemany else None
+        self.logged += 1
+        log.warning(
+            'Query lambat %.1f ms [route=%s fingerprint=%s%s]\n%s\nparams: %s%s',
+            elapsed * 1000, current_route(), key,
+            f', {skipped} serupa dilewati' if skipped else '',
+            statement, parameter_shape(parameters, executemany),
+            '\nplan:\n' + plan if plan else '',
+        )
+
+    def _should_log(self, key):
+        """None jika fingerprint ini baru saja dicatat, selain itu jumlah yang dilewati."""
+        now = time.monotonic()
+        with self._lock:
+            seen = self._seen.get(key)
+            if seen is not None and now - seen[0] < self.dedup_seconds:
+                seen[1] += 1
+                return None
+            skipped = seen[1] if seen is not None else 0
+            self._seen[key] = [now, 0]
+            return skipped
+
+    def query_plan(self, conn, statement, parameters):
+        if not statement.lstrip().upper().startswith(_EXPLAINABLE):
+            return None
+        # Log query lambat tidak boleh menggagalkan query yang sedang diamati
+        try:
+            rows = self._explain(conn, statement, parameters)
+        except Exception as e:
+            log.warning('EXPLAIN gagal untuk query lambat', exc_info=True)
+            return f'(EXPLAIN gagal: {e})'
+        if conn.dialect.name == 'sqlite':
+            # (id, parent, notused, detail)
+            return '\n'.join(f'  {row[-1]}' for row in rows)
+        return '\n'.join(f'  {row[0]}' for row in rows)
+
+    def _explain(self, conn, statement, parameters):
+        sqlite = conn.dialect.name == 'sqlite'
+        prefix = 'EXPLAIN QUERY PLAN ' if sqlite else 'EXPLAIN '
+        # Di luar SQLite, EXPLAIN yang gagal di dalam transaksi membatalkan
+        # seluruh transaksi (Postgres: InFailedSqlTransaction), jadi dibungkus
+        # SAVEPOINT. Session read-only berjalan dalam AUTOCOMMIT: di sana
+        # SAVEPOINT sendiri error dan tidak ada transaksi yang perlu dijaga.
+        autocommit = conn.get_execution_options().get('isolation_level') == 'AUTOCOMMIT'
+        savepoint = not sqlite and not autocommit and conn.in_transaction()
+        # Cursor DBAPI baru di koneksi yang sama: hasil cursor asli tidak terganggu
+        cursor = conn.connection.cursor()
+        try:
+            if savepoint:
+                cursor.execute('SAVEPOINT apcer_slowlog_explain')
+            try:
+                cursor.execute(prefix + statement, parameters)
+                return cursor.fetchall()
+            except Exception:
+                if savepoint:
+                    cursor.execute('ROLLBACK TO SAVEPOINT apcer_slowlog_explain')
+                raise
+            finally:
+                if savepoint:
+                    cursor.execute('RELEASE SAVEPOINT apcer_slowlog_explain')
+        finally:
+            cursor.close()
+
+
+def slow_query_log_from_settings(settings):
+    threshold_ms = float(settings.get('db.slow_query_ms') or 0)
+    if threshold_ms <= 0:
+        return None
+    return SlowQueryLog(
+        threshold_ms / 1000,
+        sample_rate=float(settings.get('db.slow_query_sample', 1.0)),
+        dedup_seconds=float(settings.get('db.slow_query_dedup_seconds', 60)),
+        explain=asbool(settings.get('db.slow_query_explain', True)),
+    )
@@ -25,12 +25,19 @@ class User(Base):
         return f"<User(id={self.id}, username='{self.username}', email='{self.email}')>"
 
     # Best Practice: Metode untuk hashing dan verifikasi password menggunakan bcrypt
-    def set_password(self, password):
+    # ``hasher`` (apcer.hashing.PasswordHasher) memindahkan bcrypt ke process pool
+    # dan memakai auth.bcrypt_rounds; tanpa hasher bcrypt dijalankan langsung.
+    def set_password(self, password, hasher=None):
+        if hasher is not None:
+            self.password_hash = hasher.hash(password)
+            return
         # bcrypt.hashpw membutuhkan input bytes, jadi encode password
         hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
         self.password_hash = hashed_password.decode('utf-8') # Simpan sebagai string
 
-    def check_password(self, password):
+    def check_password(self, password, hasher=None):
+        if hasher is not None:
+            return hasher.verify(password, self.password_hash)
         # bcrypt.checkpw juga membutuhkan input bytes untuk password dan hash
         # Pastikan password_hash di-encode kembali ke bytes
         return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
\ No newline at end of file
@@ -0,0 +1,49 @@
+# normalize.py
+from sqlalchemy import select
+
+from .models.user import User
+
+# ?shape=nested (default, bentuk lama) atau ?shape=normalized: data user
+# dikirim sekali di map ``users`` dan item hanya memuat ``user_id``/``userId``.
+SHAPES = ('nested', 'normalized')
+
+FEED_USER_FIELDS = ('id', 'username')
+DETAIL_USER_FIELDS = ('id', 'username', 'email')
+
+
+class InvalidShape(ValueError):
+    """Parameter ``shape`` tidak dikenal."""
+
+
+def response_shape(request):
+    shape = request.params.get('shape', 'nested')
+    if shape not in SHAPES:
+        raise InvalidShape('Parameter shape tidak valid')
+    return shape
+
+
+def load_users(dbsession, user_ids, fields=FEED_USER_FIELDS):
+    """
+    Semua user yang direferensikan satu respons dalam SATU query ``IN``.
+    Key map berupa string karena key object JSON selalu string.
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return {}
+    rows = dbsession.execute(
+        select(*(getattr(User, field) for field in fields)).where(User.id.in_(user_ids)))
+    return {str(row.id): dict(row._mapping) for row in rows}
+
+
+def collect_users(dbsession, rows, fields=FEED_USER_FIELDS, loaded=False):
+    """
+    Map ``users`` untuk ``rows`` (post/komentar). Jika relasi ``user`` sudah
+    di-joinedload (bentuk nested), dibaca dari objeknya tanpa query lagi.
+    """
+    if loaded:
+        return {str(row.user.id): {field: getattr(row.user, field) for field in fields} for row in rows}
+    return load_users(dbsession, [row.user_id for row in rows], fields)
+
+
+def envelope(data, users):
+    return {'data': data, 'users': users}
@@ -0,0 +1,133 @@
+# pagination.py
+import base64
+import datetime
+import json
+
+from sqlalchemy import and_, or_
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# Header tempat cursor halaman berikutnya dikirim. Body tetap berupa list
+# supaya klien lama (front-end) tidak perlu berubah.
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+class InvalidPageParams(ValueError):
+    """Parameter ``limit`` atau ``cursor`` tidak valid."""
+
+
+def encode_cursor(created_at, item_id):
+    """
+    Membuat cursor opaque dari pasangan ``(created_at, id)``.
+    """
+    raw = json.dumps([created_at.isoformat(), item_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidPageParams('Cursor tidak valid')
+
+
+def encode_offset_cursor(offset):
+    """Cursor opaque untuk hasil yang diurutkan skor (search), berisi offset."""
+    raw = json.dumps({'offset': offset}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_offset_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        offset = int(json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))['offset'])
+    except (ValueError, TypeError, KeyError, UnicodeError):
+        raise InvalidPageParams('Cursor tidak valid')
+    if offset < 0:
+        raise InvalidPageParams('Cursor tidak valid')
+    return offset
+
+
+def configured_limit(settings, name):
+    """
+    Ukuran halaman dari setting ``name`` (mis. ``pagination.comments_limit``),
+    jatuh ke ``pagination.default_limit`` jika kosong/tidak valid, dan tidak
+    pernah melebihi ``pagination.max_limit``.
+    """
+    max_limit = int(settings.get('pagination.max_limit', MAX_LIMIT))
+    for value in (settings.get(name), settings.get('pagination.default_limit'), DEFAULT_LIMIT):
+        try:
+            limit = int(value)
+        except (TypeError, ValueError):
+            continue
+        if limit >= 1:
+            return min(limit, max_limit)
+
+
+def page_params(request, default_limit=None, max_limit=None, decode=decode_cursor):
+    """
+    Membaca ``limit`` dan ``cursor`` dari query string.
+
+    Default dan batas atas bisa diatur lewat ``pagination.default_limit``
+    dan ``pagination.max_limit`` di file .ini. ``decode`` mengubah cursor
+    (default pasangan keyset ``(created_at, id)``).
+    """
+    settings = request.registry.settings
+    if default_limit is None:
+        default_limit = int(settings.get('pagination.default_limit', DEFAULT_LIMIT))
+    if max_limit is None:
+        max_limit = int(settings.get('pagination.max_limit', MAX_LIMIT))
+
+    try:
+        limit = int(request.params.get('limit', default_limit))
+    except (TypeError, ValueError):
+        raise InvalidPageParams('Limit tidak valid')
+    if limit < 1:
+        raise InvalidPageParams('Limit tidak valid')
+
+    cursor = request.params.get('cursor')
+    return min(limit, max_limit), decode(cursor) if cursor else None
+
+
+def keyset(query, created_col, id_col, cursor, limit, descending=True):
+    """
+    Menerapkan seek ``(created_col, id_col)`` pada query.
+
+    Kondisi ditulis sebagai ``created <= c AND (created < c OR id < i)``
+    agar tetap bisa memakai range scan pada index ``created_at``, tanpa OFFSET.
+    Query mengambil ``limit + 1`` baris untuk mendeteksi adanya halaman berikutnya.
+    """
+    if cursor:
+        created_at, item_id = cursor
+        if descending:
+            query = query.filter(and_(
+                created_col <= created_at,
+                or_(created_col < created_at, id_col < item_id),
+            ))
+        else:
+            query = query.filter(and_(
+                created_col >= created_at,
+                or_(created_col > created_at, id_col > item_id),
+            ))
+
+    if descending:
+        query = query.order_by(created_col.desc(), id_col.desc())
+    else:
+        query = query.order_by(created_col.asc(), id_col.asc())
+    return query.limit(limit + 1)
+
+
+def split_page(rows, limit, key):
+    """
+    Memotong hasil ``keyset`` menjadi satu halaman dan cursor berikutnya.
+
+    ``key`` adalah fungsi yang mengembalikan ``(created_at, id)`` dari satu baris.
+    """
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*key(rows[-1]))
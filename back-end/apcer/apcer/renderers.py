@@ -0,0 +1,74 @@
+# renderers.py
+import datetime
+import decimal
+import json
+
+from pyramid.renderers import JSON
+from pyramid.response import Response
+
+try:  # encoder cepat opsional; fallback ke json stdlib
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+JSON_CONTENT_TYPE = 'application/json'
+
+
+def _isoformat(obj, request=None):
+    return obj.isoformat()
+
+
+def _decimal(obj, request=None):
+    return float(obj)
+
+
+# Didaftarkan sekali untuk json_response maupun renderer='json'
+ADAPTERS = (
+    (datetime.datetime, _isoformat),
+    (datetime.date, _isoformat),
+    (datetime.time, _isoformat),
+    (decimal.Decimal, _decimal),
+)
+
+
+def _default(obj):
+    for type_, adapter in ADAPTERS:
+        if isinstance(obj, type_):
+            return adapter(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(data):
+    """
+    Serialize ke bytes JSON yang ringkas (tanpa spasi/indentasi).
+    Memakai orjson jika terpasang, selain itu json stdlib.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def json_response(data, status=200):
+    return Response(
+        body=dumps(data),
+        content_type=JSON_CONTENT_TYPE,
+        charset='utf-8',
+        status=status
+    )
+
+
+def _serializer(value, default=None, **kw):
+    if orjson is not None:
+        return orjson.dumps(value, default=default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(value, default=default, ensure_ascii=False, separators=(',', ':'))
+
+
+def json_renderer():
+    """
+    Renderer ``json`` aplikasi: output ringkas dan adapter tanggal/Decimal
+    yang sama dengan ``json_response``.
+    """
+    renderer = JSON(serializer=_serializer)
+    for type_, adapter in ADAPTERS:
+        renderer.add_adapter(type_, adapter)
+    return renderer
@@ -18,6 +18,8 @@ def includeme(config):
     config.add_route('posts.create', '/posts/create')           # POST create post
     config.add_route('posts.detail', '/posts/{id:\d+}')         # GET detail post
     config.add_route('posts.mine', '/posts/mine')               # ✅ GET posts milik user (baru)
+    config.add_route('posts.saved', '/posts/saved')             # GET posts yang disimpan user
+    config.add_route('posts.search', '/posts/search')           # GET ?q= search full-text
     
     # -------------------------
     # ✏ UPDATE / DELETE POST
@@ -34,4 +36,10 @@ def includeme(config):
     # -------------------------
     # 💬 COMMENTS
     # -------------------------
-    config.add_route('posts.comments', '/posts/{post_id:\d+}/comments')  # POST add comment
\ No newline at end of file
+    config.add_route('posts.comments', '/posts/{post_id:\d+}/comments')  # POST add comment, GET daftar komentar (keyset)
+    config.add_route('comments.delete', '/comments/{id:\d+}/delete')       # DELETE (soft-delete) komentar
+    # -------------------------
+    # 📊 METRICS
+    # -------------------------
+    config.add_route('metrics', '/metrics')            # GET metrik Prometheus (route, SQL, pool, cache)
+    config.add_route('metrics.pool', '/metrics/pool')  # GET statistik pool koneksi DB
@@ -0,0 +1,425 @@
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode
+
+from pyramid.paster import get_appsettings, setup_logging
+from sqlalchemy import event, func, select
+from webob import Request
+
+from .. import main as apcer_main
+from ..models import get_engine
+from ..models.post import Post
+from ..models.user import User
+from ..pagination import NEXT_CURSOR_HEADER
+from .datagen import DEFAULT_PASSWORD, WORDS, generate, hash_password, parse_scale
+
+
+def _sentence(rng, min_words=5, max_words=30):
+    return ' '.join(rng.choices(WORDS, k=rng.randint(min_words, max_words))).capitalize() + '.'
+
+
+def prepare_database(args, settings):
+    """
+    Database hasil seed (datagen.generate) disimpan sebagai template per
+    (skala, seed) dan disalin untuk setiap run, sehingga tiap run mulai
+    dari data yang sama.
+    """
+    os.makedirs(args.data_dir, exist_ok=True)
+    template = os.path.join(args.data_dir, f'apcer-bench-{args.scale}-{args.seed}.sqlite')
+    if args.reseed and os.path.exists(template):
+        os.remove(template)
+    if not os.path.exists(template):
+        print(f"Seeding {args.scale} post (seed {args.seed}) ke {template} ...")
+        engine = get_engine({**settings, 'sqlalchemy.url': 'sqlite:///' + template})
+        stats = generate(engine, args.scale, seed=args.seed,
+                         password_hash=hash_password(DEFAULT_PASSWORD, args.bcrypt_rounds))
+        with engine.connect() as connection:
+            connection.exec_driver_sql('PRAGMA wal_checkpoint(TRUNCATE)')
+        engine.dispose()
+        print(stats.report())
+
+    working = os.path.join(args.data_dir, 'apcer-bench-run.sqlite')
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(working + suffix):
+            os.remove(working + suffix)
+    shutil.copyfile(template, working)
+    return 'sqlite:///' + working
+
+
+class QueryCounter:
+    """Jumlah statement SQL per thread (thread writer tidak ikut dihitung)."""
+
+    def __init__(self, engines):
+        self._local = threading.local()
+        for engine in engines:
+            event.listen(engine, 'before_cursor_execute', self._count)
+
+    def _count(self, *args):
+        self._local.count = getattr(self._local, 'count', 0) + 1
+
+    def take(self):
+        count, self._local.count = getattr(self._local, 'count', 0), 0
+        return count
+
+
+class VirtualUser:
+    """Satu klien WSGI dengan cookie jar sendiri."""
+
+    def __init__(self, app, queries, rng):
+        self.app = app
+        self.queries = queries
+        self.rng = rng
+        self.user_id = None
+        self.cookies = {}
+        self.samples = []  # (label, detik, jumlah query, status)
+        self.recording = False
+        self.own_posts = []
+        self.own_comments = []
+        self.cursor = None
+        self.hot_posts = []  # post dengan komentar terbanyak (lebih dari satu halaman)
+
+    def call(self, label, method, path, params=None, json_body=None):
+        kw = {'method': method}
+        if json_body is not None:
+            kw.update(body=json.dumps(json_body).encode('utf-8'), content_type='application/json')
+        elif params is not None:
+            kw['POST'] = params
+        request = Request.blank(path, environ={'REMOTE_ADDR': '127.0.0.1'}, **kw)
+        if self.cookies:
+            request.headers['Cookie'] = '; '.join(f'{k}={v}' for k, v in self.cookies.items())
+        self.queries.take()
+        started = time.perf_counter()
+        response = request.get_response(self.app)
+        elapsed = time.perf_counter() - started
+        for header in response.headers.getall('Set-Cookie'):
+            for name, morsel in SimpleCookie(header).items():
+                if morsel.value and morsel['max-age'] != '0':
+                    self.cookies[name] = morsel.value
+                else:
+                    self.cookies.pop(name, None)
+        if self.recording:
+            self.samples.append((label, elapsed, self.queries.take(), response.status_code))
+        return response
+
+    def login(self, user_id):
+        return self.call('POST login', 'POST', '/login',
+                         json_body={'email': f'user{user_id}@apcer.com', 'password': DEFAULT_PASSWORD})
+
+
+def _random_post(vu, scale):
+    return vu.rng.randint(1, scale)
+
+
+def anon_home(vu, scale):
+    vu.call('GET home', 'GET', '/')
+
+
+def list_posts(vu, scale):
+    # Kadang lanjut ke halaman berikutnya lewat cursor
+    path = f'/posts?cursor={vu.cursor}' if vu.cursor and vu.rng.random() < 0.3 else '/posts'
+    response = vu.call('GET posts.list', 'GET', path)
+    vu.cursor = response.headers.get(NEXT_CURSOR_HEADER)
+
+
+def post_detail(vu, scale):
+    vu.call('GET posts.detail', 'GET', f'/posts/{_random_post(vu, scale)}')
+
+
+def read_comments(vu, scale):
+    # Buka detail post ramai lalu baca komentar lanjutan beberapa halaman
+    post_id = vu.rng.choice(vu.hot_posts) if vu.hot_posts else _random_post(vu, scale)
+    response = vu.call('GET posts.detail', 'GET', f'/posts/{post_id}')
+    cursor = response.json.get('comments_next_cursor') if response.status_code == 200 else None
+    for _ in range(vu.rng.randint(1, 3)):
+        if not cursor:
+            return
+        response = vu.call('GET posts.comments', 'GET', f'/posts/{post_id}/comments?cursor={cursor}')
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+
+
+def search_posts(vu, scale):
+    # 1-2 kata dari kosakata datagen; kadang kata terakhir baru diketik
+    # sebagian (pencarian awalan), kadang lanjut ke halaman berikutnya
+    terms = vu.rng.sample(WORDS, vu.rng.randint(1, 2))
+    if vu.rng.random() < 0.3:
+        terms[-1] = terms[-1][:max(2, len(terms[-1]) // 2)]
+    params = {'q': ' '.join(terms)}
+    response = vu.call('GET posts.search', 'GET', '/posts/search?' + urlencode(params))
+    cursor = response.headers.get(NEXT_CURSOR_HEADER)
+    if cursor and vu.rng.random() < 0.3:
+        vu.call('GET posts.search', 'GET', '/posts/search?' + urlencode({**params, 'cursor': cursor}))
+
+
+def register_and_leave(vu, scale):
+    # Klien sekali pakai: daftar, lihat profil, hapus akun
+    guest = VirtualUser(vu.app, vu.queries, vu.rng)
+    guest.samples, guest.recording = vu.samples, vu.recording
+    guest.call('POST register', 'POST', '/register')
+    guest.call('GET auth.me', 'GET', '/me')
+    guest.call('DELETE auth.me', 'DELETE', '/me')
+
+
+def my_posts(vu, scale):
+    vu.call('GET posts.mine', 'GET', '/posts/mine')
+
+
+def saved_posts(vu, scale):
+    vu.call('GET posts.saved', 'GET', '/posts/saved')
+
+
+def me(vu, scale):
+    vu.call('GET auth.me', 'GET', '/me')
+
+
+def update_me(vu, scale):
+    user = vu.call('GET auth.me', 'GET', '/me').json['user']
+    vu.call('PUT auth.me', 'PUT', '/me', json_body={'username': user['username'], 'email': user['email']})
+
+
+def create_post(vu, scale):
+    response = vu.call('POST posts.create', 'POST', '/posts/create', params={'content': _sentence(vu.rng)})
+    if response.status_code == 200:
+        vu.own_posts.append(response.json['post_id'])
+
+
+def edit_post(vu, scale):
+    if not vu.own_posts:
+        return create_post(vu, scale)
+    post_id = vu.rng.choice(vu.own_posts)
+    vu.call('PUT posts.edit', 'PUT', f'/posts/{post_id}/edit', json_body={'content': _sentence(vu.rng)})
+
+
+def delete_post(vu, scale):
+    if not vu.own_posts:
+        return create_post(vu, scale)
+    vu.call('DELETE posts.delete', 'DELETE', f'/posts/{vu.own_posts.pop()}/delete')
+
+
+def react(vu, scale):
+    vu.call('POST posts.react', 'POST', f'/posts/{_random_post(vu, scale)}/react')
+
+
+def save(vu, scale):
+    vu.call('POST posts.save', 'POST', f'/posts/{_random_post(vu, scale)}/save')
+
+
+def comment(vu, scale):
+    response = vu.call('POST posts.comments', 'POST', f'/posts/{_random_post(vu, scale)}/comments',
+                       params={'content': _sentence(vu.rng, 3, 12)})
+    if response.status_code == 200:
+        vu.own_comments.append(response.json['comment']['id'])
+
+
+def delete_comment(vu, scale):
+    if not vu.own_comments:
+        return comment(vu, scale)
+    vu.call('DELETE comments.delete', 'DELETE', f'/comments/{vu.own_comments.pop()}/delete')
+
+
+def relogin(vu, scale):
+    vu.call('POST logout', 'POST', '/logout')
+    vu.login(vu.user_id)
+
+
+def metrics(vu, scale):
+    vu.call('GET metrics', 'GET', '/metrics')
+    vu.call('GET metrics.pool', 'GET', '/metrics/pool')
+
+
+# (skenario, bobot). Campuran baca-berat; setiap route di routes.py tersentuh.
+ANONYMOUS_MIX = [
+    (list_posts, 40), (post_detail, 40), (read_comments, 4), (search_posts, 6), (anon_home, 3), (register_and_leave, 1),
+    (metrics, 1),
+]
+AUTHENTICATED_MIX = [
+    (list_posts, 28), (post_detail, 20), (read_comments, 3), (search_posts, 4), (my_posts, 8), (saved_posts, 6), (me, 4), (update_me, 1),
+    (create_post, 4), (edit_post, 2), (delete_post, 1), (react, 6), (save, 4), (comment, 5),
+    (delete_comment, 1), (relogin, 1),
+]
+
+
+def run_virtual_user(vu, mix, scale, start_event, stop_at, warmup_until):
+    scenarios = [s for s, _ in mix]
+    weights = [w for _, w in mix]
+    start_event.wait()
+    while True:
+        now = time.monotonic()
+        if now >= stop_at:
+            return
+        vu.recording = now >= warmup_until
+        vu.rng.choices(scenarios, weights)[0](vu, scale)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    # Nearest-rank: nilai ke-ceil(p/100 * n)
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+def summarize(samples, elapsed):
+    def stats(rows):
+        latencies = sorted(r[1] * 1000 for r in rows)
+        return {
+            'requests': len(rows),
+            'errors': sum(1 for r in rows if r[3] >= 500),
+            'throughput_rps': round(len(rows) / elapsed, 1) if elapsed else None,
+            'p50_ms': round(percentile(latencies, 50), 3) if rows else None,
+            'p95_ms': round(percentile(latencies, 95), 3) if rows else None,
+            'p99_ms': round(percentile(latencies, 99), 3) if rows else None,
+            'mean_ms': round(sum(latencies) / len(latencies), 3) if rows else None,
+            'queries_per_request': round(sum(r[2] for r in rows) / len(rows), 2) if rows else None,
+        }
+
+    routes = {}
+    for row in samples:
+        routes.setdefault(row[0], []).append(row)
+    return stats(samples), {label: stats(rows) for label, rows in sorted(routes.items())}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(result, previous=None):
+    def delta(key, label=None):
+        if previous is None:
+            return ''
+        old = (previous['routes'].get(label) if label else previous['totals']) or {}
+        new = (result['routes'][label] if label else result['totals'])
+        if not old.get(key) or new.get(key) is None:
+            return ''
+        return f' ({(new[key] - old[key]) / old[key] * 100:+.0f}%)'
+
+    totals = result['totals']
+    print(f"\n{totals['requests']} request dalam {result['meta']['duration_s']} detik, "
+          f"{totals['throughput_rps']} req/s{delta('throughput_rps')}, {totals['errors']} error 5xx")
+    print(f"{'route':<24}{'n':>7}{'p50 ms':>18}{'p95 ms':>18}{'p99 ms':>10}{'query/req':>11}")
+    for label, stats in result['routes'].items():
+        print(f"{label:<24}{stats['requests']:>7}"
+              f"{stats['p50_ms']:>10}{delta('p50_ms', label):>8}"
+              f"{stats['p95_ms']:>10}{delta('p95_ms', label):>8}"
+              f"{stats['p99_ms']:>10}{stats['queries_per_request']:>11}")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Benchmark beban in-process (WSGI, tanpa jaringan) atas database hasil seed.',
+    )
+    parser.add_argument('config_uri', nargs='?',
+                        help='File konfigurasi Pyramid (opsional); sqlalchemy.url diganti database benchmark.')
+    parser.add_argument('--scale', type=parse_scale, default=parse_scale('10k'),
+                        help='Jumlah post hasil seed: 10k, 100k, 1M, ... (default: 10k).')
+    parser.add_argument('--seed', type=int, default=42, help='Seed acak untuk data dan trafik (default: 42).')
+    parser.add_argument('--users', type=int, default=8, help='Jumlah virtual user / thread (default: 8).')
+    parser.add_argument('--auth-ratio', type=float, default=0.5,
+                        help='Porsi virtual user yang login (default: 0.5).')
+    parser.add_argument('--duration', type=float, default=20, help='Lama pengukuran dalam detik (default: 20).')
+    parser.add_argument('--warmup', type=float, default=3, help='Detik pemanasan yang tidak dicatat (default: 3).')
+    parser.add_argument('--bcrypt-rounds', type=int, default=4,
+                        help='Cost bcrypt user hasil seed dan registrasi (default: 4).')
+    parser.add_argument('--data-dir', default='bench-data', help='Folder database benchmark (default: bench-data).')
+    parser.add_argument('--reseed', action='store_true', help='Buat ulang template database hasil seed.')
+    parser.add_argument('--output', help='Simpan hasil JSON ke file ini.')
+    parser.add_argument('--compare', help='File JSON run sebelumnya untuk dibandingkan.')
+    return parser.parse_args(argv[1:])
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    settings = {'auth.secret': 'apcer-bench-secret'}
+    if args.config_uri:
+        setup_logging(args.config_uri)
+        settings.update(get_appsettings(args.config_uri))
+    settings = {key: value for key, value in settings.items() if not key.startswith('sqlalchemy.read.')}
+    settings.update({
+        'auth.bcrypt_rounds': str(args.bcrypt_rounds),
+        'auth.hash_workers': settings.get('auth.hash_workers', '0'),
+        'metrics.allowed_ips': settings.get('metrics.allowed_ips') or '127.0.0.1',
+    })
+    settings['sqlalchemy.url'] = prepare_database(args, settings)
+
+    app = apcer_main({}, **settings)
+    registry = app.registry
+    engines = [e for e in (registry.get('dbengine'), registry.get('dbengine.read')) if e is not None]
+    queries = QueryCounter(engines)
+    with engines[0].connect() as connection:
+        n_users = connection.execute(select(func.max(User.id))).scalar()
+        hot_posts = connection.execute(
+            select(Post.id).where(Post.is_deleted == False)
+            .order_by(Post.comments_count.desc()).limit(100)).scalars().all()
+
+    authenticated = round(args.users * args.auth_ratio)
+    vus = []
+    for index in range(args.users):
+        vu = VirtualUser(app, queries, random.Random(args.seed * 1000 + index))
+        vu.hot_posts = hot_posts
+        if index < authenticated:
+            vu.user_id = vu.rng.randint(1, n_users)
+            vu.login(vu.user_id)
+        vus.append(vu)
+
+    start_event = threading.Event()
+    warmup_until = time.monotonic() + args.warmup
+    stop_at = warmup_until + args.duration
+    threads = [
+        threading.Thread(target=run_virtual_user, args=(
+            vu, AUTHENTICATED_MIX if vu.user_id else ANONYMOUS_MIX, args.scale, start_event, stop_at, warmup_until))
+        for vu in vus
+    ]
+    for thread in threads:
+        thread.start()
+    print(f"{args.users} virtual user ({authenticated} login), pemanasan {args.warmup} detik, "
+          f"pengukuran {args.duration} detik ...")
+    start_event.set()
+    for thread in threads:
+        thread.join()
+
+    samples = [sample for vu in vus for sample in vu.samples]
+    totals, routes = summarize(samples, args.duration)
+    result = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'scale': args.scale,
+            'seed': args.seed,
+            'users': args.users,
+            'authenticated_users': authenticated,
+            'duration_s': args.duration,
+            'warmup_s': args.warmup,
+            'bcrypt_rounds': args.bcrypt_rounds,
+            'writer_enabled': registry.get('db_writer') is not None,
+        },
+        'totals': totals,
+        'routes': routes,
+    }
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    print_report(result, previous)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"\nHasil disimpan di {args.output}")
+    writer = registry.get('db_writer')
+    if writer is not None:
+        writer.stop()
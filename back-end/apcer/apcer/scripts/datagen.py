@@ -0,0 +1,285 @@
+import argparse
+import datetime
+import itertools
+import math
+import random
+import time
+
+import bcrypt
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from ..models.meta import Base
+from ..models.user import User
+from ..models.post import Post
+from ..models.reaction import Reaction
+from ..models.saved_post import SavedPost
+from ..models.comment import Comment
+from ..models.sequence import next_value, ANON_USERNAME
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - numpy opsional (extra "datagen")
+    numpy = None
+
+CHUNK = 10000
+DEFAULT_PASSWORD = 'password123'  # Sama dengan data mock setup_models
+ZIPF_EXPONENT = 1.0               # 1.0 = hukum Zipf klasik: rank ke-r ~ 1/r
+SENTENCE_POOL = 4096              # Kalimat dibuat sekali lalu dikombinasikan
+EPOCH = datetime.datetime(2025, 1, 1)
+POST_INTERVAL = datetime.timedelta(seconds=30)
+
+WORDS = (
+    'apcer kampus kuliah tugas ujian dosen kantin parkir wifi lab praktikum jadwal kelas libur '
+    'skripsi organisasi rapat acara lomba juara makan kopi hujan macet motor bus pagi siang sore '
+    'malam senang sedih lelah semangat tolong info besok hari ini minggu depan kenapa bagaimana '
+    'siapa kapan dimana teman kosan perpustakaan buku catatan presentasi kelompok deadline revisi '
+    'wisuda beasiswa magang kerja proyek kode server database bug fitur aplikasi website desain '
+    'foto video musik konser film futsal basket badminton lari gym sehat sakit obat dokter antre '
+    'mahal murah diskon promo gratis baru lama cepat lambat ramai sepi panas dingin listrik mati '
+    'lupa ingat tanya jawab setuju tidak mungkin pasti akhirnya ternyata katanya serius bercanda'
+).split()
+
+
+def parse_scale(value):
+    """'10k' -> 10000, '1M' -> 1000000, '2500' -> 2500."""
+    value = value.strip().lower()
+    multiplier = {'k': 1000, 'm': 1000000}.get(value[-1:], 1)
+    number = value[:-1] if multiplier != 1 else value
+    try:
+        scale = int(float(number) * multiplier)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Skala tidak valid: {value!r} (contoh: 10k, 100k, 1M)")
+    if scale < 1:
+        raise argparse.ArgumentTypeError('Skala minimal 1 post')
+    return scale
+
+
+def hash_password(password=DEFAULT_PASSWORD, rounds=12):
+    """Satu hash bcrypt untuk semua user hasil generate."""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+class _PythonSampler:
+    """Sumber acak deterministik tanpa dependensi (random.Random)."""
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+
+    def zipf_cumulative(self, n, exponent):
+        return list(itertools.accumulate(1.0 / (rank ** exponent) for rank in range(1, n + 1)))
+
+    def weighted(self, cumulative, k):
+        return self.rng.choices(range(len(cumulative)), cum_weights=cumulative, k=k)
+
+    def integers(self, low, high, k):
+        return [self.rng.randrange(low, high) for _ in range(k)]
+
+    def uniform(self, k):
+        return [self.rng.random() for _ in range(k)]
+
+    def permutation(self, n):
+        values = list(range(n))
+        self.rng.shuffle(values)
+        return values
+
+    def distinct(self, n, k):
+        return self.rng.sample(range(n), k)
+
+
+class _NumpySampler:
+    """Versi vektor (numpy.random.Generator); hasilnya berbeda dari _PythonSampler."""
+
+    def __init__(self, seed):
+        self.rng = numpy.random.default_rng(seed)
+
+    def zipf_cumulative(self, n, exponent):
+        return numpy.cumsum(1.0 / numpy.arange(1, n + 1, dtype=numpy.float64) ** exponent)
+
+    def weighted(self, cumulative, k):
+        return numpy.searchsorted(cumulative, self.rng.random(k) * cumulative[-1], side='right').tolist()
+
+    def integers(self, low, high, k):
+        return self.rng.integers(low, high, k).tolist()
+
+    def uniform(self, k):
+        return self.rng.random(k).tolist()
+
+    def permutation(self, n):
+        return self.rng.permutation(n).tolist()
+
+    def distinct(self, n, k):
+        return self.rng.choice(n, k, replace=False).tolist()
+
+
+def make_sampler(seed, use_numpy=None):
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    return _NumpySampler(seed) if use_numpy else _PythonSampler(seed)
+
+
+def sentence_pool(sampler, size=SENTENCE_POOL, min_words=4, max_words=16):
+    lengths = sampler.integers(min_words, max_words + 1, size)
+    words = sampler.integers(0, len(WORDS), sum(lengths))
+    pool, offset = [], 0
+    for length in lengths:
+        pool.append(' '.join(WORDS[i] for i in words[offset:offset + length]).capitalize() + '.')
+        offset += length
+    return pool
+
+
+def skewed_counts(sampler, popularity, total, cap=None):
+    """
+    Bagi ``total`` baris ke post sebanding bobot popularitas (Zipf):
+    bagian bulat ditambah satu dengan peluang sebesar pecahannya.
+    """
+    scale = total / sum(popularity)
+    counts = []
+    for weight, roll in zip(popularity, sampler.uniform(len(popularity))):
+        expected = weight * scale
+        count = int(expected) + (1 if roll < expected - int(expected) else 0)
+        counts.append(min(count, cap) if cap is not None else count)
+    return counts
+
+
+class GenerationStats:
+    def __init__(self):
+        self.rows = {}
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add(self, table, count):
+        self.rows[table] = self.rows.get(table, 0) + count
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.started
+        return self
+
+    @property
+    def total(self):
+        return sum(self.rows.values())
+
+    def rows_per_second(self):
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+    def report(self):
+        lines = [f"  {table:<12}{count:>12,} baris" for table, count in self.rows.items()]
+        lines.append(f"  {'total':<12}{self.total:>12,} baris dalam {self.elapsed:.1f} detik "
+                     f"({self.rows_per_second():,.0f} baris/detik)")
+        return '\n'.join(lines)
+
+
+def _insert(connection, table, rows, chunk):
+    for first in range(0, len(rows), chunk):
+        connection.execute(insert(table), rows[first:first + chunk])
+
+
+def _sync_postgres_sequences(connection, tables):
+    # Id user/post ditulis eksplisit; sequence SERIAL Postgres harus ikut maju
+    for table in tables:
+        connection.exec_driver_sql(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"(SELECT COALESCE(MAX(id), 1) FROM {table}))")
+
+
+def generate(engine, posts, seed=0, users=None, comments_per_post=2.0, likes_per_post=3.0,
+             saves_per_post=0.5, password_hash=None, chunk=CHUNK, use_numpy=None, progress=None):
+    """
+    Tambahkan ``posts`` post beserta user, komentar, like dan simpan lewat
+    Core executemany per ``chunk`` baris. Deterministik untuk ``seed`` yang
+    sama (dan jalur numpy/python yang sama).
+
+    Distribusi dibuat miring seperti trafik nyata: penulis dan komentator
+    dipilih dengan bobot Zipf atas user (segelintir user sangat aktif),
+    dan jumlah komentar/like/simpan per post mengikuti Zipf atas urutan
+    popularitas acak (sedikit post "viral", ekor panjang post sepi).
+    likes_count/comments_count diisi sesuai baris yang dibuat.
+    """
+    sampler = make_sampler(seed, use_numpy)
+    n_users = users or max(20, posts // 20)
+    password_hash = password_hash or hash_password()
+    stats = GenerationStats()
+    Base.metadata.create_all(engine)
+
+    with engine.connect() as connection:
+        user_base = connection.execute(select(func.coalesce(func.max(User.id), 0))).scalar()
+        post_base = connection.execute(select(func.coalesce(func.max(Post.id), 0))).scalar()
+
+    pool = sentence_pool(sampler)
+    user_weights = sampler.zipf_cumulative(n_users, ZIPF_EXPONENT)
+    rank = sampler.permutation(posts)
+    popularity = [1.0 / ((r + 1) ** ZIPF_EXPONENT) for r in rank]
+    comment_counts = skewed_counts(sampler, popularity, posts * comments_per_post)
+    like_counts = skewed_counts(sampler, popularity, posts * likes_per_post, cap=n_users)
+    save_counts = skewed_counts(sampler, popularity, posts * saves_per_post, cap=n_users)
+
+    with engine.begin() as connection:
+        # Nomor "Anonim #N" dipesan dari sequence yang sama dengan /register,
+        # bukan diambil dari id: nomor yang sudah terpakai tidak pernah bentrok
+        anon_base = next_value(Session(bind=connection), ANON_USERNAME, n_users) - n_users - user_base
+        for first in range(0, n_users, chunk):
+            ids = range(user_base + first + 1, user_base + min(first + chunk, n_users) + 1)
+            _insert(connection, User.__table__, [
+                {'id': i, 'email': f'user{i}@apcer.com', 'username': f'Anonim #{anon_base + i}',
+                 'password_hash': password_hash, 'created_at': EPOCH}
+                for i in ids
+            ], chunk)
+        stats.add('users', n_users)
+
+    for first in range(0, posts, chunk):
+        indexes = range(first, min(first + chunk, posts))
+        size = len(indexes)
+        authors = sampler.weighted(user_weights, size)
+        content_a = sampler.integers(0, len(pool), size)
+        content_b = sampler.integers(0, len(pool), size)
+        post_rows, comment_rows, reaction_rows, saved_rows = [], [], [], []
+
+        for j, index in enumerate(indexes):
+            post_id = post_base + index + 1
+            created_at = EPOCH + POST_INTERVAL * (post_base + index)
+            post_rows.append({
+                'id': post_id, 'user_id': user_base + authors[j] + 1,
+                'content': pool[content_a[j]] + ' ' + pool[content_b[j]],
+                'created_at': created_at, 'is_deleted': False,
+                'likes_count': like_counts[index], 'comments_count': comment_counts[index],
+            })
+            if like_counts[index]:
+                reaction_rows.extend(
+                    {'user_id': user_base + u + 1, 'post_id': post_id, 'type': 'like', 'created_at': created_at}
+                    for u in sampler.distinct(n_users, like_counts[index]))
+            if save_counts[index]:
+                saved_rows.extend(
+                    {'user_id': user_base + u + 1, 'post_id': post_id, 'saved_at': created_at}
+                    for u in sampler.distinct(n_users, save_counts[index]))
+            count = comment_counts[index]
+            if count:
+                commenters = sampler.weighted(user_weights, count)
+                texts = sampler.integers(0, len(pool), count)
+                delays = sampler.integers(1, 7 * 86400, count)
+                comment_rows.extend(
+                    {'post_id': post_id, 'user_id': user_base + commenters[k] + 1, 'content': pool[texts[k]],
+                     'created_at': created_at + datetime.timedelta(seconds=delays[k]), 'is_deleted': False}
+                    for k in range(count))
+
+        with engine.begin() as connection:
+            _insert(connection, Post.__table__, post_rows, chunk)
+            _insert(connection, Comment.__table__, comment_rows, chunk)
+            _insert(connection, Reaction.__table__, reaction_rows, chunk)
+            _insert(connection, SavedPost.__table__, saved_rows, chunk)
+        stats.add('posts', len(post_rows))
+        stats.add('comments', len(comment_rows))
+        stats.add('reactions', len(reaction_rows))
+        stats.add('saved_posts', len(saved_rows))
+        if progress is not None:
+            progress(first + size, posts, stats)
+
+    if engine.dialect.name == 'postgresql':
+        with engine.begin() as connection:
+            _sync_postgres_sequences(connection, ('users', 'posts'))
+    return stats.finish()
+
+
+def print_progress(done, total, stats):
+    elapsed = time.perf_counter() - stats.started
+    rate = stats.total / elapsed if elapsed else 0.0
+    print(f"  {done:,}/{total:,} post ({math.floor(done / total * 100)}%), {rate:,.0f} baris/detik", flush=True)
@@ -11,12 +11,23 @@ from sqlalchemy.exc import OperationalError
 
 # Import helper functions dari models/__init__.py
 from ..models import get_engine, get_session_factory, get_tm_session
+from ..models.routing import engine_prefix
 from ..models.meta import Base # Import Base untuk create_all()
 from ..models.user import User
 from ..models.post import Post
 from ..models.reaction import Reaction
 from ..models.saved_post import SavedPost
 from ..models.comment import Comment
+from ..models.sequence import next_value, ANON_USERNAME
+from .datagen import (
+    CHUNK,
+    DEFAULT_PASSWORD,
+    generate,
+    hash_password,
+    numpy,
+    parse_scale,
+    print_progress,
+)
 
 
 # Fungsi bantu untuk menghasilkan data acak (tidak berubah)
@@ -68,10 +79,10 @@ def setup_models(dbsession):
     if dbsession.query(User).count() == 0:
         print("Menambahkan user mock...")
         mock_users = []
-        for i in range(1, 11): # 10 user mock
+        for _ in range(10): # 10 user mock
             user = User(
                 email=f"{generate_random_string(15)}@apcer.com", # Email anonim terenkripsi
-                username=f"Anonim #{i}",
+                username=f"Anonim #{next_value(dbsession, ANON_USERNAME)}", # Nomor dari sequence yang sama dengan /register
                 created_at=generate_random_date_time(start_date_users, end_date)
             )
             user.set_password("password123") # Password sama untuk kemudahan testing
@@ -187,9 +198,37 @@ def parse_args(argv):
         'config_uri',
         help='File konfigurasi Pyramid, contoh: development.ini',
     )
+    parser.add_argument(
+        '--scale',
+        type=parse_scale,
+        help='Generate data volume besar: jumlah post (10k, 100k, 1M, ...) lewat bulk insert, '
+             'sebagai ganti data mock kecil.',
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help='Seed acak untuk --scale; seed sama menghasilkan data sama (default: 0).',
+    )
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=CHUNK,
+        help=f'Jumlah baris per executemany untuk --scale (default: {CHUNK}).',
+    )
     return parser.parse_args(argv[1:])
 
 
+def generate_scaled_data(engine, settings, args):
+    """Mode --scale: data volume besar dengan distribusi miring (lihat datagen.generate)."""
+    rounds = int(settings.get('auth.bcrypt_rounds', 12))
+    print(f"Generate {args.scale:,} post (seed {args.seed}, {'numpy' if numpy else 'python'}) ...")
+    stats = generate(engine, args.scale, seed=args.seed, chunk=args.chunk_size,
+                     password_hash=hash_password(DEFAULT_PASSWORD, rounds), progress=print_progress)
+    print(stats.report())
+    print(f"Semua user memakai password '{DEFAULT_PASSWORD}', email user<id>@apcer.com.")
+
+
 def main(argv=sys.argv):
     args = parse_args(argv)
     setup_logging(args.config_uri)
@@ -197,18 +236,23 @@ def main(argv=sys.argv):
 
     # Dapatkan settings dari env yang di-bootstrap
     settings = env['request'].registry.settings
-    db_url = settings.get('sqlalchemy.url')
+    prefix = engine_prefix(settings, 'write') # sqlalchemy.write.* jika baca/tulis dipisah
+    db_url = settings.get(prefix + 'url')
     if not db_url:
         print("Pengaturan 'sqlalchemy.url' tidak ditemukan di konfigurasi.", file=sys.stderr)
         sys.exit(1)
 
     # Dapatkan engine dari settings
-    engine = get_engine(settings) # Menggunakan helper dari apcer.models
+    engine = get_engine(settings, prefix) # Menggunakan helper dari apcer.models
 
     # Dapatkan session factory dari engine
     session_factory = get_session_factory(engine) # Menggunakan helper dari apcer.models
 
     try:
+        if args.scale:
+            generate_scaled_data(engine, settings, args)
+            return
+
         # Gunakan transaction.manager sebagai context manager untuk sesi
         with transaction.manager:
             # Dapatkan dbsession yang terikat dengan transaction manager
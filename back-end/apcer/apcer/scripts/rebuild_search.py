@@ -0,0 +1,39 @@
+import argparse
+import sys
+import time
+
+from pyramid.paster import bootstrap, setup_logging
+
+from ..models import get_engine
+from ..models.routing import engine_prefix
+from ..models.search import rebuild_search_index
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Membangun ulang index full-text search posts dari isi tabel posts.',
+    )
+    parser.add_argument(
+        'config_uri',
+        help='File konfigurasi Pyramid, contoh: development.ini',
+    )
+    return parser.parse_args(argv[1:])
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    setup_logging(args.config_uri)
+    env = bootstrap(args.config_uri)
+    settings = env['request'].registry.settings
+
+    engine = get_engine(settings, engine_prefix(settings, 'write'))
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        rebuilt = rebuild_search_index(connection)
+
+    if not rebuilt:
+        print(f"Database {engine.dialect.name} tidak memakai index full-text (search memakai LIKE); "
+              "tidak ada yang dibangun ulang.")
+        return
+    elapsed = time.perf_counter() - started
+    print(f"Index search dibangun ulang dalam {elapsed:.2f} detik.")
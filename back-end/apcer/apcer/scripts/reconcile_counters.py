@@ -0,0 +1,51 @@
+import argparse
+import sys
+import time
+
+from pyramid.paster import bootstrap, setup_logging
+
+from ..models import get_engine, get_session_factory
+from ..models.routing import engine_prefix
+from ..models.counters import recount_post_counters
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Menghitung ulang likes_count/comments_count pada tabel posts dan memperbaiki drift.',
+    )
+    parser.add_argument(
+        'config_uri',
+        help='File konfigurasi Pyramid, contoh: development.ini',
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=1000,
+        help='Jumlah post yang diperiksa per batch (default: 1000).',
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Hanya laporkan drift tanpa menulis perubahan.',
+    )
+    return parser.parse_args(argv[1:])
+
+
+def main(argv=sys.argv):
+    args = parse_args(argv)
+    setup_logging(args.config_uri)
+    env = bootstrap(args.config_uri)
+    settings = env['request'].registry.settings
+
+    session_factory = get_session_factory(get_engine(settings, engine_prefix(settings, 'write')))
+    started = time.perf_counter()
+    # Commit per batch (bukan satu transaksi besar): lock tulis hanya
+    # ditahan selama satu batch, dan progres tidak hilang jika terhenti.
+    with session_factory() as dbsession:
+        checked, repaired = recount_post_counters(
+            dbsession, batch_size=args.batch_size, dry_run=args.dry_run,
+            commit=None if args.dry_run else dbsession.commit)
+
+    elapsed = time.perf_counter() - started
+    action = 'perlu diperbaiki' if args.dry_run else 'diperbaiki'
+    print(f"{checked} post diperiksa, {repaired} {action} dalam {elapsed:.2f} detik.")
@@ -3,11 +3,13 @@ import transaction
 import json
 from webtest import TestApp
 import datetime
+import decimal
 from unittest.mock import patch, MagicMock
 
 from pyramid import testing
 from pyramid.paster import get_appsettings
 from pyramid.httpexceptions import HTTPFound, HTTPForbidden
+from pyramid.response import Response
 
 # Import aplikasi Pyramid utama
 from apcer import main as apcer_main
@@ -29,53 +31,129 @@ from apcer.models.meta import Base
 # These are CLI helper functions, testing them here boosts coverage for that file.
 from apcer.scripts.initialize_db import generate_random_string, generate_random_paragraph, generate_random_date_time
 
+# Batas jumlah statement SQL per request (per route). Angka ini tidak boleh
+# tumbuh bersama jumlah post/komentar: query per baris (N+1) harus gagal di sini.
+QUERY_BUDGETS = {
+    'posts.list': 3,
+    'posts.detail': 3,
+    'posts.comments': 2,
+    # ?shape=normalized: user diambil dengan satu query IN, bukan join
+    'posts.list.normalized': 3,
+    'posts.detail.normalized': 4,
+    'posts.mine': 2,
+    'posts.saved': 2,
+    'auth.me': 1,
+}
+
+
+class QueryCounter:
+    """
+    Context manager yang mencatat setiap statement SQL di ``engine``::
+
+        with QueryCounter(engine) as queries:
+            app.get('/posts')
+        queries.count
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        from sqlalchemy import event
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc):
+        from sqlalchemy import event
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
 
 class BaseTest(unittest.TestCase):
     """Base class for all tests to set up and tear down a clean database."""
 
     def setUp(self):
-        # Configure the application for testing with an in-memory SQLite database
+        import os
+        import tempfile
+        # SQLite berbasis file: app (pool sendiri) dan self.session harus
+        # melihat database yang sama; ':memory:' berbeda per koneksi.
+        self.tmpdir = tempfile.mkdtemp()
         self.settings = {
-            'sqlalchemy.url': 'sqlite:///:memory:',
+            'sqlalchemy.url': 'sqlite:///' + os.path.join(self.tmpdir, 'test.sqlite'),
             'auth.secret': 'supersecret_test_key_for_auth',  # Strong secret for AuthTktPolicy
             'session.secret': 'itsaseekreet_test_for_session', # Strong secret for SignedCookieSessionFactory
+            'auth.bcrypt_rounds': '4',  # bcrypt murah untuk test
+            'auth.hash_workers': '0',   # hash di thread test, tanpa process pool
         }
         self.config = testing.setUp(settings=self.settings)
 
-        # Include necessary Pyramid components
-        self.config.include('pyramid_tm')
-        self.config.include('pyramid_retry')
-        self.config.include('pyramid_sqlalchemy')
-        self.config.include('.models')
-        self.config.include('.routes') # Include routes for TestApp to find views
-        
-        self.config.scan() # Scan for views and other configurations
+        # Create a TestApp to simulate HTTP requests
+        wsgi_app = apcer_main({}, **self.settings)
+        self.registry = wsgi_app.registry
 
-        # Initialize engine and session factory
-        self.engine = get_engine(self.settings)
-        session_factory = get_session_factory(self.engine)
+        def app(environ, start_response):
+            response = wsgi_app(environ, start_response)
+            self._refresh_session()
+            return response
+        self.app = TestApp(app)
 
-        # Create all tables for a clean test environment
+        # Pakai engine milik app dan buat semua tabel
+        self.engine = self.registry['dbengine']
         Base.metadata.create_all(self.engine)
 
-        # Get a session bound to the transaction manager
-        self.session = get_tm_session(session_factory, transaction.manager)
-
-        # Create a TestApp to simulate HTTP requests
-        self.app = TestApp(apcer_main({}, **self.settings))
+        # Session biasa (tanpa transaction manager): helper meng-commit data
+        # agar terlihat oleh request TestApp
+        session_factory = get_session_factory(self.engine)
+        session_factory.configure(expire_on_commit=False)
+        self.session = session_factory()
 
     def tearDown(self):
         """Clean up after each test."""
+        import shutil
         testing.tearDown() # Clean up Pyramid testing state
-        transaction.abort() # Abort any active transaction to release locks/resources
-        Base.metadata.drop_all(self.engine) # Drop all tables for a completely clean slate
+        self.session.close()
+        self.engine.dispose()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _refresh_session(self):
+        """
+        Setelah request app: lepas objek dari self.session (atributnya tetap
+        bisa dibaca) dan akhiri transaksinya, sehingga query berikutnya
+        membaca perubahan yang di-commit app, bukan identity map lama.
+        """
+        self.session.expunge_all()
+        self.session.rollback()
+
+    def assertMaxQueries(self, route_name):
+        """
+        ``with self.assertMaxQueries('posts.list'): ...`` gagal jika blok
+        menjalankan lebih banyak statement dari QUERY_BUDGETS[route_name].
+        """
+        from contextlib import contextmanager
+        budget = QUERY_BUDGETS[route_name]
+
+        @contextmanager
+        def check():
+            with QueryCounter(self.engine) as queries:
+                yield queries
+            self.assertLessEqual(
+                queries.count, budget,
+                f'{route_name}: {queries.count} query (batas {budget}):\n' + '\n'.join(queries.statements))
+        return check()
 
     # --- Helper methods for creating test data ---
     def _create_test_user(self, email="test@example.com", username="testuser", password="password123"):
         user = User(email=email, username=username)
-        user.set_password(password)
+        user.set_password(password, self.registry['password_hasher'])
         self.session.add(user)
-        self.session.flush() # Flush to get the user ID
+        self.session.commit() # Commit agar user terlihat oleh app
         return user
 
     def _login_user(self, email, password):
@@ -88,28 +166,56 @@ class BaseTest(unittest.TestCase):
     def _create_test_post(self, user_id, content="This is a test post content.", is_deleted=False):
         post = Post(user_id=user_id, content=content, is_deleted=is_deleted)
         self.session.add(post)
-        self.session.flush() # Flush to get the post ID
+        self.session.commit()
         return post
 
     def _create_test_comment(self, post_id, user_id, content="A test comment."):
         comment = Comment(post_id=post_id, user_id=user_id, content=content)
         self.session.add(comment)
-        self.session.flush()
+        self.session.commit()
         return comment
 
     def _create_test_reaction(self, post_id, user_id, type='like'):
         reaction = Reaction(post_id=post_id, user_id=user_id, type=type)
         self.session.add(reaction)
-        self.session.flush()
+        self.session.commit()
         return reaction
 
     def _create_test_saved_post(self, post_id, user_id):
         saved_post = SavedPost(post_id=post_id, user_id=user_id)
         self.session.add(saved_post)
-        self.session.flush()
+        self.session.commit()
         return saved_post
 
 
+class MemoryDbTest(unittest.TestCase):
+    """
+    Database SQLite ':memory:' tanpa app WSGI, untuk test yang memanggil
+    model/view langsung: ``self.engine``, ``self.session`` dan ``self.config``
+    (pyramid testing). Subclass menambah data setelah ``super().setUp()``.
+    """
+
+    def setUp(self):
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        self.config = testing.setUp()
+        self.engine = create_engine('sqlite:///:memory:')
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+
+    def tearDown(self):
+        testing.tearDown()
+        self.session.close()
+        self.engine.dispose()
+
+    def _create_users(self, *usernames):
+        users = [User(email=f"{username}@example.com", username=username, password_hash="x")
+                 for username in usernames]
+        self.session.add_all(users)
+        self.session.flush()
+        return users
+
+
 # --- Test Cases for Models ---
 class TestUserModel(BaseTest):
     def test_set_and_check_password(self):
@@ -402,7 +508,8 @@ class TestPostViews(BaseTest):
         
         self.session.commit()
 
-        res = self.app.get('/posts')
+        with self.assertMaxQueries('posts.list'):
+            res = self.app.get('/posts')
         self.assertEqual(res.status_code, 200)
         self.assertIsInstance(res.json, list)
         self.assertEqual(len(res.json), 2)
@@ -432,7 +539,8 @@ class TestPostViews(BaseTest):
         self.session.commit()
 
         cookies = self._login_user(user_logged_in.email, "pass")
-        res = self.app.get('/posts', headers={'Cookie': cookies})
+        with self.assertMaxQueries('posts.list'):
+            res = self.app.get('/posts', headers={'Cookie': cookies})
         self.assertEqual(res.status_code, 200)
         self.assertEqual(len(res.json), 2)
 
@@ -505,7 +613,8 @@ class TestPostViews(BaseTest):
         self.session.commit()
 
         cookies = self._login_user(user.email, "pass")
-        res = self.app.get(f'/posts/{post.id}', headers={'Cookie': cookies})
+        with self.assertMaxQueries('posts.detail'):
+            res = self.app.get(f'/posts/{post.id}', headers={'Cookie': cookies})
         self.assertEqual(res.status_code, 200)
         self.assertEqual(res.json['id'], post.id)
         self.assertEqual(res.json['content'], "Detail post content.")
@@ -516,6 +625,8 @@ class TestPostViews(BaseTest):
         self.assertEqual(len(res.json['comments']), 1)
         self.assertEqual(res.json['comments'][0]['content'], "A comment.")
         self.assertEqual(res.json['comments'][0]['user']['username'], "detailuser")
+        self.assertEqual(res.json['comments_count'], 1)
+        self.assertIsNone(res.json['comments_next_cursor'])
 
     def test_post_detail_not_found(self):
         # Targets post_views.py line 79 (if not post branch)
@@ -549,7 +660,8 @@ class TestPostViews(BaseTest):
         self.session.commit()
 
         cookies = self._login_user("mypostuser1@example.com", "pass1")
-        res = self.app.get('/posts/mine', headers={'Cookie': cookies})
+        with self.assertMaxQueries('posts.mine'):
+            res = self.app.get('/posts/mine', headers={'Cookie': cookies})
 
         self.assertEqual(res.status_code, 200)
         self.assertIsInstance(res.json, list)
@@ -1158,4 +1270,1503 @@ class TestInitializeDbHelpers(unittest.TestCase):
         dt = generate_random_date_time(start, end)
         self.assertIsInstance(dt, datetime.datetime)
         self.assertGreaterEqual(dt, start)
-        self.assertLessEqual(dt, end)
\ No newline at end of file
+        self.assertLessEqual(dt, end)
+
+# --- Test Cases for Post Hydration (hydration.py) ---
+class TestHydratePosts(MemoryDbTest):
+    def setUp(self):
+        super().setUp()
+        self.alice, self.bob = self._create_users("alice", "bob")
+        self.post1 = Post(user_id=self.alice.id, content="first")
+        self.post2 = Post(user_id=self.bob.id, content="second")
+        self.session.add_all([self.post1, self.post2])
+        self.session.flush()
+
+    def test_counts_and_flags(self):
+        from apcer.hydration import hydrate_posts
+        self.session.add_all([
+            Reaction(user_id=self.alice.id, post_id=self.post1.id, type='like'),
+            Reaction(user_id=self.bob.id, post_id=self.post1.id, type='like'),
+            Comment(user_id=self.bob.id, post_id=self.post1.id, content="hi"),
+            Comment(user_id=self.bob.id, post_id=self.post1.id, content="gone", is_deleted=True),
+            SavedPost(user_id=self.alice.id, post_id=self.post2.id),
+        ])
+        self.session.flush()
+
+        stats = hydrate_posts(self.session, [self.post1.id, self.post2.id], self.alice.id)
+        self.assertEqual(stats[self.post1.id], {
+            'likes_count': 2, 'comments_count': 1, 'is_liked': True, 'is_saved': False,
+        })
+        self.assertEqual(stats[self.post2.id], {
+            'likes_count': 0, 'comments_count': 0, 'is_liked': False, 'is_saved': True,
+        })
+
+        anonymous = hydrate_posts(self.session, [self.post1.id], None)
+        self.assertFalse(anonymous[self.post1.id]['is_liked'])
+        self.assertEqual(anonymous[self.post1.id]['likes_count'], 2)
+
+    def test_single_query_regardless_of_post_count(self):
+        from sqlalchemy import event
+        from apcer.hydration import hydrate_posts
+        for i in range(20):
+            self.session.add(Post(user_id=self.alice.id, content=f"post {i}"))
+        self.session.flush()
+        post_ids = [p.id for p in self.session.query(Post).all()]
+
+        statements = []
+        event.listen(self.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+        stats = hydrate_posts(self.session, post_ids, self.bob.id)
+        self.assertEqual(len(statements), 1)
+        self.assertEqual(len(stats), len(post_ids))
+
+    def test_empty_ids_skip_query(self):
+        from apcer.hydration import hydrate_posts
+        self.assertEqual(hydrate_posts(self.session, [], self.alice.id), {})
+
+
+# --- Test Cases for Keyset Pagination (pagination.py) ---
+class TestPagination(MemoryDbTest):
+    def setUp(self):
+        super().setUp()
+        self.user, = self._create_users("pager")
+
+    def test_cursor_roundtrip(self):
+        from apcer.pagination import encode_cursor, decode_cursor
+        created_at = datetime.datetime(2025, 5, 24, 16, 18, 11)
+        self.assertEqual(decode_cursor(encode_cursor(created_at, 42)), (created_at, 42))
+
+    def test_invalid_cursor_and_limit(self):
+        from apcer.pagination import decode_cursor, page_params, InvalidPageParams
+        with self.assertRaises(InvalidPageParams):
+            decode_cursor('not-a-cursor')
+        request = testing.DummyRequest(params={'limit': 'abc'})
+        with self.assertRaises(InvalidPageParams):
+            page_params(request)
+        request = testing.DummyRequest(params={'limit': '1000'})
+        self.assertEqual(page_params(request, max_limit=50), (50, None))
+
+    def test_keyset_walks_all_rows_once_with_timestamp_ties(self):
+        from apcer.pagination import keyset, split_page, decode_cursor
+        same_second = datetime.datetime(2025, 1, 1, 12, 0, 0)
+        for i in range(7):
+            self.session.add(Post(user_id=self.user.id, content=f"tie {i}", created_at=same_second))
+        # Baris dengan server_default (CURRENT_TIMESTAMP) ikut diuji
+        for i in range(3):
+            self.session.add(Post(user_id=self.user.id, content=f"now {i}"))
+        self.session.flush()
+
+        seen, cursor = [], None
+        while True:
+            query = self.session.query(Post)
+            page, next_cursor = split_page(
+                keyset(query, Post.created_at, Post.id, cursor, 3), 3,
+                key=lambda post: (post.created_at, post.id))
+            seen.extend(post.id for post in page)
+            if not next_cursor:
+                break
+            cursor = decode_cursor(next_cursor)
+
+        self.assertEqual(len(seen), 10)
+        self.assertEqual(len(set(seen)), 10)
+        ordered = self.session.query(Post).order_by(Post.created_at.desc(), Post.id.desc()).all()
+        self.assertEqual(seen, [post.id for post in ordered])
+
+
+# --- Test Cases for Denormalized Post Counters (models/counters.py) ---
+class TestPostCounters(MemoryDbTest):
+    def setUp(self):
+        super().setUp()
+        self.user, = self._create_users("counter")
+        self.post = Post(user_id=self.user.id, content="count me")
+        self.session.add(self.post)
+        self.session.flush()
+
+    def _counts(self):
+        self.session.expire(self.post)
+        return self.post.likes_count, self.post.comments_count
+
+    def test_counters_follow_reactions_and_comments(self):
+        reaction = Reaction(user_id=self.user.id, post_id=self.post.id, type='like')
+        comment = Comment(user_id=self.user.id, post_id=self.post.id, content="hi")
+        self.session.add_all([reaction, comment])
+        self.session.flush()
+        self.assertEqual(self._counts(), (1, 1))
+
+        comment.is_deleted = True  # soft-delete
+        self.session.delete(reaction)  # unlike
+        self.session.flush()
+        self.assertEqual(self._counts(), (0, 0))
+
+    def test_recount_repairs_drift(self):
+        from sqlalchemy import update
+        from apcer.models.counters import recount_post_counters
+        self.session.add(Comment(user_id=self.user.id, post_id=self.post.id, content="hi"))
+        self.session.flush()
+        self.session.execute(update(Post.__table__).values(likes_count=7, comments_count=0))
+
+        self.assertEqual(recount_post_counters(self.session, dry_run=True), (1, 1))
+        self.assertEqual(self._counts(), (7, 0))
+        self.assertEqual(recount_post_counters(self.session, batch_size=1), (1, 1))
+        self.assertEqual(self._counts(), (0, 1))
+        self.assertEqual(recount_post_counters(self.session), (1, 0))
+
+    def test_recount_commits_each_batch(self):
+        from sqlalchemy import update
+        from apcer.models.counters import recount_post_counters
+        self.session.add(Post(user_id=self.user.id, content="second"))
+        self.session.flush()
+        self.session.execute(update(Post.__table__).values(likes_count=3))
+        commits = []
+        self.assertEqual(recount_post_counters(self.session, batch_size=1, commit=lambda: commits.append(1)),
+                         (2, 2))
+        self.assertEqual(len(commits), 2)
+        self.assertEqual(self._counts(), (0, 0))
+
+
+# --- Test Cases for Saved Posts View (GET /posts/saved) ---
+class TestSavedPostsView(MemoryDbTest):
+    def setUp(self):
+        super().setUp()
+        self.user, self.other = self._create_users("saver", "other")
+
+    def _request(self, userid, **params):
+        from urllib.parse import urlencode
+        from pyramid.request import Request
+        self.config.testing_securitypolicy(userid=userid)
+        request = Request.blank('/posts/saved?' + urlencode(params))
+        request.registry = self.config.registry
+        request.dbsession = self.session
+        return request
+
+    def test_saved_posts_are_paginated_by_saved_at(self):
+        from apcer.views.post_views import saved_posts
+        posts = [Post(user_id=self.other.id, content=f"post {i}") for i in range(4)]
+        self.session.add_all(posts)
+        self.session.flush()
+        base = datetime.datetime(2025, 1, 1)
+        for i, post in enumerate(posts[:3]):
+            self.session.add(SavedPost(user_id=self.user.id, post_id=post.id,
+                                       saved_at=base + datetime.timedelta(minutes=i)))
+        self.session.add(SavedPost(user_id=self.other.id, post_id=posts[3].id))
+        posts[2].is_deleted = True
+        self.session.flush()
+
+        response = saved_posts(self._request(self.user.id, limit='1'))
+        first_page = json.loads(response.body)
+        self.assertEqual([p['id'] for p in first_page], [posts[1].id])
+        self.assertTrue(first_page[0]['isSaved'])
+        self.assertEqual(first_page[0]['username'], 'other')
+
+        cursor = response.headers['X-Next-Cursor']
+        response = saved_posts(self._request(self.user.id, limit='1', cursor=cursor))
+        self.assertEqual([p['id'] for p in json.loads(response.body)], [posts[0].id])
+        self.assertNotIn('X-Next-Cursor', response.headers)
+
+    def test_saved_posts_requires_login(self):
+        from apcer.views.post_views import saved_posts
+        response = saved_posts(self._request(None))
+        self.assertEqual(response.status_code, 401)
+
+
+# --- Test Cases for Hot-Path Indexes ---
+class TestHotPathIndexes(MemoryDbTest):
+    def _plan(self, statement):
+        from sqlalchemy.orm import Session
+        from apcer.pagination import keyset
+        with Session(self.engine) as session:
+            query = keyset(statement(session), *statement.keyset, None, 20)
+            compiled = query.statement.compile(self.engine, compile_kwargs={'literal_binds': True})
+            rows = session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").all()
+        return ' | '.join(row[-1] for row in rows)
+
+    def test_create_all_builds_partial_indexes(self):
+        from sqlalchemy import inspect
+        inspector = inspect(self.engine)
+        names = {
+            index['name']
+            for table in ('posts', 'comments', 'reactions', 'saved_posts')
+            for index in inspector.get_indexes(table)
+        }
+        self.assertTrue({
+            'ix_posts_feed', 'ix_posts_user_feed', 'ix_comments_post_feed',
+            'ix_reactions_post_type', 'ix_saved_posts_user_saved_at',
+        } <= names)
+
+    def test_feed_queries_use_indexes_without_sorting(self):
+        def feed(session):
+            return session.query(Post).filter(Post.is_deleted == False)
+        feed.keyset = (Post.created_at, Post.id)
+
+        def mine(session):
+            return session.query(Post).filter(Post.user_id == 1, Post.is_deleted == False)
+        mine.keyset = (Post.created_at, Post.id)
+
+        def saved(session):
+            return session.query(SavedPost).filter(SavedPost.user_id == 1)
+        saved.keyset = (SavedPost.saved_at, SavedPost.id)
+
+        for statement, index in [(feed, 'ix_posts_feed'), (mine, 'ix_posts_user_feed'),
+                                 (saved, 'ix_saved_posts_user_saved_at')]:
+            plan = self._plan(statement)
+            self.assertIn(index, plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+
+# --- Test Cases for Response Cache (cache.py) ---
+class FakeRedis:
+    """Pengganti klien Redis di memori (get/setex/incr)."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1).encode('ascii')
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.config = testing.setUp()
+
+    def tearDown(self):
+        testing.tearDown()
+
+    def test_memory_cache_evicts_lru_and_expires(self):
+        from apcer.cache import MemoryCache
+        cache = MemoryCache(max_entries=2, ttl=30)
+        cache.set('a', b'1')
+        cache.set('b', b'2')
+        cache.get('a')
+        cache.set('c', b'3')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), b'1')
+
+        expired = MemoryCache(ttl=-1)
+        expired.set('a', b'1')
+        self.assertIsNone(expired.get('a'))
+
+    def test_sqlite_cache_is_shared_between_instances(self):
+        import os, tempfile
+        from apcer.cache import SQLiteCache
+        path = os.path.join(tempfile.mkdtemp(), 'cache.sqlite')
+        writer, reader = SQLiteCache(path), SQLiteCache(path)
+        writer.set('/posts', b'payload')
+        self.assertEqual(reader.get('/posts'), b'payload')
+        reader.clear()
+        self.assertIsNone(writer.get('/posts'))
+
+    def test_redis_cache_invalidates_by_generation(self):
+        from apcer.cache import RedisCache
+        cache = RedisCache(client=FakeRedis())
+        cache.set('/posts', b'payload')
+        self.assertEqual(cache.get('/posts'), b'payload')
+        cache.clear()
+        self.assertIsNone(cache.get('/posts'))
+
+    def test_decorator_serves_anonymous_hits_and_counts_stats(self):
+        from apcer.cache import ResponseCache, MemoryCache, cache_anonymous
+        cache = ResponseCache(MemoryCache())
+        self.config.registry['response_cache'] = cache
+        calls = []
+
+        @cache_anonymous
+        def view(context, request):
+            calls.append(request)
+            response = Response(json.dumps([1, 2]).encode('utf-8'), content_type='application/json')
+            response.headers['X-Next-Cursor'] = 'abc'
+            return response
+
+        first = view(None, testing.DummyRequest(path='/posts'))
+        second = view(None, testing.DummyRequest(path='/posts'))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((first.headers['X-Cache'], second.headers['X-Cache']), ('MISS', 'HIT'))
+        self.assertEqual(second.body, first.body)
+        self.assertEqual(second.headers['X-Next-Cursor'], 'abc')
+
+        self.config.testing_securitypolicy(userid=1)
+        view(None, testing.DummyRequest(path='/posts'))
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1, 'invalidations': 0})
+
+    def test_invalidation_runs_after_commit(self):
+        from apcer.cache import ResponseCache, MemoryCache, invalidate_post_cache
+        cache = ResponseCache(MemoryCache())
+        cache.backend.set('/posts', b'stale')
+        self.config.registry['response_cache'] = cache
+        manager = transaction.TransactionManager(explicit=True)
+        manager.begin()
+        invalidate_post_cache(testing.DummyRequest(tm=manager))
+        self.assertEqual(cache.backend.get('/posts'), b'stale')
+        manager.commit()
+        self.assertIsNone(cache.backend.get('/posts'))
+        self.assertEqual(cache.stats()['invalidations'], 1)
+
+    def test_read_interleaved_with_invalidation_is_not_stored(self):
+        import os, tempfile
+        from apcer.cache import ResponseCache, MemoryCache, SQLiteCache, RedisCache, cache_anonymous
+        backends = [MemoryCache(), SQLiteCache(os.path.join(tempfile.mkdtemp(), 'cache.sqlite')),
+                    RedisCache(client=FakeRedis())]
+        for backend in backends:
+            with self.subTest(backend=type(backend).__name__):
+                cache = ResponseCache(backend)
+                self.config.registry['response_cache'] = cache
+                bodies = iter([b'["sebelum"]', b'["sesudah"]'])
+
+                @cache_anonymous
+                def view(context, request):
+                    body = next(bodies)
+                    if body == b'["sebelum"]':
+                        # Penulis commit dan mengosongkan cache saat pembaca ini masih berjalan
+                        cache.clear()
+                    return Response(body, content_type='application/json')
+
+                self.assertEqual(view(None, testing.DummyRequest(path='/posts')).body, b'["sebelum"]')
+                second = view(None, testing.DummyRequest(path='/posts'))
+                self.assertEqual((second.body, second.headers['X-Cache']), (b'["sesudah"]', 'MISS'))
+                third = view(None, testing.DummyRequest(path='/posts'))
+                self.assertEqual((third.body, third.headers['X-Cache']), (b'["sesudah"]', 'HIT'))
+
+
+# --- Test Cases for Conditional Responses (ETag / If-None-Match) ---
+class TestConditionalResponses(MemoryDbTest):
+    def setUp(self):
+        super().setUp()
+        self.user, = self._create_users("etag")
+        self.post = Post(user_id=self.user.id, content="cache me")
+        self.session.add(self.post)
+        self.session.flush()
+
+    def _get(self, path, matchdict=None, **headers):
+        from pyramid.request import Request
+        request = Request.blank(path, headers=headers)
+        request.registry = self.config.registry
+        request.dbsession = self.session
+        request.matchdict = matchdict or {}
+        return request
+
+    def test_list_posts_answers_304_without_building_body(self):
+        from apcer.views import post_views
+        first = post_views.list_posts(self._get('/posts'))
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first.headers['ETag'].startswith('W/"'))
+        self.assertEqual(first.headers['Cache-Control'], 'private, no-cache')
+        self.assertIn('Last-Modified', first.headers)
+
+        with patch.object(post_views, 'feed_item', side_effect=AssertionError('body dibangun')):
+            second = post_views.list_posts(self._get('/posts', If_None_Match=first.headers['ETag']))
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.body, b'')
+
+        self.session.add(Reaction(user_id=self.user.id, post_id=self.post.id, type='like'))
+        self.session.flush()
+        third = post_views.list_posts(self._get('/posts', If_None_Match=first.headers['ETag']))
+        self.assertEqual(third.status_code, 200)
+        self.assertNotEqual(third.headers['ETag'], first.headers['ETag'])
+
+    def test_post_detail_etag_tracks_comments(self):
+        from apcer.views.post_views import post_detail
+        matchdict = {'id': str(self.post.id)}
+        first = post_detail(self._get('/posts/1', matchdict))
+        etag = first.headers['ETag']
+        self.assertEqual(post_detail(self._get('/posts/1', matchdict, If_None_Match=etag)).status_code, 304)
+
+        self.session.add(Comment(user_id=self.user.id, post_id=self.post.id, content="new"))
+        self.session.flush()
+        self.assertEqual(post_detail(self._get('/posts/1', matchdict, If_None_Match=etag)).status_code, 200)
+
+    def test_same_second_edits_change_etag(self):
+        from sqlalchemy import update
+        from apcer.views.post_views import list_posts, post_detail
+        matchdict = {'id': str(self.post.id)}
+        stamp = datetime.datetime(2025, 1, 1, 12, 0, 0)  # updated_at SQLite beresolusi detik
+        etags = []
+        for content in ("edit pertama", "edit kedua"):
+            self.session.execute(update(Post.__table__).values(content=content, updated_at=stamp))
+            etags.append((post_detail(self._get('/posts/1', matchdict)).headers['ETag'],
+                          list_posts(self._get('/posts')).headers['ETag']))
+        self.assertNotEqual(etags[0][0], etags[1][0])
+        self.assertNotEqual(etags[0][1], etags[1][1])
+        response = post_detail(self._get('/posts/1', matchdict, If_None_Match=etags[0][0]))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'edit kedua', response.body)
+
+
+class TestJsonRenderer(unittest.TestCase):
+    def setUp(self):
+        from apcer import renderers
+        self.renderers = renderers
+        self.data = {
+            'createdAt': datetime.datetime(2025, 5, 24, 16, 18, 11),
+            'score': decimal.Decimal('1.5'),
+            'username': 'Anonim ñ',
+        }
+
+    def test_dumps_compact_with_adapters(self):
+        body = self.renderers.dumps(self.data)
+        self.assertNotIn(b' ', body.replace('Anonim ñ'.encode('utf-8'), b''))
+        self.assertEqual(json.loads(body), {
+            'createdAt': '2025-05-24T16:18:11', 'score': 1.5, 'username': 'Anonim ñ'})
+
+    def test_stdlib_fallback_matches(self):
+        with patch.object(self.renderers, 'orjson', None):
+            body = self.renderers.dumps(self.data)
+        self.assertEqual(json.loads(body), json.loads(self.renderers.dumps(self.data)))
+
+    def test_json_response(self):
+        response = self.renderers.json_response({'success': False}, status=400)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.content_type, 'application/json')
+        self.assertEqual(response.json_body, {'success': False})
+
+    def test_renderer_uses_adapters(self):
+        render = self.renderers.json_renderer()(None)
+        body = render({'at': datetime.date(2025, 5, 24)}, {})
+        self.assertEqual(body, '{"at":"2025-05-24"}')
+
+
+class TestCompression(unittest.TestCase):
+    def setUp(self):
+        from apcer.compression import Compressor
+        self.compressor = Compressor(min_size=100)
+        self.body = json.dumps([{'id': i, 'content': 'lorem ipsum dolor sit amet'} for i in range(50)]).encode('utf-8')
+
+    def _call(self, body=None, accept='gzip', etag=None, **kw):
+        from pyramid.request import Request
+        headers = {'Accept-Encoding': accept} if accept else {}
+        request = Request.blank('/posts', headers=headers)
+        response = Response(body=self.body if body is None else body, content_type='application/json', **kw)
+        if etag:
+            response.headers['ETag'] = etag
+        return self.compressor(request, response)
+
+    def test_gzip_above_threshold(self):
+        import gzip
+        response = self._call()
+        self.assertEqual(response.content_encoding, 'gzip')
+        self.assertIn('Accept-Encoding', response.vary)
+        self.assertEqual(gzip.decompress(response.body), self.body)
+        self.assertLess(len(response.body) * 5, len(self.body))
+
+    def test_skips_small_body_and_missing_header(self):
+        self.assertIsNone(self._call(body=b'{"success":true}').content_encoding)
+        response = self._call(accept=None)
+        self.assertIsNone(response.content_encoding)
+        self.assertIn('Accept-Encoding', response.vary)
+
+    def test_skips_already_encoded_and_non_200(self):
+        self.assertEqual(self._call(content_encoding='br').body, self.body)
+        self.assertIsNone(self._call(status=404).content_encoding)
+
+    def test_reuses_compressed_bytes_by_etag(self):
+        with patch.object(self.compressor, 'compress', wraps=self.compressor.compress) as compress:
+            first = self._call(etag='W/"abc"')
+            second = self._call(etag='W/"abc"')
+        self.assertEqual(compress.call_count, 1)
+        self.assertEqual(first.body, second.body)
+        self.assertEqual(self.compressor.stats()['cache_hits'], 1)
+
+    def test_same_etag_different_body_is_not_reused(self):
+        import gzip
+        self._call(etag='W/"abc"')
+        edited = self.body.replace(b'lorem', b'LOREM')
+        response = self._call(body=edited, etag='W/"abc"')
+        self.assertEqual(gzip.decompress(response.body), edited)
+        self.assertEqual(self.compressor.stats()['cache_hits'], 0)
+
+
+class TestPasswordHasher(MemoryDbTest):
+    def setUp(self):
+        super().setUp()
+        from apcer.hashing import PasswordHasher
+        self.config.testing_securitypolicy(userid=None)
+        self.hasher = PasswordHasher(rounds=5, workers=0)
+        self.config.registry['password_hasher'] = self.hasher
+
+    def _login(self, password):
+        from pyramid.request import Request
+        from apcer.views.auth import api_login
+        request = Request.blank('/login', method='POST', POST=json.dumps({'email': 'a@x.com', 'password': password}),
+                                content_type='application/json')
+        request.registry = self.config.registry
+        request.dbsession = self.session
+        return request, api_login(request)
+
+    def test_hash_verify_and_cost(self):
+        from apcer.hashing import bcrypt_cost
+        hashed = self.hasher.hash('rahasia')
+        self.assertEqual(bcrypt_cost(hashed), 5)
+        self.assertTrue(self.hasher.verify('rahasia', hashed))
+        self.assertFalse(self.hasher.verify('salah', hashed))
+        self.assertFalse(self.hasher.needs_rehash(hashed))
+        self.assertIsNone(bcrypt_cost('bukan-hash'))
+
+    def test_busy_when_queue_full(self):
+        from apcer.hashing import PasswordHasher, HasherBusy
+        hasher = PasswordHasher(rounds=4, workers=0, max_pending=1, timeout=0.01)
+        hasher._slots.acquire()
+        with self.assertRaises(HasherBusy):
+            hasher.hash('rahasia')
+
+    def test_login_rehashes_different_cost(self):
+        import bcrypt
+        from apcer.hashing import bcrypt_cost
+        user = User(email='a@x.com', username='a')
+        user.password_hash = bcrypt.hashpw(b'pw', bcrypt.gensalt(4)).decode('utf-8')
+        self.session.add(user)
+        self.session.flush()
+
+        request, result = self._login('pw')
+        self.assertTrue(result['success'])
+        self.assertEqual(bcrypt_cost(user.password_hash), 5)
+        self.assertTrue(user.check_password('pw'))
+
+        request, result = self._login('salah')
+        self.assertEqual(request.response.status_code, 401)
+
+    def test_login_busy_returns_503(self):
+        from apcer.hashing import HasherBusy
+        user = User(email='a@x.com', username='a')
+        user.set_password('pw', self.hasher)
+        self.session.add(user)
+        self.session.flush()
+        with patch.object(self.hasher, 'verify', side_effect=HasherBusy()):
+            request, result = self._login('pw')
+        self.assertEqual(request.response.status_code, 503)
+        self.assertFalse(result['success'])
+
+
+class TestAnonUsernameSequence(MemoryDbTest):
+    def setUp(self):
+        super().setUp()
+        from sqlalchemy import event
+        from apcer.hashing import PasswordHasher
+        self.config.testing_securitypolicy(userid=None)
+        self.config.registry['password_hasher'] = PasswordHasher(rounds=4, workers=0)
+        self.statements = []
+        event.listen(self.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: self.statements.append(statement))
+
+    def _register(self):
+        from pyramid.request import Request
+        from apcer.views.auth import api_register
+        request = Request.blank('/register', method='POST')
+        request.registry = self.config.registry
+        request.dbsession = self.session
+        return request, api_register(request)
+
+    def test_next_value_seeds_from_highest_anon_number(self):
+        from apcer.models.sequence import next_value, ANON_USERNAME
+        # Celah: "Anonim #2" s.d. "#4" sudah dihapus, jumlah user hanya 3
+        usernames = ['Anonim #1', 'Anonim #5', 'pengguna']
+        self.session.add_all([User(email=f'{i}@x.com', username=username, password_hash='x')
+                              for i, username in enumerate(usernames)])
+        self.session.flush()
+        self.assertEqual(next_value(self.session, ANON_USERNAME), 6)
+        self.assertEqual(next_value(self.session, ANON_USERNAME), 7)
+        self.assertEqual(next_value(self.session, 'lain'), 1)
+
+    def test_register_without_count_scan(self):
+        self._register()
+        self.statements.clear()
+        request, result = self._register()
+        self.assertTrue(result['success'])
+        self.assertEqual(result['user']['username'], 'Anonim #2')
+        self.assertFalse([s for s in self.statements if 'count(' in s.lower()])
+        self.assertEqual(len([s for s in self.statements if s.startswith('INSERT INTO users')]), 1)
+        self.assertFalse([s for s in self.statements if s.startswith('SELECT') and 'FROM users' in s])
+
+    def test_register_username_collision(self):
+        self.session.add(User(email='a@x.com', username='Anonim #1', password_hash='x'))
+        self.session.flush()
+        from apcer.models.sequence import NamedSequence, ANON_USERNAME
+        self.session.add(NamedSequence(name=ANON_USERNAME, value=0))
+        self.session.flush()
+
+        request, result = self._register()
+        self.assertEqual(request.response.status_code, 400)
+        self.assertFalse(result['success'])
+
+        request, result = self._register()
+        self.assertEqual(result['user']['username'], 'Anonim #2')
+
+
+class TestSqlitePragmas(unittest.TestCase):
+    def setUp(self):
+        import os
+        import tempfile
+        self.tmpdir = tempfile.mkdtemp()
+        self.url = 'sqlite:///' + os.path.join(self.tmpdir, 'pragma.sqlite')
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_profile_applied_on_each_connection(self):
+        from apcer.models.pragmas import active_pragmas
+        engine = get_engine({'sqlalchemy.url': self.url, 'sqlite.cache_size': '-1024'})
+        try:
+            pragmas = active_pragmas(engine)
+            self.assertEqual(pragmas['journal_mode'], 'wal')
+            self.assertEqual(pragmas['synchronous'], 1)
+            self.assertEqual(pragmas['cache_size'], -1024)
+            self.assertEqual(pragmas['busy_timeout'], 5000)
+            self.assertEqual(pragmas['foreign_keys'], 1)
+        finally:
+            engine.dispose()
+
+    def test_empty_setting_skips_pragma(self):
+        from apcer.models.pragmas import sqlite_pragmas, active_pragmas
+        settings = {'sqlalchemy.url': self.url, 'sqlite.journal_mode': '', 'sqlite.synchronous': ''}
+        self.assertNotIn('journal_mode', sqlite_pragmas(settings))
+        engine = get_engine(settings)
+        try:
+            self.assertEqual(active_pragmas(engine)['journal_mode'], 'delete')
+        finally:
+            engine.dispose()
+
+    def test_invalid_value_rejected(self):
+        from apcer.models.pragmas import sqlite_pragmas
+        with self.assertRaises(ValueError):
+            sqlite_pragmas({'sqlite.journal_mode': 'WAL; DROP TABLE users'})
+
+
+class TestGroupCommitWriter(unittest.TestCase):
+    def setUp(self):
+        import os
+        import tempfile
+        from apcer.writer import writer_from_settings
+        self.tmpdir = tempfile.mkdtemp()
+        settings = {'sqlalchemy.url': 'sqlite:///' + os.path.join(self.tmpdir, 'writer.sqlite'), 'writer.enabled': 'true'}
+        self.engine = get_engine(settings)
+        Base.metadata.create_all(self.engine)
+        with self.engine.begin() as connection:
+            connection.exec_driver_sql(
+                "INSERT INTO users (email, username, password_hash) VALUES ('a@x.com', 'a', 'x')")
+        self.writer = writer_from_settings(settings)
+
+    def tearDown(self):
+        import shutil
+        self.writer.stop()
+        self.engine.dispose()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def _insert(self, content):
+        def insert_post(dbsession):
+            post = Post(user_id=1, content=content)
+            dbsession.add(post)
+            dbsession.flush()
+            return post.id
+        return insert_post
+
+    def _contents(self):
+        with self.engine.connect() as connection:
+            return sorted(row[0] for row in connection.exec_driver_sql('SELECT content FROM posts'))
+
+    def test_queued_jobs_share_one_commit(self):
+        from apcer.writer import WriteJob
+        jobs = [WriteJob(self._insert(f'post {i}')) for i in range(5)]
+        for job in jobs[1:]:
+            self.writer._queue.put(job)
+        self.writer._commit(self.writer._collect(jobs[0]))
+
+        self.assertEqual([job.wait() for job in jobs], [1, 2, 3, 4, 5])
+        self.assertEqual(self.writer.stats(), {'batches': 1, 'jobs': 5, 'queued': 0})
+        self.assertEqual(len(self._contents()), 5)
+
+    def test_failed_job_does_not_abort_batch(self):
+        from apcer.writer import WriteJob
+
+        def broken(dbsession):
+            dbsession.add(Post(user_id=1, content='gagal'))
+            dbsession.flush()
+            raise ValueError('gagal')
+
+        jobs = [WriteJob(self._insert('a')), WriteJob(broken), WriteJob(self._insert('b'))]
+        self.writer._commit(jobs)
+
+        self.assertEqual(jobs[0].wait(), 1)
+        with self.assertRaises(ValueError):
+            jobs[1].wait()
+        self.assertEqual(self._contents(), ['a', 'b'])
+
+    def test_submit_from_threads(self):
+        import threading
+        self.writer.start()
+        threads = [threading.Thread(target=self.writer.submit, args=(self._insert(f't{i}'),)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self._contents()), 8)
+
+    def test_run_write_without_writer_uses_request_session(self):
+        from apcer.writer import run_write
+        request = testing.DummyRequest()
+        request.registry = {}
+        request.dbsession = MagicMock()
+        self.assertIs(run_write(request, lambda dbsession: dbsession), request.dbsession)
+
+
+class TestInstrumentedPool(unittest.TestCase):
+    def setUp(self):
+        import os
+        import tempfile
+        self.tmpdir = tempfile.mkdtemp()
+        self.url = 'sqlite:///' + os.path.join(self.tmpdir, 'pool.sqlite')
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_pool_settings_and_wait_metrics(self):
+        from apcer.models.pool import InstrumentedQueuePool, pool_stats
+        engine = get_engine({'sqlalchemy.url': self.url, 'sqlalchemy.pool_size': '2',
+                             'sqlalchemy.max_overflow': '2', 'sqlalchemy.pool_pre_ping': 'true'})
+        try:
+            self.assertIsInstance(engine.pool, InstrumentedQueuePool)
+            with engine.connect():
+                stats = pool_stats(engine)
+                self.assertEqual(stats['size'], 2)
+                self.assertEqual(stats['checked_out'], 1)
+                self.assertEqual(stats['utilisation'], 0.25)
+            self.assertEqual(pool_stats(engine)['checkouts'], 1)
+
+            engine.dispose()
+            with engine.connect():
+                pass
+            self.assertEqual(pool_stats(engine)['checkouts'], 2)
+        finally:
+            engine.dispose()
+
+    def test_pool_timeout_counted(self):
+        from sqlalchemy.exc import TimeoutError as PoolTimeout
+        from apcer.models.pool import pool_stats
+        engine = get_engine({'sqlalchemy.url': self.url, 'sqlalchemy.pool_size': '1',
+                             'sqlalchemy.max_overflow': '0', 'sqlalchemy.pool_timeout': '0'})
+        try:
+            with engine.connect():
+                with self.assertRaises(PoolTimeout):
+                    engine.connect()
+            self.assertEqual(pool_stats(engine)['timeouts'], 1)
+        finally:
+            engine.dispose()
+
+    def test_memory_sqlite_keeps_default_pool(self):
+        from apcer.models.pool import InstrumentedQueuePool
+        engine = get_engine({'sqlalchemy.url': 'sqlite:///:memory:'})
+        self.assertNotIsInstance(engine.pool, InstrumentedQueuePool)
+
+
+class TestReadOnlyRequests(MemoryDbTest):
+    def setUp(self):
+        super().setUp()
+        from apcer.models.readonly import get_read_only_session_factory
+        self.factory = get_read_only_session_factory(self.engine)
+
+    def _request(self, method):
+        from pyramid.request import Request
+        request = Request.blank('/posts', method=method)
+        request.registry = self.config.registry
+        return request
+
+    def test_activate_hook_skips_safe_methods(self):
+        from apcer.models.readonly import tm_activate_hook
+        self.assertFalse(tm_activate_hook(self._request('GET')))
+        self.assertFalse(tm_activate_hook(self._request('HEAD')))
+        self.assertTrue(tm_activate_hook(self._request('POST')))
+        self.assertTrue(tm_activate_hook(self._request('DELETE')))
+
+        self.config.registry.settings['db.read_only_get'] = 'false'
+        self.assertTrue(tm_activate_hook(self._request('GET')))
+
+    def test_read_only_session_rejects_flush(self):
+        from apcer.models.readonly import ReadOnlySessionError
+        session = self.factory()
+        self.assertEqual(session.query(Post).count(), 0)
+        session.add(User(email='a@x.com', username='a', password_hash='x'))
+        with self.assertRaises(ReadOnlySessionError):
+            session.flush()
+        session.close()
+
+    def test_session_closed_when_request_finishes(self):
+        from apcer.models.readonly import get_read_only_session
+        request = self._request('GET')
+        session = get_read_only_session(self.factory, request)
+        session.query(Post).all()
+        self.assertTrue(session.in_transaction())
+        request._process_finished_callbacks()
+        self.assertFalse(session.in_transaction())
+
+
+class TestReadWriteRouting(unittest.TestCase):
+    def setUp(self):
+        import os
+        import tempfile
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'routing.sqlite')
+        self.config = testing.setUp(settings={})
+
+    def tearDown(self):
+        import shutil
+        testing.tearDown()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_engine_prefix_falls_back_to_single_engine(self):
+        from apcer.models.routing import engine_prefix
+        settings = {'sqlalchemy.url': 'sqlite://'}
+        self.assertEqual(engine_prefix(settings, 'read'), 'sqlalchemy.')
+        self.assertEqual(engine_prefix(settings, 'write'), 'sqlalchemy.')
+        settings['sqlalchemy.read.url'] = 'sqlite://'
+        self.assertEqual(engine_prefix(settings, 'read'), 'sqlalchemy.read.')
+        self.assertEqual(engine_prefix(settings, 'write'), 'sqlalchemy.')
+
+    def test_engine_options_inherit_and_override(self):
+        from apcer.models.routing import engine_options
+        settings = {
+            'sqlalchemy.url': 'sqlite:///primary',
+            'sqlalchemy.pool_size': '5',
+            'sqlalchemy.pool_pre_ping': 'true',
+            'sqlalchemy.read.url': 'sqlite:///replica',
+            'sqlalchemy.read.pool_size': '20',
+        }
+        self.assertEqual(engine_options(settings), {
+            'sqlalchemy.url': 'sqlite:///primary',
+            'sqlalchemy.pool_size': '5',
+            'sqlalchemy.pool_pre_ping': 'true',
+        })
+        self.assertEqual(engine_options(settings, 'sqlalchemy.read.'), {
+            'sqlalchemy.url': 'sqlite:///replica',
+            'sqlalchemy.pool_size': '20',
+            'sqlalchemy.pool_pre_ping': 'true',
+        })
+
+    def test_read_only_url_skips_journal_mode(self):
+        from sqlalchemy import text
+        primary = get_engine({'sqlalchemy.url': 'sqlite:///' + self.path})
+        Base.metadata.create_all(primary)
+        replica = get_engine({'sqlalchemy.read.url': f'sqlite:///file:{self.path}?mode=ro&uri=true'},
+                             'sqlalchemy.read.')
+        try:
+            with replica.connect() as connection:
+                self.assertEqual(connection.execute(text('SELECT COUNT(*) FROM posts')).scalar(), 0)
+                with self.assertRaises(Exception):
+                    connection.execute(text("DELETE FROM posts"))
+        finally:
+            replica.dispose()
+            primary.dispose()
+
+    def test_note_write_makes_reads_sticky(self):
+        import time
+        from apcer.models.routing import STICKY_KEY, is_sticky, note_write
+        request = testing.DummyRequest()
+        request.registry = self.config.registry
+
+        self.config.registry['db_sticky_seconds'] = None
+        note_write(request)
+        self.assertFalse(is_sticky(request))
+
+        self.config.registry['db_sticky_seconds'] = 5
+        note_write(request)
+        self.assertTrue(is_sticky(request))
+
+        request.session[STICKY_KEY] = time.time() - 1
+        self.assertFalse(is_sticky(request))
+
+
+class TestRequestMetrics(unittest.TestCase):
+    def test_per_thread_shards_are_merged(self):
+        import threading
+        from apcer.metrics import RequestMetrics
+        metrics = RequestMetrics(latency_buckets=(0.01, 0.1))
+
+        def worker():
+            for _ in range(100):
+                metrics.begin()
+                metrics.record('posts.list', 200, 0.05, metrics.end(), 10)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        metrics.record('posts.list', 404, 1.0, [3, 0.002], 5)
+
+        stats = metrics.collect()['posts.list']
+        self.assertEqual(stats.requests, 401)
+        self.assertEqual(stats.latency, [0, 400, 1])
+        self.assertEqual(stats.statuses, {200: 400, 404: 1})
+        self.assertEqual(stats.response_bytes, 4005)
+        self.assertEqual(stats.sql_statements, 3)
+
+    def test_sql_statements_counted_per_request(self):
+        from sqlalchemy import create_engine, text
+        from apcer.metrics import RequestMetrics
+        metrics = RequestMetrics()
+        engine = create_engine('sqlite:///:memory:')
+        metrics.instrument(engine)
+        with engine.connect() as connection:
+            connection.execute(text('SELECT 1'))  # di luar request: tidak dihitung
+            metrics.begin()
+            connection.execute(text('SELECT 1'))
+            connection.execute(text('SELECT 2'))
+            sql = metrics.end()
+        self.assertEqual(sql[0], 2)
+        self.assertGreater(sql[1], 0)
+
+    def test_failed_statement_leaves_no_timing_state(self):
+        from sqlalchemy import create_engine, text
+        from sqlalchemy.exc import OperationalError
+        from apcer.metrics import RequestMetrics
+        from apcer.models.slowlog import SlowQueryLog
+        metrics = RequestMetrics()
+        engine = create_engine('sqlite:///:memory:')
+        metrics.instrument(engine)
+        SlowQueryLog(60).install(engine)
+        with engine.connect() as connection:
+            metrics.begin()
+            for _ in range(3):
+                with self.assertRaises(OperationalError):
+                    connection.execute(text('SELECT * FROM tidak_ada'))
+            connection.execute(text('SELECT 1'))
+            sql = metrics.end()
+            # Tidak ada waktu mulai yang tertinggal di koneksi pool
+            self.assertFalse([key for key in connection.info if key.endswith('_start')])
+        self.assertEqual(sql[0], 1)
+
+    def test_prometheus_exposition(self):
+        from apcer.metrics import RequestMetrics, render_prometheus
+        registry = testing.setUp().registry
+        try:
+            metrics = registry['request_metrics'] = RequestMetrics(latency_buckets=(0.1,))
+            metrics.record('posts.detail', 200, 0.05, [2, 0.001], 120)
+            metrics.record('posts.detail', 200, 0.5, [12, 0.004], 80)
+            body = render_prometheus(registry)
+        finally:
+            testing.tearDown()
+        lines = body.splitlines()
+        self.assertIn('# TYPE apcer_http_request_duration_seconds histogram', lines)
+        self.assertIn('apcer_http_request_duration_seconds_bucket{route="posts.detail",le="0.1"} 1', lines)
+        self.assertIn('apcer_http_request_duration_seconds_bucket{route="posts.detail",le="+Inf"} 2', lines)
+        self.assertIn('apcer_http_request_sql_statements_sum{route="posts.detail"} 14', lines)
+        self.assertIn('apcer_http_request_sql_statements_bucket{route="posts.detail",le="10"} 1', lines)
+        self.assertIn('apcer_http_response_bytes_total{route="posts.detail"} 200', lines)
+        self.assertIn('apcer_http_responses_total{route="posts.detail",status="200"} 2', lines)
+
+
+class TestSlowQueryLog(MemoryDbTest):
+    def test_fingerprint_ignores_values(self):
+        from apcer.models.slowlog import fingerprint
+        self.assertEqual(fingerprint("SELECT * FROM posts WHERE id = 1 AND content = 'a'"),
+                         fingerprint("SELECT *  FROM posts\nWHERE id = 42 AND content = 'b''c'"))
+        self.assertEqual(fingerprint('SELECT * FROM posts WHERE id IN (?, ?)'),
+                         fingerprint('SELECT * FROM posts WHERE id IN (:id_1, :id_2, :id_3)'))
+        self.assertNotEqual(fingerprint('SELECT * FROM posts'), fingerprint('SELECT * FROM comments'))
+
+    def test_parameter_shape_hides_values(self):
+        from apcer.models.slowlog import parameter_shape
+        self.assertEqual(parameter_shape(('rahasia', 3)), '(str, int)')
+        self.assertEqual(parameter_shape({'email': 'a@x.com'}), '{email: str}')
+        self.assertEqual(parameter_shape([(1,), (2,)], executemany=True), '2 x (int)')
+
+    def test_slow_statement_logged_once_with_plan(self):
+        from sqlalchemy import text
+        from apcer.models.slowlog import SlowQueryLog
+        slow_log = SlowQueryLog(0, dedup_seconds=60)
+        slow_log.install(self.engine)
+        with self.assertLogs('apcer.models.slowlog', level='WARNING') as logs:
+            with self.engine.connect() as connection:
+                for post_id in (1, 2, 3):
+                    rows = connection.execute(
+                        text('SELECT * FROM comments WHERE post_id = :post_id'), {'post_id': post_id}).fetchall()
+                    self.assertEqual(rows, [])
+        self.assertEqual(slow_log.logged, 1)
+        self.assertIn('route=-', logs.output[0])
+        self.assertIn('params: (int)', logs.output[0])
+        self.assertIn('plan:', logs.output[0])
+        self.assertIn('comments', logs.output[0])
+
+    def _fake_postgres(self, executed, autocommit=False, in_transaction=True, failing='EXPLAIN'):
+        from types import SimpleNamespace
+
+        class Cursor:
+            def execute(self, statement, parameters=None):
+                executed.append(statement)
+                if statement.startswith(failing):
+                    raise RuntimeError('syntax error')
+
+            def close(self):
+                executed.append('close')
+
+        options = {'isolation_level': 'AUTOCOMMIT'} if autocommit else {}
+        return SimpleNamespace(dialect=SimpleNamespace(name='postgresql'),
+                               connection=SimpleNamespace(cursor=Cursor),
+                               get_execution_options=lambda: options,
+                               in_transaction=lambda: in_transaction)
+
+    def test_failed_explain_rolls_back_to_savepoint(self):
+        from apcer.models.slowlog import SlowQueryLog
+        executed = []
+        conn = self._fake_postgres(executed)
+        with self.assertLogs('apcer.models.slowlog', level='WARNING'):
+            plan = SlowQueryLog(0).query_plan(conn, 'SELECT 1', ())
+        self.assertIn('EXPLAIN gagal', plan)
+        # Transaksi request tetap bisa dipakai: hanya savepoint yang dibatalkan
+        self.assertEqual(executed, ['SAVEPOINT apcer_slowlog_explain', 'EXPLAIN SELECT 1',
+                                    'ROLLBACK TO SAVEPOINT apcer_slowlog_explain',
+                                    'RELEASE SAVEPOINT apcer_slowlog_explain', 'close'])
+
+    def test_explain_without_savepoint_outside_transaction(self):
+        from apcer.models.slowlog import SlowQueryLog
+        for kw in ({'autocommit': True}, {'in_transaction': False}):
+            with self.subTest(**kw):
+                executed = []
+                conn = self._fake_postgres(executed, failing='SAVEPOINT', **kw)
+                SlowQueryLog(0).query_plan(conn, 'SELECT 1', ())
+                self.assertEqual(executed, ['EXPLAIN SELECT 1', 'close'])
+
+    def test_explain_errors_never_escape(self):
+        from apcer.models.slowlog import SlowQueryLog
+        conn = self._fake_postgres([], failing='SAVEPOINT')
+        with self.assertLogs('apcer.models.slowlog', level='WARNING'):
+            plan = SlowQueryLog(0).query_plan(conn, 'SELECT 1', ())
+        self.assertIn('EXPLAIN gagal', plan)
+
+    def test_disabled_by_default(self):
+        from apcer.models.slowlog import slow_query_log_from_settings
+        self.assertIsNone(slow_query_log_from_settings({}))
+        self.assertIsNone(slow_query_log_from_settings({'db.slow_query_ms': '0'}))
+        self.assertEqual(slow_query_log_from_settings({'db.slow_query_ms': '250'}).threshold, 0.25)
+
+
+class TestQueryBudgets(BaseTest):
+    """
+    Jumlah query tiap endpoint baca harus konstan terhadap ukuran data:
+    dataset diperbesar bertahap dan hitungannya dibandingkan antar ukuran.
+    """
+    SIZES = (1, 10, 50)
+
+    def setUp(self):
+        super().setUp()
+        self.author = self._create_test_user('author@example.com', 'author', 'pass')
+        self.reader = self._create_test_user('reader@example.com', 'reader', 'pass')
+        self.posts = []
+
+    def _grow_to(self, size):
+        """Tambah post (masing-masing dengan komentar, like dan simpan) sampai ``size``."""
+        base = datetime.datetime(2025, 1, 1)
+        for i in range(len(self.posts), size):
+            author = self.author if i % 2 else self.reader
+            post = Post(user_id=author.id, content=f'Post {i}', created_at=base + datetime.timedelta(minutes=i))
+            self.session.add(post)
+            self.session.flush()
+            self.session.add_all([
+                Comment(post_id=post.id, user_id=self.author.id, content='komentar'),
+                Comment(post_id=post.id, user_id=self.reader.id, content='balasan'),
+                Reaction(post_id=post.id, user_id=self.reader.id),
+                SavedPost(post_id=post.id, user_id=self.reader.id),
+            ])
+            self.posts.append(post)
+        self.session.commit()
+
+    def _assert_constant(self, route_name, path_for, login=True):
+        cookies = self._login_user('reader@example.com', 'pass') if login else None
+        headers = {'Cookie': cookies} if cookies else {}
+        counts = {}
+        for size in self.SIZES:
+            self._grow_to(size)
+            path = path_for()
+            with self.subTest(route=route_name, size=size):
+                with self.assertMaxQueries(route_name) as queries:
+                    self.app.get(path, headers=headers)
+                counts[size] = queries.count
+        self.assertEqual(len(set(counts.values())), 1, f'{route_name}: jumlah query berubah dengan N: {counts}')
+
+    def test_list_posts(self):
+        self._assert_constant('posts.list', lambda: '/posts')
+
+    def test_list_posts_anonymous(self):
+        self._assert_constant('posts.list', lambda: '/posts', login=False)
+
+    def test_post_detail(self):
+        # Post pertama: jumlah komentarnya ikut bertambah
+        def path():
+            post = self.posts[0]
+            for _ in range(5):
+                self.session.add(Comment(post_id=post.id, user_id=self.author.id, content='lagi'))
+            self.session.commit()
+            return f'/posts/{post.id}'
+        self._assert_constant('posts.detail', path)
+
+    def test_list_comments(self):
+        def path():
+            post = self.posts[0]
+            for _ in range(30):
+                self.session.add(Comment(post_id=post.id, user_id=self.author.id, content='lagi'))
+            self.session.commit()
+            return f'/posts/{post.id}/comments'
+        self._assert_constant('posts.comments', path)
+
+    def test_my_posts(self):
+        self._assert_constant('posts.mine', lambda: '/posts/mine')
+
+    def test_saved_posts(self):
+        self._assert_constant('posts.saved', lambda: '/posts/saved')
+
+    def test_me(self):
+        self._assert_constant('auth.me', lambda: '/me')
+
+
+class TestBenchScript(unittest.TestCase):
+    def test_percentile(self):
+        from apcer.scripts.bench import percentile
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertIsNone(percentile([], 50))
+
+
+class TestDataGenerator(unittest.TestCase):
+    def setUp(self):
+        from sqlalchemy import create_engine
+        self.engine = create_engine('sqlite:///:memory:')
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def _generate(self, engine, **kw):
+        from apcer.scripts.datagen import generate
+        return generate(engine, 400, seed=7, password_hash='x', chunk=150, use_numpy=False, **kw)
+
+    def _scalar(self, stmt):
+        with self.engine.connect() as connection:
+            return connection.execute(stmt).scalar()
+
+    def test_parse_scale(self):
+        from apcer.scripts.datagen import parse_scale
+        self.assertEqual(parse_scale('10k'), 10000)
+        self.assertEqual(parse_scale('1M'), 1000000)
+        self.assertEqual(parse_scale('2500'), 2500)
+        with self.assertRaises(Exception):
+            parse_scale('banyak')
+
+    def test_rows_and_counters_are_consistent(self):
+        from sqlalchemy import func, select
+        stats = self._generate(self.engine)
+        self.assertEqual(stats.rows['posts'], 400)
+        self.assertEqual(self._scalar(select(func.count(User.id))), 20)
+        self.assertEqual(self._scalar(select(func.count(Comment.id))), stats.rows['comments'])
+        self.assertEqual(self._scalar(select(func.sum(Post.likes_count))),
+                         self._scalar(select(func.count(Reaction.id))))
+        self.assertEqual(self._scalar(select(func.sum(Post.comments_count))), stats.rows['comments'])
+        self.assertGreater(stats.rows_per_second(), 0)
+
+    def test_distribution_is_skewed(self):
+        from sqlalchemy import func, select
+        self._generate(self.engine)
+        hottest = self._scalar(select(func.max(Post.comments_count)))
+        average = self._scalar(select(func.avg(Post.comments_count)))
+        self.assertGreater(hottest, 20 * average)  # ada post "viral"
+        per_user = select(func.count(Post.id)).group_by(Post.user_id).order_by(func.count(Post.id).desc())
+        self.assertGreater(self._scalar(per_user), 400 / 20 * 2)  # user teraktif >> rata-rata
+
+    def test_same_seed_same_data(self):
+        from sqlalchemy import create_engine, select
+        other = create_engine('sqlite:///:memory:')
+        try:
+            self._generate(self.engine)
+            self._generate(other)
+            query = select(Post.user_id, Post.content, Post.likes_count).order_by(Post.id)
+            with self.engine.connect() as a, other.connect() as b:
+                self.assertEqual(a.execute(query).all(), b.execute(query).all())
+        finally:
+            other.dispose()
+
+    def test_appends_after_existing_rows(self):
+        from sqlalchemy import func, select
+        from apcer.models.sequence import NamedSequence
+        self._generate(self.engine)
+        self._generate(self.engine)
+        self.assertEqual(self._scalar(select(func.count(Post.id))), 800)
+        self.assertEqual(self._scalar(select(func.count(User.id))), 40)
+        self.assertEqual(self._scalar(select(NamedSequence.value)), 40)
+
+    def test_usernames_continue_the_anon_sequence(self):
+        from sqlalchemy import func, select
+        from sqlalchemy.orm import Session
+        from apcer.models.sequence import NamedSequence
+        Base.metadata.create_all(self.engine)
+        # /register sudah sampai "Anonim #50" walau baru ada satu user
+        with Session(self.engine) as session:
+            session.add(User(email='lama@example.com', username='Anonim #50', password_hash='x'))
+            session.commit()
+        self._generate(self.engine)
+        self.assertEqual(self._scalar(select(func.count(func.distinct(User.username)))), 21)
+        self.assertEqual(self._scalar(select(User.username).where(User.id == 2)), 'Anonim #51')
+        self.assertEqual(self._scalar(select(NamedSequence.value)), 70)
+
+
+class TestPostSearch(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.user = self._create_test_user()
+        self.kopi = self._create_test_post(self.user.id, content="Kopi di kantin kampus enak")
+        self.hujan = self._create_test_post(self.user.id, content="Hujan deras, parkir kampus banjir")
+        self._create_test_post(self.user.id, content="Kopi kampus sudah dihapus", is_deleted=True)
+
+    def _search(self, q, **params):
+        return self.app.get('/posts/search', params=dict(q=q, **params))
+
+    def test_finds_matching_posts(self):
+        self.assertEqual([p['id'] for p in self._search('kopi').json], [self.kopi.id])
+        self.assertEqual({p['id'] for p in self._search('kampus').json}, {self.kopi.id, self.hujan.id})
+        self.assertEqual([p['id'] for p in self._search('kopi kampus').json], [self.kopi.id])
+
+    def test_prefix_and_case_insensitive(self):
+        self.assertEqual([p['id'] for p in self._search('HUJ').json], [self.hujan.id])
+
+    def test_excludes_deleted_posts(self):
+        self.assertNotIn('dihapus', ' '.join(p['content'] for p in self._search('kopi').json))
+
+    def test_operators_in_query_are_literal(self):
+        for q in ['"kopi', 'kopi OR', 'NEAR(kopi', 'kopi*', "'; DROP TABLE posts;--"]:
+            self.assertEqual(self._search(q).status_code, 200)
+
+    def test_edit_and_delete_keep_index_in_sync(self):
+        self.kopi.content = "Teh manis"
+        self.session.add(self.kopi)
+        self.session.commit()
+        self.assertEqual(self._search('kopi').json, [])
+        self.assertEqual([p['id'] for p in self._search('teh').json], [self.kopi.id])
+        self.session.delete(self.hujan)
+        self.session.commit()
+        self.assertEqual(self._search('hujan').json, [])
+
+    def test_pagination_with_cursor(self):
+        for i in range(4):
+            self._create_test_post(self.user.id, content=f"Info kuliah nomor {i}")
+        first = self._search('kuliah', limit=3)
+        cursor = first.headers['X-Next-Cursor']
+        second = self._search('kuliah', limit=3, cursor=cursor)
+        self.assertNotIn('X-Next-Cursor', second.headers)
+        ids = [p['id'] for p in first.json + second.json]
+        self.assertEqual(len(ids), 4)
+        self.assertEqual(len(set(ids)), 4)
+
+    def test_invalid_params(self):
+        self.app.get('/posts/search', status=400)
+        self.app.get('/posts/search', params={'q': 'kopi', 'cursor': 'bukan-cursor'}, status=400)
+
+    def test_rebuild_restores_index(self):
+        from apcer.models.search import rebuild_search_index
+        with self.engine.begin() as connection:
+            connection.exec_driver_sql("INSERT INTO posts_fts(posts_fts) VALUES ('delete-all')")
+        self.assertEqual(self._search('kopi').json, [])
+        with self.engine.begin() as connection:
+            self.assertTrue(rebuild_search_index(connection))
+        self.assertEqual([p['id'] for p in self._search('kopi').json], [self.kopi.id])
+
+    def test_rebuild_is_noop_without_fulltext_index(self):
+        from types import SimpleNamespace
+        from apcer.models.search import rebuild_search_index
+        connection = SimpleNamespace(dialect=SimpleNamespace(name='mysql'))
+        self.assertFalse(rebuild_search_index(connection))
+
+
+class TestCommentPagination(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.user = self._create_test_user()
+        self.post = self._create_test_post(self.user.id)
+        base = datetime.datetime(2025, 1, 1)
+        self.comments = []
+        for i in range(7):
+            # Dua komentar per detik: urutan harus tetap stabil lewat id
+            comment = Comment(post_id=self.post.id, user_id=self.user.id, content=f'Komentar {i}',
+                              created_at=base + datetime.timedelta(seconds=i // 2))
+            self.session.add(comment)
+            self.comments.append(comment)
+        self.session.commit()
+
+    def test_detail_returns_first_page(self):
+        self.registry.settings['pagination.comments_limit'] = '3'
+        res = self.app.get(f'/posts/{self.post.id}')
+        self.assertEqual([c['id'] for c in res.json['comments']], [c.id for c in self.comments[:3]])
+        self.assertEqual(res.json['comments_count'], 7)
+        self.assertIsNotNone(res.json['comments_next_cursor'])
+
+    def test_walk_all_pages_from_detail_cursor(self):
+        self.registry.settings['pagination.comments_limit'] = '3'
+        res = self.app.get(f'/posts/{self.post.id}')
+        seen = [c['id'] for c in res.json['comments']]
+        cursor = res.json['comments_next_cursor']
+        while cursor:
+            page = self.app.get(f'/posts/{self.post.id}/comments', params={'cursor': cursor})
+            seen += [c['id'] for c in page.json]
+            cursor = page.headers.get('X-Next-Cursor')
+        self.assertEqual(seen, [c.id for c in self.comments])
+
+    def test_listing_skips_deleted_and_respects_limit(self):
+        self.comments[0].is_deleted = True
+        self.session.add(self.comments[0])
+        self.session.commit()
+        res = self.app.get(f'/posts/{self.post.id}/comments', params={'limit': 2})
+        self.assertEqual([c['id'] for c in res.json], [c.id for c in self.comments[1:3]])
+        self.assertEqual(res.json[0]['user']['username'], 'testuser')
+        self.assertIn('X-Next-Cursor', res.headers)
+
+    def test_listing_errors(self):
+        self.app.get('/posts/9999/comments', status=404)
+        self.app.get(f'/posts/{self.post.id}/comments', params={'cursor': 'rusak'}, status=400)
+        self.app.get(f'/posts/{self.post.id}/comments', params={'limit': 0}, status=400)
+
+    def test_comments_limit_is_clamped_and_validated(self):
+        self.registry.settings['pagination.max_limit'] = '4'
+        self.registry.settings['pagination.comments_limit'] = '1000'
+        self.assertEqual(len(self.app.get(f'/posts/{self.post.id}').json['comments']), 4)
+        self.assertEqual(len(self.app.get(f'/posts/{self.post.id}/comments').json), 4)
+        self.registry.settings['pagination.comments_limit'] = 'banyak'
+        self.registry.settings['pagination.default_limit'] = '2'
+        self.assertEqual(len(self.app.get(f'/posts/{self.post.id}?x=1').json['comments']), 2)
+        self.assertEqual(len(self.app.get(f'/posts/{self.post.id}/comments?x=1').json), 2)
+
+
+class TestNormalizedShape(BaseTest):
+    def setUp(self):
+        super().setUp()
+        self.alice = self._create_test_user('alice@example.com', 'alice', 'pass')
+        self.bob = self._create_test_user('bob@example.com', 'bob', 'pass')
+        self.post = self._create_test_post(self.alice.id, content='Post alice')
+        self._create_test_post(self.alice.id, content='Post alice lagi')
+        for i in range(6):
+            self._create_test_comment(self.post.id, (self.alice, self.bob)[i % 2].id, f'Komentar {i}')
+
+    def test_detail_users_map(self):
+        with self.assertMaxQueries('posts.detail.normalized'):
+            res = self.app.get(f'/posts/{self.post.id}', params={'shape': 'normalized'})
+        users, detail = res.json['users'], res.json['data']
+        self.assertEqual(set(users), {str(self.alice.id), str(self.bob.id)})
+        self.assertEqual(users[str(self.bob.id)], {'id': self.bob.id, 'username': 'bob', 'email': 'bob@example.com'})
+        self.assertEqual(detail['user_id'], self.alice.id)
+        self.assertNotIn('user', detail)
+        self.assertEqual([c['user_id'] for c in detail['comments']], [self.alice.id, self.bob.id] * 3)
+        self.assertNotIn('user', detail['comments'][0])
+
+    def test_same_content_as_nested(self):
+        nested = self.app.get(f'/posts/{self.post.id}').json
+        normalized = self.app.get(f'/posts/{self.post.id}', params={'shape': 'normalized'}).json
+        users = normalized['users']
+        self.assertEqual(nested['user'], users[str(normalized['data']['user_id'])])
+        for nested_comment, comment in zip(nested['comments'], normalized['data']['comments']):
+            self.assertEqual(nested_comment['user'], users[str(comment['user_id'])])
+            self.assertEqual(nested_comment['content'], comment['content'])
+
+    def test_feed_and_comments(self):
+        with self.assertMaxQueries('posts.list.normalized'):
+            res = self.app.get('/posts', params={'shape': 'normalized'})
+        self.assertEqual(res.json['users'], {str(self.alice.id): {'id': self.alice.id, 'username': 'alice'}})
+        self.assertEqual({item['userId'] for item in res.json['data']}, {self.alice.id})
+        self.assertNotIn('username', res.json['data'][0])
+
+        res = self.app.get(f'/posts/{self.post.id}/comments', params={'shape': 'normalized', 'limit': 2})
+        self.assertEqual(len(res.json['data']), 2)
+        self.assertEqual(len(res.json['users']), 2)
+        self.assertIn('X-Next-Cursor', res.headers)
+
+    def test_etag_differs_per_shape(self):
+        nested = self.app.get('/posts')
+        normalized = self.app.get('/posts', params={'shape': 'normalized'})
+        self.assertNotEqual(nested.headers['ETag'], normalized.headers['ETag'])
+
+    def test_invalid_shape(self):
+        self.app.get('/posts', params={'shape': 'flat'}, status=400)
+        self.app.get(f'/posts/{self.post.id}', params={'shape': 'flat'}, status=400)
+
+
+class TestCoreReadPath(MemoryDbTest):
+    def setUp(self):
+        super().setUp()
+        self.alice, self.bob = self._create_users('alice', 'bob')
+        base = datetime.datetime(2025, 1, 1)
+        for i in range(6):
+            # Pasangan post dengan created_at sama: urutan ditentukan id
+            author = (self.alice, self.bob)[i % 2]
+            self.session.add(Post(user_id=author.id, content=f'Post {i}', created_at=base + datetime.timedelta(hours=i // 2)))
+            self.session.add(Comment(post_id=1, user_id=author.id, content=f'Komentar {i}',
+                                     created_at=base + datetime.timedelta(hours=i // 2)))
+        self.session.add(Post(user_id=self.alice.id, content='Dihapus', is_deleted=True, created_at=base))
+        self.session.commit()
+
+    def _walk(self, fetch, limit=4):
+        from apcer.pagination import split_page, decode_cursor
+        seen, cursor = [], None
+        while True:
+            rows, next_cursor = split_page(fetch(cursor, limit), limit, key=lambda row: (row.created_at, row.id))
+            seen += rows
+            if not next_cursor:
+                return seen
+            cursor = decode_cursor(next_cursor)
+
+    def test_feed_matches_orm_order(self):
+        from apcer.models.reads import select_posts
+        rows = self._walk(lambda cursor, limit: select_posts(self.session, cursor, limit))
+        expected = self.session.query(Post).filter_by(is_deleted=False) \
+            .order_by(Post.created_at.desc(), Post.id.desc()).all()
+        self.assertEqual([row.id for row in rows], [post.id for post in expected])
+        self.assertEqual({row.user.username for row in rows}, {'alice', 'bob'})
+
+    def test_author_and_comments(self):
+        from apcer.models.reads import select_posts, select_comments
+        mine = self._walk(lambda cursor, limit: select_posts(
+            self.session, cursor, limit, author_id=self.alice.id, with_users=False), limit=2)
+        self.assertEqual([row.content for row in mine], ['Post 4', 'Post 2', 'Post 0'])
+        self.assertIsNone(mine[0].user)
+        comments = self._walk(lambda cursor, limit: select_comments(self.session, '1', cursor, limit), limit=4)
+        self.assertEqual([row.content for row in comments], [f'Komentar {i}' for i in range(6)])
+
+    def test_post_and_records_are_slotted(self):
+        from apcer.models.reads import select_post
+        post = select_post(self.session, '1')
+        self.assertEqual((post.content, post.user.email), ('Post 0', 'alice@example.com'))
+        self.assertFalse(hasattr(post, '__dict__'))
+        self.assertIsNone(select_post(self.session, '7'))  # post dihapus
+
+    def test_statements_compiled_once(self):
+        from sqlalchemy import event
+        from apcer.models.reads import select_posts
+        hits = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            hits.append(context.cache_hit == context.dialect.CACHE_HIT)
+        event.listen(self.engine, 'after_cursor_execute', record)
+        try:
+            for limit in (2, 3, 5):
+                select_posts(self.session, None, limit)
+        finally:
+            event.remove(self.engine, 'after_cursor_execute', record)
+        self.assertEqual(hits, [False, True, True])
+
+
+class TestMetricsAccess(BaseTest):
+    def _get(self, path, remote_addr='203.0.113.7', status=200, **headers):
+        return self.app.get(path, headers=headers, extra_environ={'REMOTE_ADDR': remote_addr}, status=status)
+
+    def test_closed_by_default(self):
+        for path in ('/metrics', '/metrics/pool'):
+            self._get(path, remote_addr='127.0.0.1', status=403)
+
+    def test_allowed_ips_and_networks(self):
+        self.registry.settings['metrics.allowed_ips'] = '127.0.0.1 10.0.0.0/8'
+        self.assertIn('apcer_http_request_duration_seconds', self._get('/metrics', remote_addr='10.1.2.3').text)
+        self._get('/metrics/pool', remote_addr='127.0.0.1')
+        self._get('/metrics', status=403)
+        self._get('/metrics/pool', status=403)
+
+    def test_bearer_token(self):
+        self.registry.settings['metrics.token'] = 'rahasia'
+        self._get('/metrics', Authorization='Bearer rahasia')
+        self._get('/metrics', status=403, Authorization='Bearer salah')
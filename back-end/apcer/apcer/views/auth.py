@@ -2,7 +2,10 @@
 from pyramid.view import view_config
 from pyramid.security import remember, forget, NO_PERMISSION_REQUIRED
 from pyramid.httpexceptions import HTTPUnauthorized
+from sqlalchemy.exc import IntegrityError
 from ..models.user import User
+from ..models.sequence import next_value, ANON_USERNAME
+from ..hashing import HasherBusy
 import uuid
 import random
 import string
@@ -12,25 +15,36 @@ def generate_random_string(length=12):
     return ''.join(random.choice(characters) for _ in range(length))
 
 
+def hasher_busy(request):
+    request.response.status = 503
+    request.response.headers['Retry-After'] = '1'
+    return {'success': False, 'message': 'Server sedang sibuk, coba lagi sebentar'}
+
+
 @view_config(route_name='register', renderer='json', request_method='POST', permission=NO_PERMISSION_REQUIRED)
 def api_register(request):
     dbsession = request.dbsession
 
     anon_email = f"{uuid.uuid4()}@apcer.com"
-    next_user_number = dbsession.query(User).count() + 1
-    username = f"Anonim #{next_user_number}"
     raw_password = generate_random_string(12)
 
-    # Cek unik email/username
-    if dbsession.query(User).filter_by(email=anon_email).first() or dbsession.query(User).filter_by(username=username).first():
+    # Hash dulu (tanpa DB) agar baris sequence tidak terkunci selama bcrypt
+    new_user = User(email=anon_email)
+    try:
+        new_user.set_password(raw_password, request.registry.get('password_hasher'))
+    except HasherBusy:
+        return hasher_busy(request)
+
+    # Nomor diambil atomik dari sequence; unique constraint tetap penjaga terakhir
+    new_user.username = f"Anonim #{next_value(dbsession, ANON_USERNAME)}"
+    try:
+        with dbsession.begin_nested():
+            dbsession.add(new_user)
+            dbsession.flush()
+    except IntegrityError:
         request.response.status = 400
         return {'success': False, 'message': 'Registrasi gagal. Email atau username sudah digunakan.'}
 
-    new_user = User(email=anon_email, username=username)
-    new_user.set_password(raw_password)
-    dbsession.add(new_user)
-    dbsession.flush()
-
     headers = remember(request, new_user.id)
     request.response.headerlist.extend(headers)
 
@@ -58,8 +72,20 @@ def api_login(request):
         return {'success': False, 'message': 'Permintaan tidak valid'}
 
     user = dbsession.query(User).filter_by(email=login_email).first()
+    hasher = request.registry.get('password_hasher')
+
+    try:
+        valid = user is not None and user.check_password(login_password, hasher)
+    except HasherBusy:
+        return hasher_busy(request)
 
-    if user and user.check_password(login_password):
+    if valid:
+        # Hash lama dengan cost berbeda dari auth.bcrypt_rounds diganti diam-diam
+        if hasher is not None and hasher.needs_rehash(user.password_hash):
+            try:
+                user.set_password(login_password, hasher)
+            except HasherBusy:
+                pass  # Coba lagi di login berikutnya
         headers = remember(request, user.id)
         request.response.headerlist.extend(headers)
         return {
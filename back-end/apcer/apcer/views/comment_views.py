@@ -1,16 +1,10 @@
 from pyramid.view import view_config
-from pyramid.response import Response
 from pyramid.httpexceptions import HTTPForbidden
 from ..models.comment import Comment
 from ..models.post import Post
-import json
-
-def json_response(data, status=200):
-    return Response(
-        body=json.dumps(data, default=str),
-        content_type='application/json; charset=utf-8',
-        status=status
-    )
+from ..cache import invalidate_post_cache
+from ..renderers import json_response
+from ..writer import run_write
 
 @view_config(route_name='posts.comments', request_method='POST', renderer='json', permission='comment')
 def add_comment(request):
@@ -24,24 +18,20 @@ def add_comment(request):
     if not content:
         return json_response({'success': False, 'message': 'Isi komentar tidak boleh kosong'}, status=400)
 
-    dbsession = request.dbsession
-
-    # Cek apakah postingan ada
-    post = dbsession.query(Post).filter_by(id=post_id).first()
-    if not post:
-        return json_response({'success': False, 'message': 'Postingan tidak ditemukan'}, status=404)
+    def insert_comment(dbsession):
+        # Cek apakah postingan ada
+        post = dbsession.query(Post).filter_by(id=post_id).first()
+        if not post:
+            return None
 
-    new_comment = Comment(
-        user_id=user_id,
-        post_id=post_id,
-        content=content
-    )
-    dbsession.add(new_comment)
-    dbsession.flush()
-
-    return json_response({
-        'success': True,
-        'comment': {
+        new_comment = Comment(
+            user_id=user_id,
+            post_id=post_id,
+            content=content
+        )
+        dbsession.add(new_comment)
+        dbsession.flush()
+        return {
             'id': new_comment.id,
             'content': new_comment.content,
             'created_at': new_comment.created_at.isoformat(),
@@ -51,4 +41,40 @@ def add_comment(request):
                 'email': new_comment.user.email
             }
         }
+
+    comment = run_write(request, insert_comment)
+    if comment is None:
+        return json_response({'success': False, 'message': 'Postingan tidak ditemukan'}, status=404)
+    invalidate_post_cache(request)
+
+    return json_response({
+        'success': True,
+        'comment': comment
     })
+
+
+@view_config(route_name='comments.delete', request_method='DELETE', renderer='json', permission='comment')
+def delete_comment(request):
+    """
+    Soft-delete komentar milik user. comments_count pada post ikut
+    dikurangi di transaksi yang sama (lihat models/counters.py).
+    """
+    comment_id = request.matchdict['id']
+    user_id = request.authenticated_userid
+
+    if not user_id:
+        return json_response({'success': False, 'message': 'Unauthorized'}, status=401)
+
+    dbsession = request.dbsession
+    comment = dbsession.query(Comment).filter_by(id=comment_id, is_deleted=False).first()
+    if not comment:
+        return json_response({'success': False, 'message': 'Komentar tidak ditemukan'}, status=404)
+
+    if comment.user_id != user_id:
+        return json_response({'success': False, 'message': 'Akses ditolak'}, status=403)
+
+    comment.is_deleted = True
+    dbsession.flush()
+    invalidate_post_cache(request)
+
+    return json_response({'success': True, 'message': 'Komentar berhasil dihapus'})
@@ -0,0 +1,32 @@
+from pyramid.response import Response
+from pyramid.view import view_config
+from ..metrics import CONTENT_TYPE, render_prometheus, metrics_allowed
+from ..models.pool import pool_stats
+from ..renderers import json_response
+
+
+@view_config(route_name='metrics.pool', renderer='json', request_method='GET', permission='view')
+def pool_metrics(request):
+    """
+    Statistik pool koneksi: ukuran, koneksi terpakai, utilisasi dan
+    waktu tunggu checkout (rata-rata/maksimum sejak proses berjalan).
+    Pool engine baca (sqlalchemy.read.*) ada di key ``read``.
+    """
+    if not metrics_allowed(request):
+        return json_response({'success': False, 'message': 'Akses ditolak'}, status=403)
+    stats = pool_stats(request.registry['dbengine'])
+    read_engine = request.registry.get('dbengine.read')
+    if read_engine is not None:
+        stats['read'] = pool_stats(read_engine)
+    return json_response(stats)
+
+
+@view_config(route_name='metrics', request_method='GET', permission='view')
+def prometheus_metrics(request):
+    """
+    Metrik format teks Prometheus: histogram latensi dan jumlah SQL per
+    route, waktu SQL, ukuran respons, status, pool, cache dan kompresi.
+    """
+    if not metrics_allowed(request):
+        return json_response({'success': False, 'message': 'Akses ditolak'}, status=403)
+    return Response(render_prometheus(request.registry), content_type=CONTENT_TYPE, charset='utf-8')
@@ -1,57 +1,136 @@
 from pyramid.view import view_config
-from pyramid.response import Response
-from pyramid.httpexceptions import HTTPNotFound
-from sqlalchemy.orm import joinedload
-from ..models.user import User
+from sqlalchemy.orm import joinedload, contains_eager
 from ..models.post import Post
-from ..models.reaction import Reaction
-from ..models.comment import Comment
 from ..models.saved_post import SavedPost
-import json
-
-def json_response(data, status=200):
-    return Response(
-        body=json.dumps(data, default=str),
-        content_type='application/json; charset=utf-8',
-        status=status
-    )
+from ..hydration import hydrate_posts, empty_stats
+from ..normalize import (
+    response_shape, collect_users, envelope, InvalidShape, FEED_USER_FIELDS, DETAIL_USER_FIELDS,
+)
+from ..models.search import search_post_ids, MAX_OFFSET
+from ..models.reads import select_posts, select_post, select_comments
+from ..pagination import (
+    page_params, keyset, split_page, encode_offset_cursor, decode_offset_cursor, configured_limit,
+    InvalidPageParams, NEXT_CURSOR_HEADER,
+)
+from ..cache import cache_anonymous, invalidate_post_cache
+from ..conditional import make_etag, last_modified, not_modified, with_validators
+from ..renderers import json_response
+from ..writer import run_write
+
+
+def feed_item(post, post_stats, normalized=False):
+    item = {"id": post.id}
+    if normalized:
+        item["userId"] = post.user_id
+    else:
+        item["username"] = post.user.username
+    item.update({
+        "createdAt": post.created_at.isoformat(),
+        "content": post.content,
+        "likesCount": post_stats['likes_count'],
+        "commentsCount": post_stats['comments_count'],
+        "isLiked": post_stats['is_liked'],
+        "isSaved": post_stats['is_saved'],
+    })
+    return item
 
 
-@view_config(route_name='posts.list', renderer='json', request_method='GET', permission='view')
+def feed_results(posts, stats, users, normalized, extra=None):
+    """
+    Body halaman feed: list item (bentuk nested) atau envelope
+    ``{'data': [...], 'users': {...}}`` (bentuk normalized).
+    """
+    results = []
+    for post in posts:
+        item = feed_item(post, stats.get(post.id) or empty_stats(), normalized)
+        if extra is not None:
+            item.update(extra(post))
+        results.append(item)
+    return envelope(results, users) if normalized else results
+
+
+def page_response(request, next_cursor, etag, modified, build_results):
+    """
+    Respons satu halaman list. Jika ETag cocok, kirim 304 tanpa membangun
+    maupun men-serialize body (``build_results`` tidak dipanggil).
+    """
+    response = not_modified(request, etag, modified)
+    if response is None:
+        response = json_response(build_results())
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return with_validators(response, etag, modified)
+
+
+@view_config(route_name='posts.list', renderer='json', request_method='GET', permission='view', decorator=cache_anonymous)
 def list_posts(request):
+    try:
+        limit, cursor = page_params(request)
+        shape = response_shape(request)
+    except (InvalidPageParams, InvalidShape) as e:
+        return json_response({'success': False, 'message': str(e)}, status=400)
+    normalized = shape == 'normalized'
+
     dbsession = request.dbsession
-    posts = dbsession.query(Post).options(joinedload(Post.user)) \
-        .filter(Post.is_deleted == False).order_by(Post.created_at.desc()).all()
+    posts, next_cursor = split_page(
+        select_posts(dbsession, cursor, limit, with_users=not normalized), limit,
+        key=lambda post: (post.created_at, post.id))
 
     current_user_id = request.authenticated_userid
-    results = []
+    stats = hydrate_posts(dbsession, [post.id for post in posts], current_user_id)
+    users = collect_users(dbsession, posts, FEED_USER_FIELDS, loaded=not normalized)
+    etag = make_etag(current_user_id, next_cursor, shape, users, [
+        (post.id, post.updated_at, post.content, post.user_id, stats.get(post.id)) for post in posts
+    ])
+
+    return page_response(
+        request, next_cursor, etag, last_modified(*posts),
+        lambda: feed_results(posts, stats, users, normalized))
+
+
+@view_config(route_name='posts.search', renderer='json', request_method='GET', permission='view', decorator=cache_anonymous)
+def search_posts(request):
+    """
+    Search full-text isi post, urut relevansi. Cursor berisi offset karena
+    urutan skor tidak bisa di-keyset; kedalaman dibatasi ``MAX_OFFSET``.
+    """
+    query_text = request.params.get('q', '').strip()
+    if not query_text:
+        return json_response({'success': False, 'message': 'Parameter q tidak boleh kosong'}, status=400)
+    try:
+        limit, offset = page_params(request, decode=decode_offset_cursor)
+        shape = response_shape(request)
+    except (InvalidPageParams, InvalidShape) as e:
+        return json_response({'success': False, 'message': str(e)}, status=400)
+    offset = offset or 0
+    if offset > MAX_OFFSET:
+        return json_response({'success': False, 'message': 'Halaman hasil search terlalu dalam'}, status=400)
 
-    for post in posts:
-        likes = dbsession.query(Reaction).filter_by(post_id=post.id, type='like').count()
-        comments = dbsession.query(Comment).filter_by(post_id=post.id, is_deleted=False).count()
-
-        is_liked = False
-        is_saved = False
-        if current_user_id:
-            is_liked = dbsession.query(Reaction).filter_by(
-                user_id=current_user_id, post_id=post.id, type='like'
-            ).first() is not None
-            is_saved = dbsession.query(SavedPost).filter_by(
-                user_id=current_user_id, post_id=post.id
-            ).first() is not None
-
-        results.append({
-            "id": post.id,
-            "username": post.user.username,
-            "createdAt": post.created_at.isoformat(),
-            "content": post.content,
-            "likesCount": likes,
-            "commentsCount": comments,
-            "isLiked": is_liked,
-            "isSaved": is_saved,
-        })
-        
-    return json_response(results)
+    dbsession = request.dbsession
+    ids = search_post_ids(dbsession, query_text, limit + 1, offset)
+    next_cursor = None
+    if len(ids) > limit:
+        ids = ids[:limit]
+        if offset + limit <= MAX_OFFSET:
+            next_cursor = encode_offset_cursor(offset + limit)
+
+    normalized = shape == 'normalized'
+    query = dbsession.query(Post).filter(Post.id.in_(ids))
+    if not normalized:
+        query = query.options(joinedload(Post.user))
+    by_id = {post.id: post for post in query} if ids else {}
+    posts = [by_id[post_id] for post_id in ids if post_id in by_id]
+
+    current_user_id = request.authenticated_userid
+    stats = hydrate_posts(dbsession, [post.id for post in posts], current_user_id)
+    users = collect_users(dbsession, posts, FEED_USER_FIELDS, loaded=not normalized)
+    etag = make_etag(current_user_id, query_text, offset, next_cursor, shape, users, [
+        (post.id, post.updated_at, post.content, post.user_id, stats.get(post.id)) for post in posts
+    ])
+
+    return page_response(
+        request, next_cursor, etag, last_modified(*posts),
+        lambda: feed_results(posts, stats, users, normalized))
 
 
 @view_config(route_name='posts.create', renderer='json', request_method='POST', permission='create')
@@ -60,66 +139,135 @@ def create_post(request):
     if not content:
         return json_response({'success': False, 'message': 'Konten tidak boleh kosong'}, status=400)
 
-    dbsession = request.dbsession
-    new_post = Post(
-        user_id=request.authenticated_userid,
-        content=content
-    )
-    dbsession.add(new_post)
-    dbsession.flush()
-
-    return json_response({'success': True, 'message': 'Post created', 'post_id': new_post.id})
-
+    user_id = request.authenticated_userid
 
-@view_config(route_name='posts.detail', renderer='json', request_method='GET', permission='view')
+    def insert_post(dbsession):
+        new_post = Post(
+            user_id=user_id,
+            content=content
+        )
+        dbsession.add(new_post)
+        dbsession.flush()
+        return new_post.id
+
+    post_id = run_write(request, insert_post)
+    invalidate_post_cache(request)
+
+    return json_response({'success': True, 'message': 'Post created', 'post_id': post_id})
+
+
+def comment_item(comment, normalized=False):
+    item = {
+        'id': comment.id,
+        'content': comment.content,
+        'created_at': comment.created_at.isoformat(),
+    }
+    if normalized:
+        item['user_id'] = comment.user_id
+    else:
+        item['user'] = {
+            'id': comment.user.id,
+            'username': comment.user.username,  # ✅ GANTI DARI 'name' KE 'username'
+            'email': comment.user.email
+        }
+    return item
+
+
+def comments_page(dbsession, post_id, cursor, limit, with_users=True):
+    """
+    Satu halaman komentar sebuah post, urut ``(created_at, id)`` dari yang
+    terlama (memakai index ix_comments_post_feed).
+    """
+    return split_page(
+        select_comments(dbsession, post_id, cursor, limit, with_users=with_users), limit,
+        key=lambda comment: (comment.created_at, comment.id))
+
+
+@view_config(route_name='posts.detail', renderer='json', request_method='GET', permission='view', decorator=cache_anonymous)
 def post_detail(request):
+    """
+    Detail post dengan halaman pertama komentar saja; sisanya lewat
+    ``GET /posts/{id}/comments?cursor=<comments_next_cursor>``.
+    """
+    try:
+        shape = response_shape(request)
+    except InvalidShape as e:
+        return json_response({'success': False, 'message': str(e)}, status=400)
+    normalized = shape == 'normalized'
+
     post_id = request.matchdict.get('id')
     dbsession = request.dbsession
 
-    post = dbsession.query(Post).options(joinedload(Post.user)) \
-        .filter_by(id=post_id, is_deleted=False).first()
+    post = select_post(dbsession, post_id, with_users=not normalized)
 
     if not post:
         return json_response({'success': False, 'message': 'Postingan tidak ditemukan'}, status=404)
 
-    comments = dbsession.query(Comment).options(joinedload(Comment.user)) \
-        .filter_by(post_id=post.id, is_deleted=False).order_by(Comment.created_at.asc()).all()
-
-    post_likes = dbsession.query(Reaction).filter_by(post_id=post.id, type='like').count()
+    comments_limit = configured_limit(request.registry.settings, 'pagination.comments_limit')
+    comments, comments_cursor = comments_page(
+        dbsession, post.id, None, comments_limit, with_users=not normalized)
 
     current_user_id = request.authenticated_userid
-    is_liked = is_saved = False
-    if current_user_id:
-        is_liked = dbsession.query(Reaction).filter_by(
-            user_id=current_user_id, post_id=post.id, type='like'
-        ).first() is not None
-        is_saved = dbsession.query(SavedPost).filter_by(
-            user_id=current_user_id, post_id=post.id
-        ).first() is not None
-
-    return json_response({
+    post_stats = hydrate_posts(dbsession, [post.id], current_user_id).get(post.id) or empty_stats()
+    users = collect_users(dbsession, [post, *comments], DETAIL_USER_FIELDS, loaded=not normalized)
+
+    etag = make_etag(
+        current_user_id, shape, post.id, post.updated_at, post.content, post.user_id, post_stats, users,
+        comments_cursor, [(c.id, c.updated_at, c.content, c.user_id) for c in comments])
+    modified = last_modified(post, *comments)
+    response = not_modified(request, etag, modified)
+    if response is not None:
+        return response
+
+    detail = {
         'id': post.id,
         'content': post.content,
         'created_at': post.created_at.isoformat(),
-        'user': {
-            'id': post.user.id,
-            'username': post.user.username,  # ✅ GANTI DARI 'name' KE 'username'
-            'email': post.user.email
-        },
-        'likes_count': post_likes,
-        'is_liked_by_current_user': is_liked,
-        'is_saved_by_current_user': is_saved,
-        'comments': [{
-            'id': c.id,
-            'content': c.content,
-            'created_at': c.created_at.isoformat(),
-            'user': {
-                'id': c.user.id,
-                'username': c.user.username,  # ✅ GANTI DARI 'name' KE 'username'
-                'email': c.user.email
-            }
-        } for c in comments]
+    }
+    if normalized:
+        detail['user_id'] = post.user_id
+    else:
+        detail['user'] = users[str(post.user_id)]  # ✅ GANTI DARI 'name' KE 'username'
+    detail.update({
+        'likes_count': post_stats['likes_count'],
+        'comments_count': post_stats['comments_count'],
+        'is_liked_by_current_user': post_stats['is_liked'],
+        'is_saved_by_current_user': post_stats['is_saved'],
+        'comments': [comment_item(c, normalized) for c in comments],
+        'comments_next_cursor': comments_cursor,
     })
+    return with_validators(json_response(envelope(detail, users) if normalized else detail), etag, modified)
+
+
+@view_config(route_name='posts.comments', renderer='json', request_method='GET', permission='view', decorator=cache_anonymous)
+def list_comments(request):
+    """
+    Lanjutan daftar komentar (keyset ``created_at, id`` menaik). Cursor
+    halaman berikutnya dikirim di header ``X-Next-Cursor``.
+    """
+    try:
+        limit, cursor = page_params(
+            request, default_limit=configured_limit(request.registry.settings, 'pagination.comments_limit'))
+        shape = response_shape(request)
+    except (InvalidPageParams, InvalidShape) as e:
+        return json_response({'success': False, 'message': str(e)}, status=400)
+    normalized = shape == 'normalized'
+
+    dbsession = request.dbsession
+    post_id = request.matchdict['post_id']
+    if not dbsession.query(Post.id).filter_by(id=post_id, is_deleted=False).first():
+        return json_response({'success': False, 'message': 'Postingan tidak ditemukan'}, status=404)
+
+    comments, next_cursor = comments_page(dbsession, post_id, cursor, limit, with_users=not normalized)
+    users = collect_users(dbsession, comments, DETAIL_USER_FIELDS, loaded=not normalized)
+    etag = make_etag(next_cursor, shape, users, [(c.id, c.updated_at, c.content, c.user_id) for c in comments])
+
+    def build_results():
+        results = [comment_item(c, normalized) for c in comments]
+        return envelope(results, users) if normalized else results
+
+    return page_response(request, next_cursor, etag, last_modified(*comments), build_results)
+
 
 @view_config(route_name='posts.mine', renderer='json', request_method='GET', permission='view')
 def my_posts(request):
@@ -127,23 +275,75 @@ def my_posts(request):
     if not user_id: 
         return json_response({'success': False, 'message': 'Unauthorized'}, status=401)
 
-    dbsession = request.dbsession
-    posts = dbsession.query(Post).filter_by(user_id=user_id, is_deleted=False).order_by(Post.created_at.desc()).all()
+    try:
+        limit, cursor = page_params(request)
+    except InvalidPageParams as e:
+        return json_response({'success': False, 'message': str(e)}, status=400)
 
-    results = []
-    for post in posts:
-        likes = dbsession.query(Reaction).filter_by(post_id=post.id, type='like').count()
-        comments = dbsession.query(Comment).filter_by(post_id=post.id, is_deleted=False).count()
+    dbsession = request.dbsession
+    posts, next_cursor = split_page(
+        select_posts(dbsession, cursor, limit, author_id=user_id, with_users=False), limit,
+        key=lambda post: (post.created_at, post.id))
+
+    stats = hydrate_posts(dbsession, [post.id for post in posts])
+    etag = make_etag(user_id, next_cursor, [(post.id, post.updated_at, post.content, stats.get(post.id)) for post in posts])
+
+    def build_results():
+        results = []
+        for post in posts:
+            post_stats = stats.get(post.id) or empty_stats()
+            results.append({
+                "id": post.id,
+                "content": post.content,
+                "createdAt": post.created_at.isoformat(),
+                "likesCount": post_stats['likes_count'],
+                "commentsCount": post_stats['comments_count'],
+            })
+        return results
+
+    return page_response(request, next_cursor, etag, last_modified(*posts), build_results)
+
+
+@view_config(route_name='posts.saved', renderer='json', request_method='GET', permission='view')
+def saved_posts(request):
+    """
+    Daftar postingan yang disimpan user, urut dari yang terakhir disimpan.
+    Biayanya sebanding dengan jumlah simpanan user, bukan seluruh feed.
+    """
+    user_id = request.authenticated_userid
+    if not user_id:
+        return json_response({'success': False, 'message': 'Unauthorized'}, status=401)
 
-        results.append({
-            "id": post.id,
-            "content": post.content,
-            "createdAt": post.created_at.isoformat(),
-            "likesCount": likes,
-            "commentsCount": comments,
-        })
+    try:
+        limit, cursor = page_params(request)
+        shape = response_shape(request)
+    except (InvalidPageParams, InvalidShape) as e:
+        return json_response({'success': False, 'message': str(e)}, status=400)
+    normalized = shape == 'normalized'
 
-    return json_response(results)
+    dbsession = request.dbsession
+    eager = contains_eager(SavedPost.post)
+    if not normalized:
+        eager = eager.joinedload(Post.user)
+    query = dbsession.query(SavedPost).join(SavedPost.post).options(eager) \
+        .filter(SavedPost.user_id == user_id, Post.is_deleted == False)
+    saved, next_cursor = split_page(
+        keyset(query, SavedPost.saved_at, SavedPost.id, cursor, limit), limit,
+        key=lambda item: (item.saved_at, item.id))
+
+    posts = [item.post for item in saved]
+    saved_at = {item.post_id: item.saved_at for item in saved}
+    stats = hydrate_posts(dbsession, saved_at, user_id)
+    users = collect_users(dbsession, posts, FEED_USER_FIELDS, loaded=not normalized)
+    etag = make_etag(user_id, next_cursor, shape, users, [
+        (item.id, item.post_id, item.post.updated_at, item.post.content, item.post.user_id, stats.get(item.post_id))
+        for item in saved
+    ])
+
+    return page_response(
+        request, next_cursor, etag, last_modified(*posts),
+        lambda: feed_results(posts, stats, users, normalized,
+                             extra=lambda post: {"savedAt": saved_at[post.id].isoformat()}))
 
 
 @view_config(route_name='posts.edit', renderer='json', request_method='PUT')
@@ -167,6 +367,7 @@ def edit_post(request):
         
         post.content = content
         dbsession.flush()
+        invalidate_post_cache(request)
         return json_response({'success': True, 'message': 'Post berhasil diperbarui'})
     except Exception as e:
         return json_response({'success': False, 'message': f'Kesalahan: {str(e)}'}, status=500)
@@ -187,5 +388,6 @@ def delete_post(request):
 
     post.is_deleted = True
     dbsession.flush()
+    invalidate_post_cache(request)
 
     return json_response({'success': True, 'message': 'Post berhasil dihapus'})
@@ -6,6 +6,8 @@ from sqlalchemy.exc import IntegrityError
 from ..models.reaction import Reaction
 from ..models.saved_post import SavedPost
 from ..models.post import Post
+from ..cache import invalidate_post_cache
+from ..writer import run_write
 
 @view_config(route_name='posts.react', request_method='POST', permission='react')
 def react_post(request):
@@ -19,30 +21,38 @@ def react_post(request):
         request.session.flash('Anda harus login untuk memberikan reaksi.', queue='error')
         return HTTPForbidden()
 
-    dbsession = request.dbsession
-    
-    # Cek apakah post ada DAN tidak dihapus
-    post = dbsession.query(Post).filter_by(id=post_id).first()
-    # MODIFIKASI: Menambahkan kondisi post.is_deleted
-    if not post or post.is_deleted:
-        request.session.flash('Postingan tidak ditemukan.', queue='error')
-        return HTTPFound(location=request.route_url('home'))
+    def toggle_like(dbsession):
+        # Cek apakah post ada DAN tidak dihapus
+        post = dbsession.query(Post).filter_by(id=post_id).first()
+        # MODIFIKASI: Menambahkan kondisi post.is_deleted
+        if not post or post.is_deleted:
+            return None
 
-    existing_reaction = dbsession.query(Reaction).filter_by(
-        user_id=user_id, post_id=post_id, type='like'
-    ).first()
+        existing_reaction = dbsession.query(Reaction).filter_by(
+            user_id=user_id, post_id=post_id, type='like'
+        ).first()
 
-    if existing_reaction:
-        dbsession.delete(existing_reaction)
-        request.session.flash('Anda batal menyukai postingan ini.', queue='info')
-    else:
+        if existing_reaction:
+            dbsession.delete(existing_reaction)
+            return False
         new_reaction = Reaction(
             user_id=user_id,
             post_id=post_id,
             type='like'
         )
         dbsession.add(new_reaction)
+        return True
+
+    liked = run_write(request, toggle_like)
+    if liked is None:
+        request.session.flash('Postingan tidak ditemukan.', queue='error')
+        return HTTPFound(location=request.route_url('home'))
+
+    if liked:
         request.session.flash('Anda menyukai postingan ini!', queue='info')
+    else:
+        request.session.flash('Anda batal menyukai postingan ini.', queue='info')
+    invalidate_post_cache(request)
 
     return HTTPFound(location=request.route_url('posts.detail', id=post_id))
 
@@ -58,28 +68,36 @@ def save_post(request):
         request.session.flash('Anda harus login untuk menyimpan postingan.', queue='error')
         return HTTPForbidden()
 
-    dbsession = request.dbsession
+    def toggle_saved(dbsession):
+        # Cek apakah post ada DAN tidak dihapus
+        post = dbsession.query(Post).filter_by(id=post_id).first()
+        # MODIFIKASI: Menambahkan kondisi post.is_deleted
+        if not post or post.is_deleted:
+            return None
 
-    # Cek apakah post ada DAN tidak dihapus
-    post = dbsession.query(Post).filter_by(id=post_id).first()
-    # MODIFIKASI: Menambahkan kondisi post.is_deleted
-    if not post or post.is_deleted:
-        request.session.flash('Postingan tidak ditemukan.', queue='error')
-        return HTTPFound(location=request.route_url('home'))
-
-    existing_saved = dbsession.query(SavedPost).filter_by(
-        user_id=user_id, post_id=post_id
-    ).first()
+        existing_saved = dbsession.query(SavedPost).filter_by(
+            user_id=user_id, post_id=post_id
+        ).first()
 
-    if existing_saved:
-        dbsession.delete(existing_saved)
-        request.session.flash('Anda menghapus postingan dari daftar simpanan.', queue='info')
-    else:
+        if existing_saved:
+            dbsession.delete(existing_saved)
+            return False
         new_saved = SavedPost(
             user_id=user_id,
             post_id=post_id
         )
         dbsession.add(new_saved)
+        return True
+
+    saved = run_write(request, toggle_saved)
+    if saved is None:
+        request.session.flash('Postingan tidak ditemukan.', queue='error')
+        return HTTPFound(location=request.route_url('home'))
+
+    if saved:
         request.session.flash('Anda menyimpan postingan ini!', queue='info')
+    else:
+        request.session.flash('Anda menghapus postingan dari daftar simpanan.', queue='info')
+    invalidate_post_cache(request)
     
     return HTTPFound(location=request.route_url('posts.detail', id=post_id))
\ No newline at end of file
@@ -1,15 +1,7 @@
 from pyramid.view import view_config
-from pyramid.response import Response
 from pyramid.httpexceptions import HTTPBadRequest
 from ..models.user import User
-import json
-
-def json_response(data, status=200):
-    return Response(
-        body=json.dumps(data, default=str),
-        content_type='application/json; charset=utf-8',
-        status=status
-    )
+from ..renderers import json_response
 
 @view_config(route_name='auth.me', renderer='json', permission='view')
 def me_view(request):
@@ -0,0 +1,197 @@
+# writer.py
+import logging
+import queue
+import threading
+import time
+
+from pyramid.settings import asbool
+from sqlalchemy import event
+
+from .models import get_engine, get_session_factory
+from .models.pool import uses_queue_pool
+from .models.routing import engine_prefix, engine_options, note_write
+from .renderers import json_response
+
+log = logging.getLogger(__name__)
+
+
+class WriterBusy(Exception):
+    """Antrian writer penuh; request dijawab 503."""
+
+
+class WriteJob:
+    __slots__ = ('func', 'done', 'result', 'error')
+
+    def __init__(self, func):
+        self.func = func
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class GroupCommitWriter:
+    """
+    Satu thread penulis untuk SQLite. Job tulis dari banyak request
+    dikumpulkan (sampai ``max_batch`` job) lalu di-commit sekali, sehingga
+    lock tulis dan fsync dibayar per batch, bukan per request. Dengan
+    ``window = 0`` batch berisi job yang antre selama commit sebelumnya,
+    jadi beban rendah tidak menunggu dan batch membesar seiring beban.
+
+    Tiap job berjalan di SAVEPOINT sendiri: job yang gagal hanya
+    membatalkan perubahannya, job lain di batch tetap di-commit.
+    Fungsi job menerima ``dbsession`` dan sebaiknya mengembalikan data
+    biasa (id, dict), bukan objek ORM.
+    """
+
+    def __init__(self, session_factory, max_batch=64, window=0.0, max_queue=1024, queue_timeout=5.0):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.window = window
+        self.queue_timeout = queue_timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self.batches = 0
+        self.jobs = 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='apcer-writer', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, func):
+        """Jalankan ``func(dbsession)`` di thread writer dan tunggu hasilnya."""
+        job = WriteJob(func)
+        try:
+            self._queue.put(job, timeout=self.queue_timeout)
+        except queue.Full:
+            raise WriterBusy('Antrian tulis penuh')
+        return job.wait()
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                self._queue.put(None)  # Berhenti setelah batch ini
+                break
+            batch.append(job)
+        return batch
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            self._commit(self._collect(job))
+
+    def _commit(self, batch):
+        session = self.session_factory()
+        succeeded = []
+        try:
+            for job in batch:
+                try:
+                    with session.begin_nested():
+                        job.result = job.func(session)
+                    succeeded.append(job)
+                except Exception as e:
+                    job.error = e
+            session.commit()
+        except Exception as e:
+            log.exception('Commit batch writer gagal (%d job)', len(batch))
+            session.rollback()
+            for job in succeeded:
+                job.result, job.error = None, e
+        finally:
+            session.close()
+            self.batches += 1
+            self.jobs += len(batch)
+            for job in batch:
+                job.done.set()
+
+    def stats(self):
+        return {'batches': self.batches, 'jobs': self.jobs, 'queued': self._queue.qsize()}
+
+
+def _begin_immediate(engine):
+    """
+    pysqlite baru mengirim BEGIN sebelum DML pertama, sehingga SAVEPOINT di
+    awal batch berjalan tanpa transaksi luar. Ambil alih BEGIN di engine
+    writer: BEGIN IMMEDIATE langsung memegang lock tulis untuk satu batch.
+    """
+    @event.listens_for(engine, 'connect')
+    def disable_pysqlite_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, 'begin')
+    def begin_immediate(connection):
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+
+
+def writer_from_settings(settings):
+    if not asbool(settings.get('writer.enabled', False)):
+        return None
+    # Engine terpisah karena BEGIN IMMEDIATE tidak boleh dipakai pembaca;
+    # cukup satu koneksi untuk satu thread writer.
+    prefix = engine_prefix(settings, 'write')
+    if uses_queue_pool(engine_options(settings, prefix)['sqlalchemy.url']):
+        settings = {**settings, prefix + 'pool_size': 1, prefix + 'max_overflow': 0}
+    engine = get_engine(settings, prefix)
+    if engine.dialect.name == 'sqlite':
+        _begin_immediate(engine)
+    return GroupCommitWriter(
+        get_session_factory(engine),
+        max_batch=int(settings.get('writer.max_batch', 64)),
+        window=float(settings.get('writer.window_ms', 0)) / 1000,
+        max_queue=int(settings.get('writer.max_queue', 1024)),
+        queue_timeout=float(settings.get('writer.queue_timeout', 5)),
+    )
+
+
+def run_write(request, func):
+    """
+    Jalankan ``func(dbsession)``: lewat writer jika ``writer.enabled``,
+    selain itu langsung di ``request.dbsession`` (transaksi pyramid_tm).
+    """
+    writer = request.registry.get('db_writer')
+    if writer is None:
+        return func(request.dbsession)
+    result = writer.submit(func)
+    note_write(request)
+    return result
+
+
+def writer_busy_view(exc, request):
+    response = json_response({'success': False, 'message': 'Server sedang sibuk, coba lagi sebentar'}, status=503)
+    response.headers['Retry-After'] = '1'
+    return response
+
+
+def includeme(config):
+    """
+    Mode writer opsional lewat ``config.include('apcer.writer')``.
+    """
+    writer = writer_from_settings(config.get_settings())
+    config.registry['db_writer'] = writer
+    config.add_exception_view(writer_busy_view, context=WriterBusy)
+    if writer is not None:
+        writer.start()
+        log.info('Writer group-commit aktif: max_batch=%d, window=%.1f ms',
+                 writer.max_batch, writer.window * 1000)
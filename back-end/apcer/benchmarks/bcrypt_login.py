@@ -0,0 +1,63 @@
+"""
+Benchmark verifikasi password (inti /login) per cost bcrypt dan ukuran pool.
+
+Sejumlah thread (meniru thread waitress) memanggil ``PasswordHasher.verify``
+bersamaan; dilaporkan login/detik dan latensi p95. ``workers = 0`` berarti
+bcrypt dijalankan langsung di thread request (perilaku lama).
+
+    PYTHONPATH=. python benchmarks/bcrypt_login.py [--rounds 10 12] [--workers 0 1 2 4]
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+
+from apcer.hashing import PasswordHasher
+
+
+def run(rounds, workers, threads, logins):
+    hasher = PasswordHasher(rounds=rounds, workers=workers, max_pending=threads, timeout=120)
+    hashed = hasher.hash('password123')  # sekaligus memanaskan process pool
+    latencies = []
+    lock = threading.Lock()
+
+    def client(count):
+        for _ in range(count):
+            start = time.perf_counter()
+            assert hasher.verify('password123', hashed)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    per_thread = max(logins // threads, 1)
+    pool = [threading.Thread(target=client, args=(per_thread,)) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    hasher.shutdown()
+
+    p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+    return len(latencies) / elapsed, p95
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, nargs='+', default=[10, 12])
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2, 4])
+    parser.add_argument('--threads', type=int, default=8, help='Jumlah thread klien (default 8)')
+    parser.add_argument('--logins', type=int, default=48)
+    args = parser.parse_args()
+
+    print(f"cpu={os.cpu_count()} threads={args.threads}")
+    print(f"{'rounds':>6} {'workers':>7} {'login/s':>9} {'p95 ms':>9}")
+    for rounds in args.rounds:
+        for workers in args.workers:
+            rate, p95 = run(rounds, workers, args.threads, args.logins)
+            print(f"{rounds:>6} {workers:>7} {rate:>9.1f} {p95 * 1000:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Biaya materialisasi per baris halaman feed (post + author): query ORM
+lama (``joinedload(Post.user)``) dibanding statement Core di
+``apcer.models.reads`` yang menghasilkan record ``__slots__``. Baris
+"driver" adalah batas bawah: statement Core yang sama lewat cursor DBAPI
+tanpa membuat objek apa pun.
+
+Dataset dibuat dengan ``apcer.scripts.datagen`` (seed tetap) di folder
+sementara; semua kandidat membaca database yang sama.
+
+    PYTHONPATH=. python benchmarks/core_read_path.py [--posts 100000] [--rows 20 100 1000] [--repeat 50]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy.orm import joinedload
+
+from apcer.models import get_engine, get_session_factory, Post
+from apcer.models.reads import FEED_STATEMENTS, select_posts
+from apcer.scripts.datagen import generate
+
+
+def orm_feed(session, limit):
+    return (session.query(Post).options(joinedload(Post.user))
+            .filter(Post.is_deleted == False)
+            .order_by(Post.created_at.desc(), Post.id.desc())
+            .limit(limit + 1).all())
+
+
+def core_feed(session, limit):
+    return select_posts(session, None, limit)
+
+
+_COMPILED = {}
+
+
+def driver_feed(session, limit):
+    # Dikompilasi sekali (seperti compiled_cache engine) agar yang terukur hanya cursor
+    bind = session.get_bind()
+    compiled = _COMPILED.get(bind)
+    if compiled is None:
+        compiled = _COMPILED[bind] = FEED_STATEMENTS[True, False, False].compile(bind)
+    params = compiled.construct_params({'limit': limit})
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.execute(str(compiled), [params[name] for name in compiled.positiontup])
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def measure(session_factory, feed, limit, repeat):
+    timings = []
+    for _ in range(repeat):
+        # Session baru tiap putaran, seperti satu request
+        session = session_factory()
+        start = time.perf_counter()
+        rows = feed(session, limit)
+        timings.append(time.perf_counter() - start)
+        session.close()
+    assert len(rows) == limit + 1
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=100000)
+    parser.add_argument('--rows', type=int, nargs='+', default=[20, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.sqlite')
+    engine = get_engine({'sqlalchemy.url': url})
+    print(generate(engine, args.posts, seed=args.seed, password_hash='x').report())
+    session_factory = get_session_factory(engine)
+
+    candidates = [('ORM', orm_feed), ('Core', core_feed), ('driver', driver_feed)]
+    print(f"{'rows':>6} " + ''.join(f"{name + ' ms':>12}{'us/row':>9}" for name, _ in candidates) + f"{'ORM/Core':>10}")
+    for limit in args.rows:
+        for _, feed in candidates:  # pemanasan: compiled cache dan page cache SQLite
+            measure(session_factory, feed, limit, 5)
+        results = [measure(session_factory, feed, limit, args.repeat) for _, feed in candidates]
+        print(f"{limit:>6} " + ''.join(f"{s * 1000:>12.2f}{s * 1e6 / (limit + 1):>9.1f}" for s in results)
+              + f"{results[0] / results[1]:>9.1f}x")
+    engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark tulis bersamaan ke SQLite: satu transaksi per request (perilaku
+default) dibanding ``apcer.writer.GroupCommitWriter``.
+
+Setiap thread klien membuat post satu per satu seperti ``create_post``.
+
+    PYTHONPATH=. python benchmarks/group_commit.py [--threads 1 8 32] [--seconds 3] [--synchronous FULL]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+
+from apcer.models import get_engine, get_session_factory, Post, User
+from apcer.models.meta import Base
+from apcer.writer import writer_from_settings
+
+
+def insert_post(dbsession):
+    post = Post(user_id=1, content='post dari benchmark group commit')
+    dbsession.add(post)
+    dbsession.flush()
+    return post.id
+
+
+def prepare(settings):
+    engine = get_engine(settings)
+    Base.metadata.create_all(engine)
+    session = get_session_factory(engine)()
+    session.add(User(email='a@x.com', username='a', password_hash='x'))
+    session.commit()
+    session.close()
+    return engine
+
+
+def run(mode, settings, threads, seconds):
+    engine = prepare(settings)
+    writer = None
+    if mode == 'writer':
+        writer = writer_from_settings({**settings, 'writer.enabled': 'true'}).start()
+        write = writer.submit
+    else:
+        session_factory = get_session_factory(engine)
+
+        def write(func):
+            session = session_factory()
+            try:
+                result = func(session)
+                session.commit()
+                return result
+            finally:
+                session.close()
+
+    stop = time.monotonic() + seconds
+    counts = {'ok': 0, 'locked': 0}
+    lock = threading.Lock()
+
+    def client():
+        while time.monotonic() < stop:
+            try:
+                write(insert_post)
+                name = 'ok'
+            except OperationalError:
+                name = 'locked'
+            with lock:
+                counts[name] += 1
+
+    pool = [threading.Thread(target=client) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    batches = writer.stats()['batches'] if writer else counts['ok']
+    if writer:
+        writer.stop()
+    engine.dispose()
+    return counts['ok'] / seconds, counts['locked'], counts['ok'] / max(batches, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--seconds', type=float, default=3)
+    parser.add_argument('--synchronous', default='NORMAL', help='Pragma synchronous (NORMAL/FULL)')
+    parser.add_argument('--busy-timeout', default='1000', help='Pragma busy_timeout dalam ms')
+    parser.add_argument('--window-ms', default='0', help='Jendela pengumpulan batch writer')
+    args = parser.parse_args()
+
+    print(f"synchronous={args.synchronous} busy_timeout={args.busy_timeout} window_ms={args.window_ms}")
+    print(f"{'mode':<8} {'threads':>7} {'post/s':>9} {'locked':>7} {'job/commit':>11}")
+    for threads in args.threads:
+        for mode in ('direct', 'writer'):
+            settings = {
+                'sqlalchemy.url': 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.sqlite'),
+                'sqlite.synchronous': args.synchronous,
+                'sqlite.busy_timeout': args.busy_timeout,
+                'writer.window_ms': args.window_ms,
+            }
+            rate, locked, per_commit = run(mode, settings, threads, args.seconds)
+            print(f"{mode:<8} {threads:>7} {rate:>9.0f} {locked:>7} {per_commit:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Micro-benchmark serialisasi feed 1.000 post.
+
+Membandingkan helper lama (``json.dumps(default=str)``), renderer lama
+``JSON(indent=4)``, dan ``apcer.renderers`` (orjson jika terpasang).
+
+    PYTHONPATH=. python benchmarks/json_feed.py [--posts 1000] [--repeat 200]
+"""
+import argparse
+import datetime
+import json
+import random
+import timeit
+
+from apcer import renderers
+
+
+def build_feed(count):
+    rng = random.Random(42)
+    now = datetime.datetime(2025, 5, 24, 16, 18, 11)
+    return [{
+        "id": i,
+        "username": f"Anonim #{rng.randint(1, 500)}",
+        "createdAt": now - datetime.timedelta(minutes=i),
+        "content": ' '.join(rng.choice(['lorem', 'ipsum', 'dolor', 'sit', 'amet', 'kuliah', 'tugas'])
+                            for _ in range(rng.randint(10, 60))),
+        "likesCount": rng.randint(0, 300),
+        "commentsCount": rng.randint(0, 40),
+        "isLiked": rng.random() < 0.2,
+        "isSaved": rng.random() < 0.05,
+    } for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--posts', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    feed = build_feed(args.posts)
+    candidates = [
+        ('json.dumps(default=str)', lambda: json.dumps(feed, default=str).encode('utf-8')),
+        ('JSON(indent=4)', lambda: json.dumps(feed, default=str, indent=4).encode('utf-8')),
+        (f"renderers.dumps ({'orjson' if renderers.orjson else 'stdlib'})", lambda: renderers.dumps(feed)),
+    ]
+
+    print(f"{'encoder':<28} {'ms/feed':>10} {'bytes':>10}")
+    for name, encode in candidates:
+        seconds = min(timeit.repeat(encode, number=args.repeat, repeat=3)) / args.repeat
+        print(f"{name:<28} {seconds * 1000:>10.3f} {len(encode()):>10}")
+
+
+if __name__ == '__main__':
+    main()
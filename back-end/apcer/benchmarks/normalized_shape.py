@@ -0,0 +1,81 @@
+"""
+Ukuran respons detail post dengan banyak komentar: bentuk nested (default,
+user ikut di setiap komentar) dibanding ``?shape=normalized`` (user sekali
+di map ``users``). Semua komentar dimuat dalam satu halaman; ukuran gzip
+dihitung terpisah karena kompresi respons dimatikan di app.
+
+    PYTHONPATH=. python benchmarks/normalized_shape.py [--comments 1000] [--authors 52]
+"""
+import argparse
+import datetime
+import gzip
+import os
+import random
+import tempfile
+
+from webob import Request
+
+from apcer import main as apcer_main
+from apcer.models import get_engine, get_session_factory, Comment, Post, User
+from apcer.models.meta import Base
+
+
+def prepare(url, comments, authors, seed):
+    rng = random.Random(seed)
+    engine = get_engine({'sqlalchemy.url': url})
+    Base.metadata.create_all(engine)
+    session = get_session_factory(engine)()
+    users = [User(email=f'user{i}@apcer.com', username=f'Anonim #{i}', password_hash='x')
+             for i in range(1, authors + 1)]
+    session.add_all(users)
+    session.flush()
+    post = Post(user_id=users[0].id, content='Post dengan banyak komentar')
+    session.add(post)
+    session.flush()
+    # Penulis komentar berbobot Zipf: segelintir user menulis sebagian besar komentar
+    weights = [1.0 / rank for rank in range(1, authors + 1)]
+    created_at = datetime.datetime(2025, 1, 1)
+    session.add_all([
+        Comment(post_id=post.id, user_id=rng.choices(users, weights)[0].id,
+                content=' '.join(rng.choices(['kuliah', 'tugas', 'dosen', 'kampus', 'ujian', 'setuju', 'semangat'],
+                                             k=rng.randint(3, 12))),
+                created_at=created_at + datetime.timedelta(minutes=i))
+        for i in range(comments)
+    ])
+    session.commit()
+    post_id = post.id
+    session.close()
+    engine.dispose()
+    return post_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--comments', type=int, default=1000)
+    parser.add_argument('--authors', type=int, default=52)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.sqlite')
+    post_id = prepare(url, args.comments, args.authors, args.seed)
+    app = apcer_main({}, **{
+        'sqlalchemy.url': url,
+        'auth.secret': 'x' * 40,
+        'cache.backend': 'none',
+        'compression.enabled': 'false',
+        'pagination.comments_limit': str(args.comments),
+        'pagination.max_limit': str(args.comments),
+    })
+
+    sizes = {}
+    for shape in ('nested', 'normalized'):
+        response = Request.blank(f'/posts/{post_id}?shape={shape}').get_response(app)
+        assert response.status_code == 200
+        sizes[shape] = (len(response.body), len(gzip.compress(response.body)))
+        print(f"{shape:<12}{sizes[shape][0]:>10,} bytes{sizes[shape][1]:>10,} gzip")
+    (nested, nested_gz), (normalized, normalized_gz) = sizes['nested'], sizes['normalized']
+    print(f"{'hemat':<12}{1 - normalized / nested:>10.0%}      {1 - normalized_gz / nested_gz:>10.0%} gzip")
+
+
+if __name__ == '__main__':
+    main()
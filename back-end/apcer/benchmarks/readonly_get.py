@@ -0,0 +1,73 @@
+"""
+Overhead per request GET sederhana: transaksi pyramid_tm penuh dibanding
+session read-only (``db.read_only_get``). Cache respons dan kompresi
+dimatikan supaya yang terukur hanya jalur request + satu query.
+
+    PYTHONPATH=. python benchmarks/readonly_get.py [--requests 1000] [--rounds 5]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from webob import Request
+
+from apcer import main as apcer_main
+from apcer.models import get_engine, get_session_factory, Post, User
+from apcer.models.meta import Base
+
+
+def prepare(url):
+    engine = get_engine({'sqlalchemy.url': url})
+    Base.metadata.create_all(engine)
+    session = get_session_factory(engine)()
+    session.add(User(email='a@x.com', username='a', password_hash='x'))
+    session.flush()
+    session.add(Post(user_id=1, content='halo'))
+    session.commit()
+    session.close()
+    engine.dispose()
+
+
+def make_app(url, read_only):
+    app = apcer_main({}, **{
+        'sqlalchemy.url': url,
+        'auth.secret': 'x' * 40,
+        'cache.backend': 'none',
+        'compression.enabled': 'false',
+        'db.read_only_get': 'true' if read_only else 'false',
+    })
+    for _ in range(100):  # pemanasan
+        Request.blank('/posts/1').get_response(app)
+    return app
+
+
+def run(app, requests):
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = Request.blank('/posts/1').get_response(app)
+        assert response.status_code == 200
+    return (time.perf_counter() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--rounds', type=int, default=5, help='Putaran bergantian; diambil yang tercepat')
+    args = parser.parse_args()
+
+    url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.sqlite')
+    prepare(url)
+    apps = {'pyramid_tm': make_app(url, False), 'read-only': make_app(url, True)}
+    results = {name: float('inf') for name in apps}
+    for _ in range(args.rounds):
+        for name, app in apps.items():
+            results[name] = min(results[name], run(app, args.requests))
+    for name, seconds in results.items():
+        print(f"{name:<12} {seconds * 1e6:>8.0f} us/request")
+    saved = results['pyramid_tm'] - results['read-only']
+    print(f"hemat        {saved * 1e6:>8.0f} us/request ({saved / results['pyramid_tm']:.0%})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark baca/tulis bersamaan pada SQLite file: tanpa pragma (journal
+rollback, synchronous=FULL) dibanding profil ``apcer.models.pragmas``.
+
+Beberapa thread membaca halaman feed (SELECT ... ORDER BY created_at, id)
+sementara thread lain menulis satu post per transaksi.
+
+    PYTHONPATH=. python benchmarks/sqlite_pragmas.py [--readers 6] [--writers 2] [--seconds 5]
+"""
+import argparse
+import datetime
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from apcer.models import get_engine, log_active_pragmas
+from apcer.models.meta import Base
+from apcer.models.pragmas import DEFAULT_PRAGMAS
+
+
+def prepare(url, rows):
+    engine = get_engine({'sqlalchemy.url': url, **{f'sqlite.{name}': '' for name in DEFAULT_PRAGMAS}})
+    Base.metadata.create_all(engine)
+    now = datetime.datetime(2025, 1, 1)
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO users (email, username, password_hash) VALUES ('a@x.com', 'a', 'x')"))
+        connection.execute(
+            text("INSERT INTO posts (user_id, content, created_at, is_deleted, likes_count, comments_count) "
+                 "VALUES (1, :content, :created_at, 0, 0, 0)"),
+            [{'content': f'post {i} ' * 20, 'created_at': now + datetime.timedelta(seconds=i)} for i in range(rows)])
+    engine.dispose()
+
+
+def run(settings, readers, writers, seconds):
+    engine = get_engine(settings)
+    active = log_active_pragmas(engine)
+    stop = time.monotonic() + seconds
+    counts = {'read': 0, 'write': 0, 'locked': 0}
+    lock = threading.Lock()
+
+    def count(name):
+        with lock:
+            counts[name] += 1
+
+    def reader():
+        while time.monotonic() < stop:
+            try:
+                with engine.connect() as connection:
+                    connection.execute(text(
+                        "SELECT id, content FROM posts WHERE is_deleted = 0 "
+                        "ORDER BY created_at DESC, id DESC LIMIT 20")).fetchall()
+                count('read')
+            except OperationalError:
+                count('locked')
+
+    def writer():
+        while time.monotonic() < stop:
+            try:
+                with engine.begin() as connection:
+                    connection.execute(text(
+                        "INSERT INTO posts (user_id, content, created_at, is_deleted, likes_count, comments_count) "
+                        "VALUES (1, 'baru', CURRENT_TIMESTAMP, 0, 0, 0)"))
+                count('write')
+            except OperationalError:
+                count('locked')
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    return active, {name: value / seconds for name, value in counts.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=6)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--rows', type=int, default=5000)
+    args = parser.parse_args()
+
+    profiles = [
+        ('tanpa pragma', {f'sqlite.{name}': '' for name in DEFAULT_PRAGMAS}),
+        ('profil apcer', {}),
+    ]
+    print(f"{'profil':<14} {'read/s':>9} {'write/s':>9} {'locked/s':>9}  pragma")
+    for name, overrides in profiles:
+        url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.sqlite')
+        prepare(url, args.rows)
+        active, rates = run({'sqlalchemy.url': url, **overrides}, args.readers, args.writers, args.seconds)
+        print(f"{name:<14} {rates['read']:>9.0f} {rates['write']:>9.0f} {rates['locked']:>9.1f}  "
+              f"journal_mode={active['journal_mode']} synchronous={active['synchronous']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -28,6 +28,12 @@ tests_require = [
     'pytest-cov',
 ]
 
+# Opsional: encoder JSON cepat (apcer.renderers) dan brotli (apcer.compression)
+speedups_require = [
+    'orjson',
+    'brotli',
+]
+
 setup(
     name='apcer',
     version='0.0',
@@ -48,6 +54,8 @@ setup(
     zip_safe=False,
     extras_require={
         'testing': tests_require,
+        'speedups': speedups_require,
+        'datagen': ['numpy'],  # Generate data --scale tervektorisasi
     },
     install_requires=requires,
     entry_points={
@@ -56,6 +64,9 @@ setup(
         ],
         'console_scripts': [
             'initialize_apcer_db = apcer.scripts.initialize_db:main',
+            'reconcile_apcer_counters = apcer.scripts.reconcile_counters:main',
+            'apcer-bench = apcer.scripts.bench:main',
+            'rebuild_apcer_search = apcer.scripts.rebuild_search:main',
         ],
     },
 )
@@ -26,5 +26,23 @@ export function useComments() {
     }
   };
 
-  return { addComment };
+  // Halaman komentar berikutnya; cursor awal dari `comments_next_cursor` di detail post
+  const getComments = async (postId, cursor) => {
+    const params = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+    try {
+      const res = await fetch(`${API_URL}/posts/${postId}/comments${params}`, {
+        credentials: "include",
+      });
+      if (!res.ok) return { items: [], nextCursor: null };
+      return {
+        items: await res.json(),
+        nextCursor: res.headers.get("X-Next-Cursor"),
+      };
+    } catch (err) {
+      console.error("Gagal memuat komentar:", err);
+      return { items: [], nextCursor: null };
+    }
+  };
+
+  return { addComment, getComments };
 }
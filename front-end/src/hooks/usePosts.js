@@ -3,13 +3,17 @@ import { useCallback } from "react";
 
 const API_URL = "http://localhost:6543";
 
+// Satu halaman list: body berupa array, cursor halaman berikutnya di header
+// X-Next-Cursor (null jika sudah halaman terakhir)
+async function fetchPage(path, cursor) {
+  const url = cursor ? `${API_URL}${path}?cursor=${encodeURIComponent(cursor)}` : `${API_URL}${path}`;
+  const res = await fetch(url, { credentials: "include" });
+  if (!res.ok) return { items: [], nextCursor: null };
+  return { items: await res.json(), nextCursor: res.headers.get("X-Next-Cursor") };
+}
+
 export function usePosts() {
-  const getAllPosts = useCallback(async () => {
-    const res = await fetch(`${API_URL}/posts`, {
-      credentials: "include",
-    });
-    return res.ok ? await res.json() : [];
-  }, []);
+  const getAllPosts = useCallback((cursor) => fetchPage("/posts", cursor), []);
 
   const getPostDetail = useCallback(async (id) => {
     const res = await fetch(`${API_URL}/posts/${id}`, {
@@ -29,12 +33,9 @@ export function usePosts() {
     return res.ok;
   }, []);
 
-  const getMyPosts = useCallback(async () => {
-    const res = await fetch(`${API_URL}/posts/mine`, {
-      credentials: "include",
-    });
-    return res.ok ? await res.json() : [];
-  }, []);
+  const getMyPosts = useCallback((cursor) => fetchPage("/posts/mine", cursor), []);
+
+  const getSavedPosts = useCallback((cursor) => fetchPage("/posts/saved", cursor), []);
 
   const updatePost = useCallback(async (id, content) => {
     const res = await fetch(`${API_URL}/posts/${id}/edit`, {
@@ -63,6 +64,7 @@ export function usePosts() {
     getPostDetail,
     createPost,
     getMyPosts,
+    getSavedPosts,
     updatePost,
     deletePost,
   };
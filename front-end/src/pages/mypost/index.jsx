@@ -20,20 +20,35 @@ import { Link } from "react-router-dom";
 export default function MyPostsPage() {
   const { getMyPosts, updatePost, deletePost } = usePosts();
   const [myPosts, setMyPosts] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [editData, setEditData] = useState(null);
   const [editValue, setEditValue] = useState("");
 
   useEffect(() => {
     const fetchMyPosts = async () => {
       setLoading(true);
-      const posts = await getMyPosts();
-      if (Array.isArray(posts)) setMyPosts(posts);
+      const page = await getMyPosts();
+      setMyPosts(page.items);
+      setNextCursor(page.nextCursor);
       setLoading(false);
     };
     fetchMyPosts();
   }, [getMyPosts]);
 
+  // Halaman berikutnya lewat cursor dari header X-Next-Cursor
+  const handleLoadMore = async () => {
+    setLoadingMore(true);
+    const page = await getMyPosts(nextCursor);
+    setMyPosts((prev) => {
+      const seen = new Set(prev.map((p) => p.id));
+      return [...prev, ...page.items.filter((p) => !seen.has(p.id))];
+    });
+    setNextCursor(page.nextCursor);
+    setLoadingMore(false);
+  };
+
   const handleEdit = async () => {
     const success = await updatePost(editData.id, editValue);
     if (success) {
@@ -184,6 +199,15 @@ export default function MyPostsPage() {
             ))}
           </ul>
         )}
+
+        {!loading && nextCursor && (
+          <div className="flex justify-center">
+            <Button variant="outline" onClick={handleLoadMore} disabled={loadingMore}>
+              {loadingMore && <Loader2 className="animate-spin w-4 h-4 mr-2" />}
+              Muat lebih banyak
+            </Button>
+          </div>
+        )}
       </div>
     </DashboardLayout>
   );
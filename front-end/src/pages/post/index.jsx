@@ -19,31 +19,39 @@ import { Link } from "react-router-dom";
 export default function PostListPage() {
   const { getAllPosts, createPost } = usePosts();
   const [posts, setPosts] = useState([]);
-  const [visibleCount, setVisibleCount] = useState(6);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
-  const [hasMore, setHasMore] = useState(true);
   const [open, setOpen] = useState(false);
   const [newContent, setNewContent] = useState("");
   const observerRef = useRef();
 
+  const hasMore = Boolean(nextCursor);
+
+  // Halaman pertama (juga dipakai untuk refresh setelah membuat postingan)
   const fetchPosts = useCallback(async () => {
     setLoading(true);
-    const all = await getAllPosts();
-    const sorted = Array.isArray(all)
-      ? [...all].sort((a, b) => new Date(b.created_at) - new Date(a.created_at))
-      : [];
-    setPosts(sorted);
-    setHasMore(sorted.length > visibleCount);
+    const page = await getAllPosts();
+    setPosts(page.items);
+    setNextCursor(page.nextCursor);
     setLoading(false);
-  }, [getAllPosts, visibleCount]);
+  }, [getAllPosts]);
 
   useEffect(() => {
     fetchPosts();
   }, [fetchPosts]);
 
-  const loadMore = () => {
-    setVisibleCount((prev) => prev + 6);
-  };
+  // Infinite scroll: ikuti cursor dari header X-Next-Cursor
+  const loadMore = useCallback(async () => {
+    if (!nextCursor) return;
+    setLoading(true);
+    const page = await getAllPosts(nextCursor);
+    setPosts((prev) => {
+      const seen = new Set(prev.map((p) => p.id));
+      return [...prev, ...page.items.filter((p) => !seen.has(p.id))];
+    });
+    setNextCursor(page.nextCursor);
+    setLoading(false);
+  }, [getAllPosts, nextCursor]);
 
   const lastPostRef = useCallback(
     (node) => {
@@ -58,7 +66,7 @@ export default function PostListPage() {
 
       if (node) observerRef.current.observe(node);
     },
-    [loading, hasMore]
+    [loading, hasMore, loadMore]
   );
 
   const handleCreatePost = async () => {
@@ -78,8 +86,6 @@ export default function PostListPage() {
     }
   };
 
-  const visiblePosts = posts.slice(0, visibleCount);
-
   return (
     <DashboardLayout>
       <div className="p-6 space-y-8">
@@ -91,8 +97,8 @@ export default function PostListPage() {
           </Button>
         </div>
 
-        {visiblePosts.map((post, index) => {
-          const isLast = index === visiblePosts.length - 1;
+        {posts.map((post, index) => {
+          const isLast = index === posts.length - 1;
           return (
             <Link
               key={post.id}
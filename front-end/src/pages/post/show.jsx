@@ -12,12 +12,14 @@ import clsx from "clsx";
 export default function PostDetailPage() {
   const { id } = useParams();
   const { getPostDetail } = usePosts();
-  const { addComment } = useComments();
+  const { addComment, getComments } = useComments();
   const { toggleReaction } = useReactions();
   const { toggleSave } = useSavedPosts();
 
   const [post, setPost] = useState(null);
   const [comments, setComments] = useState([]);
+  const [commentsCursor, setCommentsCursor] = useState(null);
+  const [loadingComments, setLoadingComments] = useState(false);
   const [loading, setLoading] = useState(true);
   const [newComment, setNewComment] = useState("");
   const [showCount, setShowCount] = useState(3);
@@ -33,6 +35,7 @@ export default function PostDetailPage() {
         if (data?.id) {
           setPost(data);
           setComments(data.comments || []);
+          setCommentsCursor(data.comments_next_cursor || null);
           setLikesCount(data.likes_count || 0);
           setIsLiked(data.is_liked_by_current_user || false);
           setIsSaved(data.is_saved_by_current_user || false);
@@ -49,12 +52,31 @@ export default function PostDetailPage() {
     fetchDetail();
   }, [id, getPostDetail]);
 
+  // Gabungkan tanpa duplikat (komentar baru bisa muncul lagi di halaman berikutnya)
+  const appendComments = (items) => {
+    setComments((prev) => {
+      const seen = new Set(prev.map((c) => c.id));
+      return [...prev, ...items.filter((c) => !seen.has(c.id))];
+    });
+  };
+
+  const handleShowMore = async () => {
+    if (comments.length <= showCount && commentsCursor) {
+      setLoadingComments(true);
+      const { items, nextCursor } = await getComments(id, commentsCursor);
+      appendComments(items);
+      setCommentsCursor(nextCursor);
+      setLoadingComments(false);
+    }
+    setShowCount((prev) => prev + 3);
+  };
+
   const handleAddComment = async () => {
     if (!newComment.trim()) return;
 
     const comment = await addComment(id, newComment);
     if (comment) {
-      setComments((prev) => [...prev, comment]);
+      appendComments([comment]);
       setNewComment("");
       toast.success("Komentar ditambahkan");
     } else {
@@ -202,12 +224,13 @@ export default function PostDetailPage() {
               </div>
             ))}
 
-            {comments.length > showCount && (
+            {(comments.length > showCount || commentsCursor) && (
               <button
-                onClick={() => setShowCount((prev) => prev + 3)}
+                onClick={handleShowMore}
+                disabled={loadingComments}
                 className="text-primary text-sm hover:underline"
               >
-                Lihat komentar lainnya
+                {loadingComments ? "Memuat..." : "Lihat komentar lainnya"}
               </button>
             )}
 
@@ -3,24 +3,39 @@ import { useEffect, useState } from "react";
 import { usePosts } from "@/hooks/usePosts";
 import DashboardLayout from "@/layouts/dashboard-layout";
 import PostCard from "@/components/card/post-card";
+import { Button } from "@/components/ui/button";
 import { Loader2 } from "lucide-react";
 import { Link } from "react-router-dom";
 
 export default function SavedPostsPage() {
-  const { getAllPosts } = usePosts();
+  const { getSavedPosts } = usePosts();
   const [posts, setPosts] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     const fetchSaved = async () => {
       setLoading(true);
-      const all = await getAllPosts();
-      const filtered = all.filter((p) => p.isSaved);
-      setPosts(filtered);
+      const page = await getSavedPosts();
+      setPosts(page.items);
+      setNextCursor(page.nextCursor);
       setLoading(false);
     };
     fetchSaved();
-  }, [getAllPosts]);
+  }, [getSavedPosts]);
+
+  // Halaman berikutnya lewat cursor dari header X-Next-Cursor
+  const handleLoadMore = async () => {
+    setLoadingMore(true);
+    const page = await getSavedPosts(nextCursor);
+    setPosts((prev) => {
+      const seen = new Set(prev.map((p) => p.id));
+      return [...prev, ...page.items.filter((p) => !seen.has(p.id))];
+    });
+    setNextCursor(page.nextCursor);
+    setLoadingMore(false);
+  };
 
   return (
     <DashboardLayout>
@@ -53,6 +68,15 @@ export default function SavedPostsPage() {
             </Link>
           ))
         )}
+
+        {!loading && nextCursor && (
+          <div className="flex justify-center">
+            <Button variant="outline" onClick={handleLoadMore} disabled={loadingMore}>
+              {loadingMore && <Loader2 className="w-4 h-4 animate-spin mr-2" />}
+              Muat lebih banyak
+            </Button>
+          </div>
+        )}
       </div>
     </DashboardLayout>
   );